@@ -1,25 +1,101 @@
 import os
-from flask import Flask, render_template, request, session, jsonify, make_response
+from flask import Flask, render_template, request, session, jsonify, make_response, send_from_directory, url_for, abort
+from flask.json.provider import JSONProvider
 from flask_session import Session
 import pandas as pd
 import numpy as np
 import json
-from datetime import datetime
+import orjson
+import gzip
+import zlib
+import mimetypes
+import decimal
+import bisect
+import hashlib
+import functools
+from collections import OrderedDict
+import sqlite3
+from datetime import date, datetime, timedelta
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
-from plotly.utils import PlotlyJSONEncoder
 import io
 import base64
 from werkzeug.utils import secure_filename
+from scipy import stats
+from numpy.lib.stride_tricks import sliding_window_view
 import tempfile
+import shutil
+import zipfile
+import uuid
+import time
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import brotli
+except ImportError:
+    # brotli가 없으면 gzip만 협상
+    brotli = None
+
+# JSON 직렬화 (orjson): NumPy 배열/스칼라를 직접 인코딩, NaN/inf는 항상 null
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _orjson_default(obj):
+    """orjson이 직접 처리하지 않는 타입 변환 (Plotly 객체, pandas 값, 비연속/객체 dtype 배열 등)"""
+    if hasattr(obj, 'to_plotly_json'):
+        return obj.to_plotly_json()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in 'fciub':
+            return np.ascontiguousarray(obj)
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.to_numpy()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime, date, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'JSON으로 변환할 수 없는 타입입니다: {type(obj).__name__}')
+
+def dumps_json(obj):
+    """객체를 JSON 바이트로 직렬화"""
+    return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
+
+class OrjsonProvider(JSONProvider):
+    """jsonify/request.get_json에 orjson 사용"""
+    mimetype = 'application/json'
+    
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype=self.mimetype)
+
+def figure_payload(fig):
+    """Plotly 그림을 응답에 그대로 넣을 수 있는 dict로 변환 (문자열로 이중 인코딩하지 않음)"""
+    return fig.to_plotly_json()
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# 업로드 요청 최대 크기 (압축 파일 기준, MAX_UPLOAD_MB로 조정)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 16)) * 1024 * 1024
 
 # Session configuration for persistence
 app.config['SESSION_PERMANENT'] = False
@@ -32,9 +108,12 @@ app.config['PERMANENT_SESSION_LIFETIME'] = 7200  # 2 hours
 # Initialize Flask-Session
 Session(app)
 
+# 운영 모드 (APP_ENV=production): 템플릿 자동 리로드 끄고 시작 시 미리 컴파일, 정적 파일 지문 고정
+PRODUCTION_MODE = os.environ.get('APP_ENV', 'development').lower() == 'production'
+
 # Static files configuration for better caching
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # 1 year for static files
-app.config['TEMPLATES_AUTO_RELOAD'] = True
+app.config['TEMPLATES_AUTO_RELOAD'] = not PRODUCTION_MODE
 
 # Cache control for static files
 @app.after_request
@@ -45,7 +124,14 @@ def add_header(response):
     
     # For static files, allow caching
     if request.endpoint and request.endpoint.startswith('static'):
-        response.headers['Cache-Control'] = 'public, max-age=31536000'
+        # 지문이 붙은 URL만 장기 캐시, 원래 URL은 매번 재검증 (배포 후 이전 JS 방지)
+        if (request.view_args or {}).get('filename') in asset_sources:
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, no-cache'
+    elif response.headers.get('ETag'):
+        # 버전 ETag가 있는 조회 응답은 저장하되 매번 재검증 (If-None-Match → 304)
+        response.headers['Cache-Control'] = 'private, no-cache'
     else:
         # For dynamic content, prevent caching
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
@@ -54,11 +140,224 @@ def add_header(response):
     
     return response
 
+# 응답 압축 (Accept-Encoding 협상: brotli 우선, 없으면 gzip)
+# JSON/CSV/HTML 응답이 임계값 이상이면 압축, 스트리밍 응답은 청크 단위로 압축하며 전송
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/html', 'text/css',
+                          'text/javascript', 'application/javascript'}
+# 정적 파일 사전 압축본 (.br/.gz) 저장 위치
+STATIC_PRECOMPRESSED_DIR = os.environ.get('STATIC_PRECOMPRESSED_DIR',
+                                          os.path.join(tempfile.gettempdir(), 'outlier_static_precompressed'))
+
+def choose_content_encoding(available=('br', 'gzip')):
+    """요청의 Accept-Encoding에서 사용할 인코딩 선택 (br > gzip, q=0은 제외)"""
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if encoding in available and accepted[encoding] > 0:
+            return encoding
+    return None
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+def compress_stream(chunks, encoding):
+    """스트리밍 응답을 청크마다 flush하며 압축 (클라이언트가 받는 즉시 풀 수 있도록)"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+@app.after_request
+def compress_response(response):
+    """JSON/CSV/HTML 응답 압축 (이미 인코딩된 응답, 파일 전송, 부분 응답은 제외)"""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or request.method == 'HEAD' or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    encoding = choose_content_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress_bytes(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+
+    # 압축본은 원본과 바이트가 다르므로 약한 ETag로 표시 (If-None-Match는 약한 비교)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def build_precompressed_assets(static_dir=None, output_dir=STATIC_PRECOMPRESSED_DIR):
+    """정적 JS/CSS 파일의 .gz(.br) 사전 압축본 생성 (원본이 바뀐 파일만 다시 생성)
+
+    반환값: {정적 파일 경로: [생성된 인코딩]}
+    """
+    static_dir = static_dir or app.static_folder
+    built = {}
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            if mimetypes.guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES:
+                continue
+            with open(source, 'rb') as f:
+                data = f.read()
+            if len(data) < COMPRESSION_MIN_SIZE:
+                continue
+
+            encodings = []
+            for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+                if encoding == 'br' and brotli is None:
+                    continue
+                target = os.path.join(output_dir, relative + suffix)
+                if not (os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source)):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    compressed = (brotli.compress(data, quality=11) if encoding == 'br'
+                                  else gzip.compress(data, compresslevel=9, mtime=0))
+                    tmp_path = f'{target}.{uuid.uuid4().hex}.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        f.write(compressed)
+                    os.replace(tmp_path, target)
+                encodings.append(encoding)
+            built[relative] = encodings
+    return built
+
+try:
+    precompressed_assets = build_precompressed_assets()
+except OSError:
+    # 쓰기 불가 환경에서는 원본 정적 파일만 제공 (동적 압축도 적용되지 않음)
+    precompressed_assets = {}
+
+# 정적 파일 지문(content hash) 매니페스트: js/main.js → js/main.<hash>.js
+# 내용이 바뀌면 URL도 바뀌므로 지문 URL은 immutable로 캐시 (개발 모드에서는 파일 변경 시 지문 갱신)
+ASSET_HASH_LENGTH = 10
+
+def fingerprint_filename(filename, digest):
+    base, ext = os.path.splitext(filename)
+    return f'{base}.{digest[:ASSET_HASH_LENGTH]}{ext}'
+
+def _asset_fingerprint(relative, static_dir=None):
+    path = os.path.join(static_dir or app.static_folder, relative)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint_filename(relative, digest), os.path.getmtime(path)
+
+def build_asset_manifest(static_dir=None):
+    """정적 파일별 {원본 경로: 지문 경로} 매니페스트와 파일 수정 시각 반환"""
+    static_dir = static_dir or app.static_folder
+    manifest, mtimes = {}, {}
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+            manifest[relative], mtimes[relative] = _asset_fingerprint(relative, static_dir)
+    return manifest, mtimes
+
+asset_manifest, _asset_mtimes = build_asset_manifest()
+asset_sources = {fingerprinted: source for source, fingerprinted in asset_manifest.items()}
+
+def refresh_asset(filename):
+    """개발 모드: 파일이 바뀌었으면 지문과 사전 압축본 갱신 (이전 지문 경로는 더 이상 제공하지 않음)"""
+    try:
+        mtime = os.path.getmtime(os.path.join(app.static_folder, filename))
+    except OSError:
+        return
+    if _asset_mtimes.get(filename) == mtime:
+        return
+    fingerprinted, _asset_mtimes[filename] = _asset_fingerprint(filename)
+    # 이전 지문 URL이 새 내용을 immutable로 캐시시키지 않도록 제거
+    previous = asset_manifest.get(filename)
+    if previous != fingerprinted:
+        asset_sources.pop(previous, None)
+    asset_manifest[filename] = fingerprinted
+    asset_sources[fingerprinted] = filename
+    try:
+        precompressed_assets.update(build_precompressed_assets())
+    except OSError:
+        pass
+
+def asset_url(filename, **values):
+    """url_for('static', filename=...)와 같은 사용법으로 지문이 붙은 정적 파일 URL 반환"""
+    if not PRODUCTION_MODE:
+        refresh_asset(filename)
+    return url_for('static', filename=asset_manifest.get(filename, filename), **values)
+
+app.jinja_env.globals['asset_url'] = asset_url
+
+def precompile_templates():
+    """index.html과 상속/포함 템플릿을 미리 컴파일해 Jinja 캐시에 적재"""
+    names = ['base.html', 'index.html'] + [name for name in app.jinja_env.list_templates()
+                                           if name.startswith('components/')]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+if PRODUCTION_MODE:
+    precompile_templates()
+
+def serve_static(filename):
+    """정적 파일 제공: 지문 경로는 원본으로 변환, 사전 압축본이 있고 클라이언트가 지원하면 압축본을 그대로 전송"""
+    source = asset_sources.get(filename, filename)
+    if not PRODUCTION_MODE:
+        refresh_asset(source)
+        # 요청한 지문이 갱신으로 무효가 되었으면 새 내용 대신 404 (지문 URL은 내용이 고정되어야 함)
+        if source != filename and filename not in asset_sources:
+            abort(404)
+    filename = source
+    encoding = choose_content_encoding(precompressed_assets.get(filename, ()))
+    if encoding is None:
+        response = app.send_static_file(filename)
+    else:
+        suffix = '.br' if encoding == 'br' else '.gz'
+        response = send_from_directory(STATIC_PRECOMPRESSED_DIR, filename + suffix,
+                                       mimetype=mimetypes.guess_type(filename)[0],
+                                       max_age=app.get_send_file_max_age(filename))
+        response.headers['Content-Encoding'] = encoding
+    if filename in precompressed_assets:
+        response.vary.add('Accept-Encoding')
+    return response
+
+app.view_functions['static'] = serve_static
+
 # Allowed file extensions for upload
-ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
+ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv', 'csv.gz', 'zip'}
+
+def upload_extension(filename):
+    """지원하는 확장자 반환 (.csv.gz 같은 이중 확장자 포함, 지원하지 않으면 None)"""
+    name = filename.lower()
+    for extension in sorted(ALLOWED_EXTENSIONS, key=len, reverse=True):
+        if name.endswith('.' + extension):
+            return extension
+    return None
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return upload_extension(filename) is not None
+
+UNSUPPORTED_UPLOAD_MESSAGE = '지원되지 않는 파일 형식입니다. (xlsx, xls, csv, csv.gz, zip만 지원)'
 
 def clean_data_for_json(data):
     """None 값을 null로 변환하여 JSON 직렬화 문제 해결"""
@@ -70,7 +369,61 @@ def clean_data_for_json(data):
             cleaned[key] = [None if v is None or v == '' else v for v in values]
     return cleaned
 
-def detect_outliers_with_threshold(arr, method='zscore', threshold=None):
+# 테이블 창(window) 조회 설정: 전체 테이블 대신 화면에 보이는 행 범위만 주고받음
+TABLE_WINDOW_DEFAULT_LIMIT = 100
+TABLE_WINDOW_MAX_LIMIT = 1000
+TABLE_FIXED_COLUMNS = ('Size(nm)', 'PI')
+
+def ordered_table_columns(table_data):
+    """테이블 컬럼 순서 (No., Size(nm), PI, 기타 컬럼)"""
+    fixed = [column for column in TABLE_FIXED_COLUMNS if column in table_data]
+    others = [column for column in table_data if column != 'No.' and column not in fixed]
+    return ['No.'] + fixed + others
+
+def parse_table_window(source):
+    """요청 값(쿼리/JSON/폼)에서 offset, limit, columns(투영) 추출"""
+    try:
+        offset = max(int(source.get('offset', 0) or 0), 0)
+    except (TypeError, ValueError):
+        offset = 0
+    try:
+        limit = int(source.get('limit', TABLE_WINDOW_DEFAULT_LIMIT) or TABLE_WINDOW_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = TABLE_WINDOW_DEFAULT_LIMIT
+    limit = min(max(limit, 1), TABLE_WINDOW_MAX_LIMIT)
+
+    columns = source.get('columns')
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(',') if column.strip()]
+    return offset, limit, columns or None
+
+def table_window(table_data, offset=0, limit=TABLE_WINDOW_DEFAULT_LIMIT, columns=None):
+    """테이블의 offset부터 limit개 행만 잘라 반환 (columns 지정 시 해당 컬럼만, No.는 항상 포함)"""
+    all_columns = ordered_table_columns(table_data)
+    total_rows = len(table_data.get('No.', []))
+    offset = min(offset, total_rows)
+    end = min(offset + limit, total_rows)
+
+    selected = all_columns if columns is None else ['No.'] + [c for c in all_columns if c in columns and c != 'No.']
+    rows = {column: table_data.get(column, [])[offset:end] for column in selected}
+    return {
+        'offset': offset,
+        'limit': limit,
+        'total_rows': total_rows,
+        'columns': all_columns,
+        'rows': clean_data_for_json(rows)
+    }
+
+def normalize_cell_value(value):
+    """셀 입력값을 숫자로 변환 (빈 값/변환 불가 값은 None)"""
+    if value is None or (isinstance(value, str) and value.strip() == ''):
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+def detect_outliers_with_threshold(arr, method='zscore', threshold=None, max_outliers=None):
     """다양한 방법으로 이상치 검출 (임계값 조정 가능)"""
     if len(arr) == 0:
         return np.array([], dtype=bool)
@@ -104,48 +457,2043 @@ def detect_outliers_with_threshold(arr, method='zscore', threshold=None):
         mz = 0.6745 * (arr - median) / mad
         return np.abs(mz) > threshold
     
+    elif method == 'gesd':
+        # 임계값 = 유의수준(alpha)
+        if threshold is None:
+            threshold = 0.05
+        return gesd_outlier_mask(arr, alpha=threshold, max_outliers=max_outliers)
+    
     return np.zeros(len(arr), dtype=bool)
 
-def create_scatter_plot(data, title="Scatter Plot", outlier_info=None):
-    """산점도 생성"""
-    if len(data) == 0:
-        return None
-    
-    df = pd.DataFrame(data)
-    
-    fig = go.Figure()
-    
-    # 기본 데이터 포인트
-    fig.add_trace(go.Scatter(
-        x=df['Size(nm)'],
-        y=df['PI'],
-        mode='markers',
-        marker=dict(
-            size=8,
-            color='rgba(55, 128, 191, 0.7)',
-            line=dict(width=1, color='rgba(55, 128, 191, 1)')
-        ),
-        name='Data Points',
-        text=[f"Point {i+1}<br>Size: {row['Size(nm)']:.3f}<br>PI: {row['PI']:.3f}" 
-              for i, row in df.iterrows()],
-        hovertemplate='%{text}<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=title,
-        xaxis_title='Size (nm)',
-        yaxis_title='PI',
-        hovermode='closest',
-        width=600,
-        height=400,
-        margin=dict(l=60, r=30, t=60, b=60),
-        legend=dict(
-            itemsizing='constant',
-            font=dict(size=12)
-        )
-    )
-    
-    return json.dumps(fig, cls=PlotlyJSONEncoder)
+# 이상치 검출 방법 (키: 화면/CSV 표시명)
+METHOD_NAMES = {'zscore': 'Z-Score', 'iqr': 'IQR', 'mad': 'MAD', 'gesd': 'GESD',
+                'mahalanobis': 'Mahalanobis', 'hampel': 'Hampel'}
+
+# Size(nm)와 PI를 함께 보는 방법 (detect_outliers_with_threshold 대신 두 컬럼 사용)
+BIVARIATE_METHODS = ('mahalanobis',)
+
+# GESD에서 최대 이상치 수를 지정하지 않았을 때 데이터 개수 대비 비율
+GESD_DEFAULT_MAX_FRACTION = 0.1
+
+def gesd_outlier_mask(arr, alpha=0.05, max_outliers=None):
+    """Generalized ESD(Rosner) 검정 - 최대 k개 이상치
+    한 번 정렬 후 양 끝에서 극단값을 제거하며 누적합으로 평균/분산을 갱신하므로 O(n log n + k)"""
+    arr = np.asarray(arr, dtype=float)
+    n = len(arr)
+    if max_outliers is None:
+        max_outliers = int(n * GESD_DEFAULT_MAX_FRACTION)
+    k = min(int(max_outliers), n - 3)
+    mask = np.zeros(n, dtype=bool)
+    if k < 1:
+        return mask
+    
+    order = np.argsort(arr, kind='stable')
+    # 평균을 빼서 제곱합 계산 시 자릿수 손실 방지
+    x = arr[order] - arr.mean()
+    prefix = np.concatenate(([0.0], np.cumsum(x)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(x * x)))
+    
+    # 단계별 검정 통계량 R_i와 제거된 정렬 위치
+    r_stats = np.zeros(k)
+    removed = np.empty(k, dtype=np.int64)
+    lo, hi = 0, n - 1
+    steps = 0
+    for i in range(k):
+        m = n - i
+        total = prefix[hi + 1] - prefix[lo]
+        mean = total / m
+        var = (prefix_sq[hi + 1] - prefix_sq[lo] - total * mean) / (m - 1)
+        if var <= 0:
+            break
+        low_dev, high_dev = mean - x[lo], x[hi] - mean
+        if high_dev >= low_dev:
+            r_stats[i] = high_dev / np.sqrt(var)
+            removed[i] = hi
+            hi -= 1
+        else:
+            r_stats[i] = low_dev / np.sqrt(var)
+            removed[i] = lo
+            lo += 1
+        steps += 1
+    if steps == 0:
+        return mask
+    
+    # 임계값 λ_i 일괄 계산
+    m = n - np.arange(steps)
+    t = stats.t.ppf(1 - alpha / (2 * m), m - 2)
+    critical = (m - 1) * t / np.sqrt((m - 2 + t ** 2) * m)
+    
+    exceed = np.nonzero(r_stats[:steps] > critical)[0]
+    if len(exceed) == 0:
+        return mask
+    outlier_count = exceed[-1] + 1
+    mask[order[removed[:outlier_count]]] = True
+    return mask
+
+# Hampel 필터 (측정 순서 기준 이동 중앙값/MAD)
+HAMPEL_DEFAULT_HALF_WINDOW = 5
+HAMPEL_BLOCK_ROWS = 50000
+
+def hampel_outlier_mask(arr, threshold=None, half_window=None, order=None):
+    """Hampel 필터로 국소 스파이크 검출 (장비 드리프트 중에도 주변 측정값 기준으로 판단)
+    order: 측정 순서 인덱스(타임스탬프 정렬 결과), 없으면 행 순서
+    창 길이 w=2k+1, sliding window view를 블록 단위로 계산하여 메모리 O(블록×w)"""
+    if threshold is None:
+        threshold = 3.0
+    k = int(half_window or HAMPEL_DEFAULT_HALF_WINDOW)
+    arr = np.asarray(arr, dtype=float)
+    n = len(arr)
+    w = 2 * k + 1
+    if n < w or k < 1:
+        return np.zeros(n, dtype=bool)
+    
+    x = arr[order] if order is not None else arr
+    window_count = n - w + 1
+    median = np.empty(window_count)
+    mad = np.empty(window_count)
+    block = max(1, HAMPEL_BLOCK_ROWS // w)
+    for start in range(0, window_count, block):
+        windows = sliding_window_view(x[start:start + block + w - 1], w)
+        block_median = np.median(windows, axis=1)
+        median[start:start + len(windows)] = block_median
+        mad[start:start + len(windows)] = np.median(np.abs(windows - block_median[:, None]), axis=1)
+    
+    # 양 끝 k개는 가장 가까운 완전한 창의 값 사용
+    center = np.clip(np.arange(n) - k, 0, window_count - 1)
+    sigma = 1.4826 * mad[center]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flagged = (sigma > 0) & (np.abs(x - median[center]) > threshold * sigma)
+    
+    if order is None:
+        return flagged
+    mask = np.zeros(n, dtype=bool)
+    mask[order] = flagged
+    return mask
+
+def measurement_order(values):
+    """타임스탬프(또는 숫자) 컬럼으로 측정 순서 인덱스 생성, 해석할 수 없는 값은 뒤로"""
+    series = pd.Series(values, dtype=object)
+    keys = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    if np.isnan(keys).all():
+        timestamps = pd.to_datetime(series, errors='coerce')
+        keys = np.where(timestamps.isna(), np.nan, timestamps.astype('int64')).astype(float)
+    keys[np.isnan(keys)] = np.inf
+    return np.argsort(keys, kind='stable')
+
+# 그룹별 이상치 검출에서 지원하는 방법
+GROUPED_METHODS = ('zscore', 'iqr', 'mad')
+
+def group_codes(values):
+    """그룹 컬럼 값을 그룹 번호(0..g-1)와 그룹명 목록으로 변환 (빈 값은 하나의 그룹)"""
+    labels = []
+    for value in values:
+        if value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == '':
+            labels.append('(빈 값)')
+        elif isinstance(value, float) and value.is_integer():
+            labels.append(str(int(value)))
+        else:
+            labels.append(str(value).strip())
+    codes, uniques = pd.factorize(pd.Series(labels, dtype=object), sort=True)
+    return codes.astype(np.int64), list(uniques)
+
+def _segment_quantile(sorted_values, starts, counts, q):
+    """(그룹, 값) 순으로 정렬된 배열에서 그룹별 분위수 (np.percentile 선형 보간과 동일)"""
+    pos = (counts - 1) * q
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    low_values = sorted_values[starts + lower]
+    return low_values + (pos - lower) * (sorted_values[starts + upper] - low_values)
+
+def grouped_outlier_masks(arr, codes, methods, thresholds):
+    """그룹별 Z-Score/IQR/MAD 이상치 검출
+    그룹 번호로 정렬한 뒤 구간 집계(bincount, 구간 시작 위치 인덱싱)로 계산하므로 그룹별 반복 없음"""
+    group_count = int(codes.max()) + 1 if len(codes) else 0
+    counts = np.bincount(codes, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    masks = {}
+    
+    if 'zscore' in methods:
+        threshold = thresholds.get('zscore')
+        if threshold is None:
+            threshold = 3.0
+        mean = np.bincount(codes, weights=arr, minlength=group_count) / counts
+        dev = arr - mean[codes]
+        std = np.sqrt(np.bincount(codes, weights=dev * dev, minlength=group_count) / counts)[codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            masks['zscore'] = (std > 0) & (np.abs(dev / std) >= threshold)
+    
+    if 'iqr' in methods or 'mad' in methods:
+        sorted_values = arr[np.lexsort((arr, codes))]
+        median = _segment_quantile(sorted_values, starts, counts, 0.5)
+    
+    if 'iqr' in methods:
+        threshold = thresholds.get('iqr')
+        if threshold is None:
+            threshold = 1.5
+        q1 = _segment_quantile(sorted_values, starts, counts, 0.25)
+        q3 = _segment_quantile(sorted_values, starts, counts, 0.75)
+        iqr = q3 - q1
+        lower, upper = (q1 - threshold * iqr)[codes], (q3 + threshold * iqr)[codes]
+        masks['iqr'] = (iqr[codes] > 0) & ((arr < lower) | (arr > upper))
+    
+    if 'mad' in methods:
+        threshold = thresholds.get('mad')
+        if threshold is None:
+            threshold = 3.5
+        dev = arr - median[codes]
+        abs_dev = np.abs(dev)
+        mad = _segment_quantile(abs_dev[np.lexsort((abs_dev, codes))], starts, counts, 0.5)[codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            masks['mad'] = (mad > 0) & (np.abs(0.6745 * dev / mad) > threshold)
+    
+    return masks
+
+def group_summaries(sizes, pis, codes, labels, masks):
+    """그룹별 개수, Size/PI 평균·표준편차(표본), 방법별 이상치 수"""
+    group_count = len(labels)
+    counts = np.bincount(codes, minlength=group_count)
+    
+    def mean_std(values):
+        mean = np.bincount(codes, weights=values, minlength=group_count) / counts
+        dev = values - mean[codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.bincount(codes, weights=dev * dev, minlength=group_count) / (counts - 1)
+        return mean, np.sqrt(np.where(counts > 1, var, 0.0))
+    
+    size_mean, size_std = mean_std(sizes)
+    pi_mean, pi_std = mean_std(pis)
+    outlier_counts = {method: np.bincount(codes, weights=mask, minlength=group_count).astype(int)
+                      for method, mask in masks.items()}
+    
+    return [{
+        'group': label,
+        'count': int(counts[i]),
+        'size_mean': float(size_mean[i]),
+        'size_std': float(size_std[i]),
+        'pi_mean': float(pi_mean[i]),
+        'pi_std': float(pi_std[i]),
+        'outliers': {method: int(values[i]) for method, values in outlier_counts.items()}
+    } for i, label in enumerate(labels)]
+
+# 로버스트 마할라노비스 거리 (FastMCD 방식)
+MCD_SUBSAMPLE_SIZE = 1000
+MCD_TRIALS = 500
+MCD_CANDIDATES = 10
+MCD_MAX_STEPS = 20
+MCD_TOLERANCE = 1e-6
+
+def _location_scatter(points):
+    """점 묶음별 평균/공분산 (points: [..., m, 2])"""
+    mean = points.mean(axis=-2)
+    centered = points - mean[..., None, :]
+    cov = np.einsum('...ij,...ik->...jk', centered, centered) / (points.shape[-2] - 1)
+    return mean, cov
+
+def _squared_distances(x, mean, cov):
+    """2차원 점들의 마할라노비스 거리 제곱 (공분산 배치 지원, 2x2 역행렬은 닫힌 형태)"""
+    a, b, d = cov[..., 0, 0], cov[..., 0, 1], cov[..., 1, 1]
+    det = a * d - b * b
+    dx = x[..., 0] - mean[..., None, 0]
+    dy = x[..., 1] - mean[..., None, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dist = (d[..., None] * dx * dx - 2 * b[..., None] * dx * dy + a[..., None] * dy * dy) / det[..., None]
+    return np.where(det[..., None] > 0, dist, np.inf)
+
+def _c_steps(x, mean, cov, h, max_steps):
+    """C-step: 거리가 가장 작은 h개 점으로 평균/공분산 재추정 (후보 배치, 행렬식이 더 줄지 않으면 중단)"""
+    prev_det = np.full(mean.shape[:-1], np.inf)
+    for _ in range(max_steps):
+        keep = np.argpartition(_squared_distances(x, mean, cov), h - 1, axis=-1)[..., :h]
+        mean, cov = _location_scatter(x[keep])
+        det = np.linalg.det(cov)
+        if np.all(det >= prev_det * (1 - MCD_TOLERANCE)):
+            break
+        prev_det = det
+    return mean, cov
+
+def robust_mahalanobis_mask(sizes, pis, threshold=None, seed=0):
+    """Size(nm)×PI 쌍에 대한 MCD 로버스트 마할라노비스 거리 이상치 검출
+    threshold: 카이제곱(자유도 2) 분위 확률 (기본 0.975)"""
+    if threshold is None:
+        threshold = 0.975
+    points = np.column_stack([np.asarray(sizes, dtype=float), np.asarray(pis, dtype=float)])
+    n = len(points)
+    if n < 5:
+        return np.zeros(n, dtype=bool)
+    
+    # 중앙값/MAD로 표준화하여 Size와 PI의 스케일 차이 제거
+    center = np.median(points, axis=0)
+    scale = np.median(np.abs(points - center), axis=0)
+    scale[scale == 0] = 1.0
+    x = (points - center) / scale
+    rng = np.random.default_rng(seed)
+    
+    # 1단계: 부분 표본에서 무작위 3점 초기해 + C-step 2회를 일괄 계산
+    sub = x[rng.choice(n, MCD_SUBSAMPLE_SIZE, replace=False)] if n > MCD_SUBSAMPLE_SIZE else x
+    sub_h = (len(sub) + 3) // 2
+    starts = np.argpartition(rng.random((MCD_TRIALS, len(sub))), 2, axis=1)[:, :3]
+    mean, cov = _location_scatter(sub[starts])
+    mean, cov = _c_steps(sub, mean, cov, sub_h, 2)
+    
+    # 2단계: 행렬식이 가장 작은 후보들을 부분 표본에서 수렴시킨 뒤 최적 후보만 전체 데이터에서 수렴
+    det = np.linalg.det(cov)
+    det[~np.isfinite(det) | (det <= 0)] = np.inf
+    best = np.argsort(det)[:MCD_CANDIDATES]
+    best = best[np.isfinite(det[best])]
+    if len(best) == 0:
+        return np.zeros(n, dtype=bool)
+    mean, cov = _c_steps(sub, mean[best], cov[best], sub_h, MCD_MAX_STEPS)
+    i = int(np.argmin(np.linalg.det(cov)))
+    mean, cov = mean[i], cov[i]
+    if len(sub) < n:
+        mean, cov = _c_steps(x, mean, cov, (n + 3) // 2, MCD_MAX_STEPS)
+    if not np.linalg.det(cov) > 0:
+        return np.zeros(n, dtype=bool)
+    
+    # 일관성 보정 후 재가중(0.975 분위 이내 점으로 재추정), 재추정 공분산도 같은 방식으로 보정
+    dist = _squared_distances(x, mean, cov)
+    dist = dist * stats.chi2.ppf(0.5, 2) / np.median(dist)
+    inliers = dist <= stats.chi2.ppf(0.975, 2)
+    if inliers.sum() > 3:
+        mean, cov = _location_scatter(x[inliers])
+        if np.linalg.det(cov) > 0:
+            dist = _squared_distances(x, mean, cov)
+            dist = dist * stats.chi2.ppf(0.5, 2) / np.median(dist)
+    return dist > stats.chi2.ppf(threshold, 2)
+
+# 스트리밍(온라인) 이상치 검출
+# 샘플별로 평균/분산(Welford)과 P² 분위수 추정치만 유지하므로 측정값 1건당 O(1)
+# 배치 방법과의 차이: Z-Score는 동일(부동소수점 오차 수준),
+# IQR/MAD의 분위수는 P² 근사치로 정규 분포 데이터 1,000건 이상에서 배치 값 대비 통상 1% 이내
+STREAM_MIN_READINGS = 5
+
+def _p2_new(p):
+    """P² 분위수 추정기 상태 생성 (p: 0~1 분위)"""
+    return {'p': p, 'init': [], 'q': None, 'pos': None, 'desired': None}
+
+def _p2_update(state, x):
+    """P² 알고리즘(Jain & Chlamtac)으로 분위수 추정치 갱신 - 저장 공간/시간 O(1)"""
+    if state['q'] is None:
+        state['init'].append(x)
+        if len(state['init']) == 5:
+            p = state['p']
+            state['q'] = sorted(state['init'])
+            state['pos'] = [1, 2, 3, 4, 5]
+            state['desired'] = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+            state['init'] = []
+        return
+    
+    p, q, pos, desired = state['p'], state['q'], state['pos'], state['desired']
+    if x < q[0]:
+        q[0] = x
+        k = 0
+    elif x >= q[4]:
+        q[4] = x
+        k = 3
+    else:
+        k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+    
+    for i in range(k + 1, 5):
+        pos[i] += 1
+    for i, inc in enumerate((0, p / 2, p, (1 + p) / 2, 1)):
+        desired[i] += inc
+    
+    for i in (1, 2, 3):
+        d = desired[i] - pos[i]
+        if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+            d = 1 if d > 0 else -1
+            # 포물선 보간, 순서가 깨지면 선형 보간
+            qp = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i]) +
+                (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+            if not q[i - 1] < qp < q[i + 1]:
+                qp = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+            q[i] = qp
+            pos[i] += d
+
+def _p2_value(state):
+    if state['q'] is not None:
+        return state['q'][2]
+    if state['init']:
+        return float(np.percentile(state['init'], state['p'] * 100))
+    return float('nan')
+
+def new_stream_state():
+    """샘플별 스트리밍 통계 상태"""
+    return {
+        'count': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'q1': _p2_new(0.25),
+        'median': _p2_new(0.5),
+        'q3': _p2_new(0.75),
+        'abs_dev': _p2_new(0.5)
+    }
+
+def stream_summary(state):
+    """스트리밍 상태의 현재 통계 요약"""
+    count = state['count']
+    return {
+        'count': count,
+        'mean': state['mean'] if count else None,
+        'std': float(np.sqrt(state['m2'] / count)) if count else None,
+        'q1': _p2_value(state['q1']),
+        'median': _p2_value(state['median']),
+        'q3': _p2_value(state['q3']),
+        'mad': _p2_value(state['abs_dev'])
+    }
+
+def stream_update(state, x, thresholds):
+    """측정값 1건을 상태에 반영하고 방법별 이상치 여부 판정 (배치 방법과 동일한 기준식)"""
+    state['count'] += 1
+    delta = x - state['mean']
+    state['mean'] += delta / state['count']
+    state['m2'] += delta * (x - state['mean'])
+    for key in ('q1', 'median', 'q3'):
+        _p2_update(state[key], x)
+    median = _p2_value(state['median'])
+    _p2_update(state['abs_dev'], abs(x - median))
+    
+    summary = stream_summary(state)
+    flags = {'value': x, 'warming_up': state['count'] < STREAM_MIN_READINGS,
+             'zscore': False, 'iqr': False, 'mad': False}
+    if flags['warming_up']:
+        return flags
+    
+    zscore_threshold = thresholds.get('zscore')
+    if zscore_threshold is None:
+        zscore_threshold = 3.0
+    if summary['std'] > 0:
+        flags['z'] = (x - summary['mean']) / summary['std']
+        flags['zscore'] = bool(abs(flags['z']) >= zscore_threshold)
+    
+    iqr_threshold = thresholds.get('iqr')
+    if iqr_threshold is None:
+        iqr_threshold = 1.5
+    iqr = summary['q3'] - summary['q1']
+    if iqr > 0:
+        flags['iqr'] = bool(x < summary['q1'] - iqr_threshold * iqr or x > summary['q3'] + iqr_threshold * iqr)
+    
+    mad_threshold = thresholds.get('mad')
+    if mad_threshold is None:
+        mad_threshold = 3.5
+    if summary['mad'] > 0:
+        flags['mad'] = bool(abs(0.6745 * (x - summary['median']) / summary['mad']) > mad_threshold)
+    return flags
+
+def create_scatter_plot(data, title="Scatter Plot", outlier_info=None):
+    """산점도 생성"""
+    if len(data) == 0:
+        return None
+    
+    df = pd.DataFrame(data)
+    sizes = df['Size(nm)'].to_numpy(dtype=float)
+    pis = df['PI'].to_numpy(dtype=float)
+    
+    fig = go.Figure()
+    
+    # 기본 데이터 포인트
+    fig.add_trace(go.Scatter(
+        x=sizes,
+        y=pis,
+        mode='markers',
+        marker=dict(
+            size=8,
+            color='rgba(55, 128, 191, 0.7)',
+            line=dict(width=1, color='rgba(55, 128, 191, 1)')
+        ),
+        name='Data Points',
+        # 점 번호는 숫자 배열로 전달하고 표시 형식은 hovertemplate에서 지정 (점마다 문자열을 만들지 않음)
+        customdata=np.arange(1, len(sizes) + 1),
+        hovertemplate='Point %{customdata}<br>Size: %{x:.3f}<br>PI: %{y:.3f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title='Size (nm)',
+        yaxis_title='PI',
+        hovermode='closest',
+        width=600,
+        height=400,
+        margin=dict(l=60, r=30, t=60, b=60),
+        legend=dict(
+            itemsizing='constant',
+            font=dict(size=12)
+        )
+    )
+    
+    return figure_payload(fig)
+
+# 분석/내보내기 작업용 프로세스 풀 설정
+# ANALYSIS_WORKERS=0 이면 항상 요청 스레드에서 직접 실행 (단일 코어 환경 기본값)
+_cpu_count = os.cpu_count() or 1
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', _cpu_count if _cpu_count > 1 else 0))
+# 이 행 수 미만의 작업은 프로세스 간 전달 비용이 더 크므로 직접 실행
+ANALYSIS_POOL_MIN_ROWS = int(os.environ.get('ANALYSIS_POOL_MIN_ROWS', 20000))
+
+_analysis_pool = None
+_analysis_pool_lock = threading.Lock()
+
+def _warm_up_worker():
+    """워커 프로세스 예열 (NumPy/pandas 초기화)"""
+    pd.DataFrame({'x': np.zeros(1)}).to_csv(index=False)
+    return os.getpid()
+
+def get_analysis_pool():
+    """예열된 분석용 프로세스 풀 반환 (없으면 생성)"""
+    global _analysis_pool
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            # 요청 스레드가 동작 중인 프로세스에서 fork하지 않도록 spawn 사용
+            pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS,
+                                       mp_context=multiprocessing.get_context('spawn'))
+            warm_up = [pool.submit(_warm_up_worker) for _ in range(ANALYSIS_WORKERS)]
+            for future in warm_up:
+                future.result()
+            _analysis_pool = pool
+        return _analysis_pool
+
+def start_analysis_pool():
+    """서버 시작 시 백그라운드에서 프로세스 풀 예열"""
+    if ANALYSIS_WORKERS > 0:
+        threading.Thread(target=get_analysis_pool, daemon=True).start()
+
+def _reset_analysis_pool():
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(wait=False, cancel_futures=True)
+        _analysis_pool = None
+
+def _run_shared_task(func, shm_name, layout, kwargs):
+    """워커 프로세스: 공유 메모리의 배열을 복사 없이 읽어 작업 실행"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                  for key, dtype, shape, offset in layout}
+        result = func(arrays, **kwargs)
+        del arrays
+        return result
+    finally:
+        shm.close()
+
+def run_analysis_task(func, arrays, **kwargs):
+    """CPU 작업 실행 (큰 작업은 프로세스 풀, 숫자 배열은 공유 메모리로 전달)
+    
+    func(arrays, **kwargs)는 모듈 최상위 함수여야 하며,
+    공유 메모리 배열의 view가 아닌 새 객체를 반환해야 함
+    """
+    return map_analysis_task(func, arrays, [kwargs])[0]
+
+def map_analysis_task(func, arrays, kwargs_list, min_rows=None):
+    """같은 배열에 대해 func를 kwargs별로 실행 (프로세스 풀이 있으면 배열을 한 번만 공유하고 병렬 실행)
+    
+    min_rows: 풀 사용 기준 (기본 ANALYSIS_POOL_MIN_ROWS)
+    """
+    arrays = {key: np.ascontiguousarray(values) for key, values in arrays.items()}
+    row_count = max((len(values) for values in arrays.values()), default=0)
+    if min_rows is None:
+        min_rows = ANALYSIS_POOL_MIN_ROWS
+    
+    pool = get_analysis_pool() if row_count >= min_rows else None
+    if pool is None:
+        return [func(arrays, **kwargs) for kwargs in kwargs_list]
+    
+    layout = []
+    total_bytes = 0
+    for key, values in arrays.items():
+        layout.append((key, values.dtype.str, values.shape, total_bytes))
+        total_bytes += values.nbytes
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(total_bytes, 1))
+    try:
+        for (key, dtype, shape, offset), values in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = values
+        futures = [pool.submit(_run_shared_task, func, shm.name, layout, kwargs) for kwargs in kwargs_list]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # 워커가 비정상 종료된 경우 풀을 재생성하도록 초기화하고 직접 실행
+        _reset_analysis_pool()
+        return [func(arrays, **kwargs) for kwargs in kwargs_list]
+    finally:
+        shm.close()
+        shm.unlink()
+
+def extract_valid_pairs(table_data):
+    """테이블에서 Size(nm)/PI가 모두 유효한(숫자, 유한값) 행 추출
+    
+    반환: (sizes, pis, row_index) - row_index는 원본 테이블 행 위치
+    """
+    df = pd.DataFrame(table_data)
+    sizes = pd.to_numeric(df['Size(nm)'], errors='coerce').to_numpy(dtype=float)
+    pis = pd.to_numeric(df['PI'], errors='coerce').to_numpy(dtype=float)
+    row_index = np.flatnonzero(np.isfinite(sizes) & np.isfinite(pis))
+    return sizes[row_index], pis[row_index], row_index
+
+def build_method_result(valid_df, mask, name, threshold_used):
+    """이상치 마스크로 방법별 정제 결과 및 통계 생성"""
+    cleaned = valid_df.loc[~mask].reset_index(drop=True)
+    cleaned['No.'] = range(1, len(cleaned) + 1)
+    outliers_removed = valid_df.loc[mask].reset_index(drop=True) if mask.any() else pd.DataFrame()
+    
+    return {
+        'name': name,
+        'threshold': threshold_used,
+        'data': cleaned.to_dict('records'),
+        'outliers': outliers_removed.to_dict('records'),
+        'size_mean': float(cleaned['Size(nm)'].mean()) if len(cleaned) > 0 else 0,
+        'size_std': float(cleaned['Size(nm)'].std()) if len(cleaned) > 0 else 0,
+        'pi_mean': float(cleaned['PI'].mean()) if len(cleaned) > 0 else 0,
+        'pi_std': float(cleaned['PI'].std()) if len(cleaned) > 0 else 0,
+        'count': len(cleaned),
+        'outliers_count': len(outliers_removed)
+    }
+
+# 부트스트랩 신뢰구간 설정
+BOOTSTRAP_DEFAULT_RESAMPLES = 2000
+BOOTSTRAP_MAX_RESAMPLES = 10000
+# 한 번에 만드는 재표본 인덱스 행렬 크기 (원소 수, int64 기준 약 32MB)
+BOOTSTRAP_BLOCK_ELEMENTS = 4_000_000
+# 재표본 원소 수(n × B)가 이 이상이면 프로세스 풀로 블록 분산
+BOOTSTRAP_POOL_MIN_ELEMENTS = 20_000_000
+
+def _bootstrap_means_task(arrays, block_seeds, block_size):
+    """재표본 블록별 Size/PI 평균 (프로세스 풀 작업 단위)
+    블록마다 (block_size × n) 인덱스 행렬을 한 번에 생성, 같은 인덱스로 Size와 PI를 함께 재표본"""
+    sizes, pis = arrays['Size(nm)'], arrays['PI']
+    n = len(sizes)
+    size_means, pi_means = [], []
+    for seed, count in zip(block_seeds, block_size):
+        index = np.random.default_rng(seed).integers(0, n, size=(count, n))
+        size_means.append(np.take(sizes, index).mean(axis=1))
+        pi_means.append(np.take(pis, index).mean(axis=1))
+    return np.concatenate(size_means), np.concatenate(pi_means)
+
+def bootstrap_mean_ci(sizes, pis, resamples=None, confidence=0.95, seed=0):
+    """정제 데이터의 Size/PI 평균에 대한 백분위 부트스트랩 신뢰구간
+    재표본은 메모리 한도 내 블록으로 나누고, 블록별 시드는 seed에서 파생하므로
+    프로세스 풀 사용 여부와 관계없이 같은 seed면 같은 결과"""
+    resamples = min(int(resamples or BOOTSTRAP_DEFAULT_RESAMPLES), BOOTSTRAP_MAX_RESAMPLES)
+    n = len(sizes)
+    if n < 2 or resamples < 1:
+        return None
+    
+    rows_per_block = max(1, BOOTSTRAP_BLOCK_ELEMENTS // n)
+    block_sizes = [min(rows_per_block, resamples - start) for start in range(0, resamples, rows_per_block)]
+    block_seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    
+    # 워커별로 블록 묶음 분배 (풀이 없으면 한 번에 직접 실행)
+    chunks = max(1, min(ANALYSIS_WORKERS, len(block_sizes)))
+    kwargs_list = [{'block_seeds': block_seeds[i::chunks], 'block_size': block_sizes[i::chunks]}
+                   for i in range(chunks)]
+    parts = map_analysis_task(_bootstrap_means_task, {'Size(nm)': sizes, 'PI': pis}, kwargs_list,
+                              min_rows=max(1, BOOTSTRAP_POOL_MIN_ELEMENTS // resamples))
+    size_means = np.concatenate([part[0] for part in parts])
+    pi_means = np.concatenate([part[1] for part in parts])
+    
+    tail = (1 - confidence) / 2 * 100
+    return {
+        'resamples': resamples,
+        'confidence': confidence,
+        'seed': seed,
+        'size_mean_ci': [float(v) for v in np.percentile(size_means, [tail, 100 - tail])],
+        'pi_mean_ci': [float(v) for v in np.percentile(pi_means, [tail, 100 - tail])]
+    }
+
+def _outlier_analysis_task(arrays, methods, method_names, thresholds, max_outliers=None,
+                           group_by=None, group_labels=None, hampel_window=None):
+    """이상치 검출 + 방법별 결과 레코드 생성 (프로세스 풀 작업 단위)
+    group_by가 있으면 arrays['group'](그룹 번호)별로 검출, arrays['order']는 Hampel 측정 순서"""
+    sizes = arrays['Size(nm)'].copy()
+    valid_df = pd.DataFrame({
+        'No.': np.arange(1, len(sizes) + 1),
+        'Size(nm)': sizes,
+        'PI': arrays['PI'].copy()
+    })
+    
+    group_masks = {}
+    if group_by:
+        codes = arrays['group'].copy()
+        valid_df[group_by] = np.array(group_labels, dtype=object)[codes]
+        group_masks = grouped_outlier_masks(sizes, codes, methods, thresholds)
+    
+    results = {
+        'original_data': valid_df.to_dict('records'),
+        'original_count': len(valid_df)
+    }
+    for method in methods:
+        threshold = thresholds.get(method)
+        if method in group_masks:
+            mask = group_masks[method]
+        elif method in BIVARIATE_METHODS:
+            mask = robust_mahalanobis_mask(sizes, valid_df['PI'].to_numpy(), threshold)
+        elif method == 'hampel':
+            mask = hampel_outlier_mask(sizes, threshold, hampel_window, arrays.get('order'))
+        else:
+            mask = detect_outliers_with_threshold(sizes, method, threshold, max_outliers=max_outliers)
+        results[method] = build_method_result(valid_df, mask, method_names[method], threshold)
+    
+    if group_by:
+        results['group_by'] = group_by
+        results['groups'] = group_summaries(sizes, valid_df['PI'].to_numpy(), codes, group_labels, group_masks)
+    return results
+
+def _scatter_plot_task(arrays, title):
+    """산점도 JSON 인코딩 (프로세스 풀 작업 단위)"""
+    return create_scatter_plot({'Size(nm)': arrays['Size(nm)'].copy(), 'PI': arrays['PI'].copy()}, title)
+
+def _format_csv_task(arrays, columns):
+    """숫자 컬럼 DataFrame의 CSV 문자열 생성 (프로세스 풀 작업 단위)"""
+    df = pd.DataFrame({name: arrays[str(i)].copy() for i, name in enumerate(columns)})
+    return df.to_csv(index=False, encoding='utf-8')
+
+def frame_to_csv(df):
+    """DataFrame을 CSV 문자열로 변환 (모두 숫자 컬럼인 큰 표는 프로세스 풀 사용)"""
+    if len(df) == 0 or not all(pd.api.types.is_numeric_dtype(df[col]) for col in df.columns):
+        return df.to_csv(index=False, encoding='utf-8')
+    arrays = {str(i): df[col].to_numpy() for i, col in enumerate(df.columns)}
+    return run_analysis_task(_format_csv_task, arrays, columns=list(df.columns))
+
+# 저장된 데이터셋 저장소 (컬럼별 .npy 파일 + 메타데이터 JSON, 읽을 때는 메모리 매핑)
+DATASET_STORAGE_DIR = os.environ.get('DATASET_STORAGE_DIR',
+                                     os.path.join(tempfile.gettempdir(), 'outlier_datasets'))
+# 메타데이터 레코드에 포함되는 데이터셋 속성
+DATASET_META_KEYS = ['sample_name', 'production_date', 'pass_count', 'saved_at']
+# 세션이 만료되어 더 이상 접근할 수 없는 사용자 저장소를 정리하기까지의 시간 (초, 세션 수명보다 충분히 길게)
+DATASET_STORAGE_TTL = int(os.environ.get('DATASET_STORAGE_TTL', 24 * 3600))
+# 오래된 저장소 정리 주기 (초)
+DATASET_STORAGE_EVICT_INTERVAL = 3600
+_storage_evicted_at = 0.0
+
+def get_storage_owner():
+    """현재 세션 사용자의 저장소 식별자 (없으면 생성)"""
+    if 'storage_owner' not in session:
+        session['storage_owner'] = uuid.uuid4().hex
+        session.modified = True
+    return session['storage_owner']
+
+@app.before_request
+def touch_dataset_storage():
+    """세션이 살아 있는 동안 저장소가 정리되지 않도록 사용자 저장소의 마지막 사용 시각 갱신"""
+    if request.endpoint == 'static':
+        return
+    owner = session.get('storage_owner')
+    if owner:
+        try:
+            os.utime(os.path.join(DATASET_STORAGE_DIR, owner))
+        except OSError:
+            pass
+
+def evict_stale_dataset_storage():
+    """DATASET_STORAGE_TTL 동안 사용되지 않은 사용자 저장소 삭제 (한 시간에 한 번만 검사)"""
+    global _storage_evicted_at
+    now = time.time()
+    if now - _storage_evicted_at < DATASET_STORAGE_EVICT_INTERVAL:
+        return
+    _storage_evicted_at = now
+    try:
+        owners = os.listdir(DATASET_STORAGE_DIR)
+    except OSError:
+        return
+    for owner in owners:
+        directory = os.path.join(DATASET_STORAGE_DIR, owner)
+        try:
+            last_used = os.path.getmtime(directory)
+        except OSError:
+            continue
+        if last_used < now - DATASET_STORAGE_TTL:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def _dataset_dir(owner, storage_id):
+    return os.path.join(DATASET_STORAGE_DIR, owner, storage_id)
+
+def _column_to_array(name, values):
+    """테이블 컬럼을 저장용 (배열, 종류)로 변환 — 값과 자료형이 그대로 복원되도록 종류를 고름
+    
+    int: 빈 값 없는 정수 → int64, float: 실수와 빈 값 → float64(NaN), str: 문자열과 빈 값 → 유니코드,
+    json: 그 외(빈 값이 있는 정수, 숫자/문자열 혼합 등) → 값별 JSON 문자열
+    """
+    if name == 'No.':
+        return np.asarray(values, dtype=np.int64), 'int'
+    cleaned = [None if v is None or v == '' else (v.item() if isinstance(v, np.generic) else v) for v in values]
+    present = [v for v in cleaned if v is not None]
+    if present and len(present) == len(cleaned) and all(type(v) is int for v in present):
+        try:
+            return np.asarray(cleaned, dtype=np.int64), 'int'
+        except OverflowError:
+            pass
+    elif all(type(v) is float for v in present):
+        return np.asarray([np.nan if v is None else v for v in cleaned], dtype=np.float64), 'float'
+    elif all(type(v) is str for v in present):
+        return np.asarray(['' if v is None else v for v in cleaned], dtype=np.str_), 'str'
+    return np.asarray([json.dumps(v, ensure_ascii=False) for v in cleaned], dtype=np.str_), 'json'
+
+def _array_to_column(array, kind=None):
+    """저장된 배열을 테이블 컬럼 리스트로 복원 (빈 값은 None, kind가 없으면 이전 형식)"""
+    if kind == 'json':
+        return [json.loads(v) for v in array.tolist()]
+    if array.dtype.kind == 'f':
+        return [None if np.isnan(v) else v for v in array.tolist()]
+    if array.dtype.kind == 'U':
+        return [v if v != '' else None for v in array.tolist()]
+    return array.tolist()
+
+def _numeric_column(array, kind=None):
+    """분석용 실수 배열 (숫자 배열은 그대로, 문자열/JSON 컬럼은 숫자로 변환 가능한 값만 사용)"""
+    if array.dtype.kind in 'fiu':
+        return array
+    values = _array_to_column(array, kind)
+    return np.asarray(pd.to_numeric(pd.Series(values, dtype=object), errors='coerce'), dtype=float)
+
+def write_dataset_storage(owner, dataset):
+    """데이터셋을 저장소에 기록하고 (storage_id, 메타데이터) 반환"""
+    evict_stale_dataset_storage()
+    storage_id = uuid.uuid4().hex
+    target_dir = _dataset_dir(owner, storage_id)
+    tmp_dir = target_dir + '.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+    
+    table_data = dataset.get('table_data', {})
+    columns = []
+    for i, (name, values) in enumerate(table_data.items()):
+        filename = f'col_{i}.npy'
+        array, kind = _column_to_array(name, values)
+        np.save(os.path.join(tmp_dir, filename), array)
+        columns.append({'name': name, 'file': filename, 'dtype': array.dtype.str, 'kind': kind})
+    
+    meta = {key: value for key, value in dataset.items() if key not in ('table_data', 'trend_log')}
+    meta['columns'] = columns
+    meta['data_count'] = len(table_data.get('No.', []))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    
+    os.replace(tmp_dir, target_dir)
+    return storage_id, meta
+
+def read_dataset_meta(owner, storage_id):
+    """데이터셋 메타데이터만 읽기 (테이블 데이터는 읽지 않음)"""
+    with open(os.path.join(_dataset_dir(owner, storage_id), 'meta.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def read_dataset_columns(owner, storage_id, names=None, meta=None):
+    """데이터셋 컬럼을 메모리 매핑 배열로 읽기 (names가 없으면 전체 컬럼)"""
+    meta = meta or read_dataset_meta(owner, storage_id)
+    directory = _dataset_dir(owner, storage_id)
+    columns = {}
+    for column in meta['columns']:
+        if names is None or column['name'] in names:
+            columns[column['name']] = np.load(os.path.join(directory, column['file']), mmap_mode='r')
+    return columns
+
+def read_dataset_storage(owner, storage_id):
+    """저장소에서 전체 데이터셋(메타데이터 + 테이블)을 세션 형식으로 복원"""
+    meta = read_dataset_meta(owner, storage_id)
+    columns = read_dataset_columns(owner, storage_id, meta=meta)
+    dataset = {key: value for key, value in meta.items() if key not in ('columns', 'data_count')}
+    kinds = {column['name']: column.get('kind') for column in meta['columns']}
+    dataset['table_data'] = {name: _array_to_column(array, kinds[name]) for name, array in columns.items()}
+    return dataset
+
+def delete_dataset_storage(owner, storage_id):
+    shutil.rmtree(_dataset_dir(owner, storage_id), ignore_errors=True)
+
+def get_saved_dataset_columns(entry, names):
+    """저장된 데이터셋 항목에서 컬럼 배열 가져오기 (이전 형식의 세션 내 테이블도 지원)"""
+    if 'storage_id' in entry:
+        owner = get_storage_owner()
+        meta = read_dataset_meta(owner, entry['storage_id'])
+        kinds = {column['name']: column.get('kind') for column in meta['columns']}
+        columns = read_dataset_columns(owner, entry['storage_id'], names, meta=meta)
+        return {name: _numeric_column(array, kinds[name]) for name, array in columns.items()}
+    table_data = entry.get('table_data', {})
+    return {name: np.asarray(pd.to_numeric(pd.Series(table_data[name], dtype=object), errors='coerce'),
+                             dtype=float)
+            for name in names if name in table_data}
+
+# 데이터셋 비교용 요약 (변수별 정렬된 유효값 + 모멘트), 저장소 데이터셋은 디렉터리에 캐시
+COMPARE_VARIABLES = ['Size(nm)', 'PI']
+DATASET_SUMMARY_FILE = 'summary.npz'
+
+def _build_dataset_summary(columns):
+    sizes = np.asarray(columns['Size(nm)'], dtype=float)
+    pis = np.asarray(columns['PI'], dtype=float)
+    valid = np.isfinite(sizes) & np.isfinite(pis)
+    return {'Size(nm)': np.sort(sizes[valid]), 'PI': np.sort(pis[valid])}
+
+def get_dataset_summary(entry):
+    """비교용 정렬 배열 반환 (저장소 데이터셋은 최초 1회 계산 후 summary.npz 재사용, 읽을 수 없으면 None)"""
+    if 'storage_id' not in entry:
+        columns = get_saved_dataset_columns(entry, COMPARE_VARIABLES)
+        if len(columns) < len(COMPARE_VARIABLES):
+            return None
+        return _build_dataset_summary(columns)
+    
+    # 저장소는 저장 후 변경되지 않으므로(덮어쓰기 시 새 storage_id) 캐시 무효화 불필요
+    directory = _dataset_dir(get_storage_owner(), entry['storage_id'])
+    if not os.path.isdir(directory):
+        # 저장소 디렉터리가 정리(만료)된 경우
+        return None
+    path = os.path.join(directory, DATASET_SUMMARY_FILE)
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return {name: cached[f'v{i}'] for i, name in enumerate(COMPARE_VARIABLES)}
+    
+    columns = get_saved_dataset_columns(entry, COMPARE_VARIABLES)
+    if len(columns) < len(COMPARE_VARIABLES):
+        return None
+    summary = _build_dataset_summary(columns)
+    tmp_path = os.path.join(directory, f'summary.{uuid.uuid4().hex}.tmp.npz')
+    np.savez(tmp_path, **{f'v{i}': summary[name] for i, name in enumerate(COMPARE_VARIABLES)})
+    os.replace(tmp_path, path)
+    return summary
+
+def _welch_matrix(sorted_arrays):
+    """모멘트(개수/평균/분산)만으로 Welch t-검정 N×N 행렬"""
+    n = np.array([len(a) for a in sorted_arrays], dtype=float)
+    mean = np.array([a.mean() if len(a) else np.nan for a in sorted_arrays])
+    var = np.array([a.var(ddof=1) if len(a) > 1 else np.nan for a in sorted_arrays])
+    se2 = var / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (mean[:, None] - mean[None, :]) / np.sqrt(se2[:, None] + se2[None, :])
+        df = (se2[:, None] + se2[None, :]) ** 2 / (
+            se2[:, None] ** 2 / (n[:, None] - 1) + se2[None, :] ** 2 / (n[None, :] - 1))
+    p = 2 * stats.t.sf(np.abs(t), df)
+    return t, p
+
+def _rank_statistics(a, b):
+    """정렬된 두 표본의 Mann-Whitney U, U의 표준편차(동순위 보정), KS 통계량
+    두 배열을 한 번 병합한 뒤 동순위 구간별 누적 개수로 평균 순위와 경험적 분포함수를 함께 계산"""
+    na, nb = len(a), len(b)
+    total = na + nb
+    merged = np.concatenate([a, b])
+    # 안정 정렬(timsort)은 이미 정렬된 두 구간을 찾아 선형 병합만 수행 (같은 값은 a가 앞)
+    # searchsorted로 병합 위치를 직접 계산하는 방식보다 빠름 (5,000점 쌍 기준 약 3배)
+    order = np.argsort(merged, kind='stable')
+    from_a = order < na
+    values = merged[order]
+    
+    # 동순위 구간의 끝 위치와 구간별 누적 개수
+    ends = np.append(np.flatnonzero(np.diff(values)), total - 1)
+    cum_a = np.cumsum(from_a)[ends]
+    cum_b = ends + 1 - cum_a
+    sizes = np.diff(ends, prepend=-1)
+    count_a = np.diff(cum_a, prepend=0)
+    
+    # 구간 평균 순위(1부터) = 구간 끝 순위 - (구간 크기 - 1)/2
+    rank_sum_a = (count_a * (ends + 1 - (sizes - 1) / 2)).sum()
+    u = rank_sum_a - na * (na + 1) / 2
+    tie_term = (sizes ** 3 - sizes).sum() / (total * (total - 1))
+    sigma = np.sqrt(na * nb / 12 * ((total + 1) - tie_term))
+    
+    d = np.abs(cum_a / na - cum_b / nb).max()
+    return float(u), float(sigma), float(d)
+
+def comparison_matrix(summaries):
+    """데이터셋 요약 목록으로 변수별 Welch t / Mann-Whitney / KS N×N 행렬 계산
+    쌍별로는 통계량만 구하고 p값(정규 근사 / 점근 KS 분포)은 행렬 단위로 한 번에 계산"""
+    count = len(summaries)
+    sizes = np.array([len(summary['Size(nm)']) for summary in summaries], dtype=float)
+    n1, n2 = sizes[:, None] * np.ones(count), np.ones(count)[:, None] * sizes
+    result = {}
+    for variable in COMPARE_VARIABLES:
+        arrays = [summary[variable] for summary in summaries]
+        welch_t, welch_p = _welch_matrix(arrays)
+        mw_u = n1 * n2 / 2
+        mw_sigma = np.zeros((count, count))
+        ks_d = np.zeros((count, count))
+        for i in range(count):
+            for j in range(i + 1, count):
+                u, sigma, d = _rank_statistics(arrays[i], arrays[j])
+                mw_u[i, j], mw_u[j, i] = u, n1[i, j] * n2[i, j] - u
+                mw_sigma[i, j] = mw_sigma[j, i] = sigma
+                ks_d[i, j] = ks_d[j, i] = d
+        
+        # 양측 검정, 연속성 보정 (scipy mannwhitneyu/ks_2samp 점근 방식과 동일)
+        u_big = np.maximum(mw_u, n1 * n2 - mw_u)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mw_p = np.where(mw_sigma > 0, 2 * stats.norm.sf((u_big - n1 * n2 / 2 - 0.5) / mw_sigma), 1.0)
+        ks_p = stats.kstwo.sf(ks_d, np.round(n1 * n2 / (n1 + n2)))
+        np.fill_diagonal(welch_t, 0.0)
+        np.fill_diagonal(welch_p, 1.0)
+        result[variable] = {
+            'welch_t': {'statistic': welch_t, 'p_value': welch_p},
+            'mann_whitney': {'statistic': mw_u, 'p_value': np.clip(mw_p, 0.0, 1.0)},
+            'ks': {'statistic': ks_d, 'p_value': np.clip(ks_p, 0.0, 1.0)}
+        }
+    return result
+
+# 분포(히스토그램 + KDE) 설정
+DISTRIBUTION_DEFAULT_BINS = 40
+DISTRIBUTION_MAX_BINS = 200
+KDE_GRID_POINTS = 512
+
+def binned_kde(values, grid_points=KDE_GRID_POINTS):
+    """가우시안 KDE를 격자 선형 binning + FFT 합성곱으로 계산 - O(n + G log G)
+    대역폭은 Silverman 규칙 (0.9 × min(표준편차, IQR/1.34) × n^-1/5)"""
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    q1, q3 = np.percentile(values, [25, 75]) if n else (0.0, 0.0)
+    spread = min(std, (q3 - q1) / 1.34) if q3 > q1 else std
+    if n < 2 or spread <= 0:
+        return None
+    bandwidth = 0.9 * spread * n ** (-0.2)
+    
+    low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    grid = np.linspace(low, high, grid_points)
+    dx = grid[1] - grid[0]
+    
+    # 선형 binning: 각 값을 인접한 두 격자점에 거리 비율로 배분
+    position = (values - low) / dx
+    left = np.clip(np.floor(position).astype(np.int64), 0, grid_points - 2)
+    frac = position - left
+    weights = np.bincount(left, weights=1 - frac, minlength=grid_points)
+    weights += np.bincount(left + 1, weights=frac, minlength=grid_points)
+    weights /= n
+    
+    # 커널을 격자 간격으로 샘플링 후 FFT 합성곱 (순환 방지를 위해 0 채움)
+    offsets = np.arange(-(grid_points - 1), grid_points) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = 1 << int(np.ceil(np.log2(len(weights) + len(kernel) - 1)))
+    density = np.fft.irfft(np.fft.rfft(weights, size) * np.fft.rfft(kernel, size), size)
+    density = np.maximum(density[grid_points - 1:2 * grid_points - 1], 0.0)
+    return {'x': grid.tolist(), 'y': density.tolist(), 'bandwidth': float(bandwidth)}
+
+def distribution_summary(sizes, pis, bins=DISTRIBUTION_DEFAULT_BINS):
+    """Size(nm)/PI 히스토그램과 KDE 곡선"""
+    summary = {'count': int(len(sizes))}
+    for name, values in (('Size(nm)', sizes), ('PI', pis)):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            summary[name] = None
+            continue
+        counts, edges = np.histogram(values, bins=bins)
+        summary[name] = {
+            'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+            'kde': binned_kde(values)
+        }
+    return summary
+
+def get_saved_distribution(entry, bins):
+    """저장된 데이터셋의 분포 (저장소 데이터셋은 bins별로 디렉터리에 캐시, 데이터를 읽을 수 없으면 None)
+    유효값 기준은 두 경로 모두 get_dataset_summary와 같음 (Size(nm)/PI가 모두 유한한 행)"""
+    if 'storage_id' not in entry:
+        summary = get_dataset_summary(entry)
+        if summary is None:
+            return None
+        return distribution_summary(summary['Size(nm)'], summary['PI'], bins)
+    
+    directory = _dataset_dir(get_storage_owner(), entry['storage_id'])
+    path = os.path.join(directory, f'distribution_{bins}.json')
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    summary = get_dataset_summary(entry)
+    if summary is None:
+        return None
+    distribution = distribution_summary(summary['Size(nm)'], summary['PI'], bins)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(distribution, f)
+    os.replace(tmp_path, path)
+    return distribution
+
+def _matrix_to_list(matrix):
+    """JSON 직렬화용 (NaN/inf → None)"""
+    return [[float(v) if np.isfinite(v) else None for v in row] for row in matrix]
+
+# 저장된 데이터셋 목록용 메타데이터 인덱스 (세션 내 유지, 저장/삭제 시 갱신)
+# records: 이름별 메타데이터, by_name: 이름 정렬 목록, by_date: [생산일자, 이름] 정렬 목록
+DATASET_INDEX_FIELDS = ['sample_name', 'production_date', 'pass_count', 'saved_at', 'data_count']
+
+def _index_date_key(record):
+    # 생산일자가 없으면 마지막에 배치
+    return record['production_date'] or '9999-12-31'
+
+def _dataset_index_record(entry):
+    record = {key: entry.get(key, '') for key in DATASET_INDEX_FIELDS}
+    record['pass_count'] = entry.get('pass_count', 1)
+    if 'data_count' not in entry:
+        record['data_count'] = len(entry.get('table_data', {}).get('No.', []))
+    return record
+
+def get_dataset_index():
+    """데이터셋 메타데이터 인덱스 반환 (없거나 세션과 어긋나면 재구성)"""
+    datasets = session.get('datasets', {})
+    index = session.get('dataset_index')
+    if index is None or len(index['records']) != len(datasets):
+        records = {name: _dataset_index_record(entry) for name, entry in datasets.items()}
+        index = {
+            'records': records,
+            'by_name': sorted(records),
+            'by_date': sorted([_index_date_key(record), name] for name, record in records.items())
+        }
+        session['dataset_index'] = index
+        session.modified = True
+    return index
+
+def dataset_index_add(name, entry):
+    index = get_dataset_index()
+    if name in index['records']:
+        dataset_index_remove(name)
+    record = _dataset_index_record(entry)
+    index['records'][name] = record
+    bisect.insort(index['by_name'], name)
+    bisect.insort(index['by_date'], [_index_date_key(record), name])
+    session.modified = True
+
+def dataset_index_remove(name):
+    index = get_dataset_index()
+    record = index['records'].pop(name, None)
+    if record is None:
+        return
+    del index['by_name'][bisect.bisect_left(index['by_name'], name)]
+    del index['by_date'][bisect.bisect_left(index['by_date'], [_index_date_key(record), name])]
+    session.modified = True
+
+def store_dataset(dataset_name, dataset):
+    """데이터셋을 저장소에 기록하고 세션/인덱스에 메타데이터 레코드 등록 (같은 이름은 덮어씀)"""
+    if 'datasets' not in session:
+        session['datasets'] = {}
+    
+    # 현재 시간 추가
+    save_data = dataset.copy()
+    save_data['saved_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # 테이블은 디스크 저장소에 기록하고 세션에는 메타데이터 레코드만 보관
+    owner = get_storage_owner()
+    storage_id, meta = write_dataset_storage(owner, save_data)
+    
+    previous = session['datasets'].get(dataset_name)
+    if previous and 'storage_id' in previous:
+        delete_dataset_storage(owner, previous['storage_id'])
+    
+    record = {key: meta.get(key) for key in DATASET_META_KEYS}
+    record['data_count'] = meta['data_count']
+    record['storage_id'] = storage_id
+    dataset_index_add(dataset_name, record)
+    session['datasets'][dataset_name] = record
+    session.modified = True
+    return record
+
+def query_dataset_index(prefix='', sort=None, order='asc', offset=0, limit=None):
+    """인덱스에서 이름 접두어 검색 + 정렬 + 페이지 조회 (반환: 전체 개수, 페이지 목록)"""
+    index = get_dataset_index()
+    
+    if prefix:
+        lo = bisect.bisect_left(index['by_name'], prefix)
+        hi = bisect.bisect_left(index['by_name'], prefix + '\U0010ffff')
+        matched = index['by_name'][lo:hi]
+    else:
+        matched = None
+    
+    if sort == 'production_date':
+        names = [name for _, name in index['by_date']]
+        if matched is not None:
+            matched_set = set(matched)
+            names = [name for name in names if name in matched_set]
+    elif sort == 'name':
+        names = matched if matched is not None else index['by_name']
+    else:
+        # 기본: 저장 순서
+        names = [name for name in session.get('datasets', {})
+                 if matched is None or name.startswith(prefix)]
+    
+    if order == 'desc':
+        names = names[::-1]
+    
+    total = len(names)
+    page = names[offset:offset + limit] if limit is not None else names[offset:]
+    return total, [dict(name=name, **index['records'][name]) for name in page]
+
+# 실험군/대조군 항목의 숫자 속성 (점도 측정값은 viscosity_data에서 펼침)
+PASS_NUMERIC_ATTRIBUTES = ['size_avg', 'pi_avg', 'custom_data_value', 'viscosity', 'temperature', 'shear_rate']
+PASS_VISCOSITY_ATTRIBUTES = ['viscosity', 'temperature', 'shear_rate']
+PASS_ATTRIBUTE_LABELS = {
+    'size_avg': 'Size(nm)', 'pi_avg': 'PI', 'viscosity': '점도', 'temperature': '온도', 'shear_rate': '전단 속도'
+}
+
+def pass_entries_frame(pass_averages):
+    """실험군/대조군 항목 목록을 컬럼형 DataFrame으로 변환 (숫자 속성은 float, 없는 값은 NaN)"""
+    frame = pd.DataFrame({
+        'sample_name': [entry.get('sample_name') for entry in pass_averages],
+        'group_type': [entry.get('group_type', 'experimental') for entry in pass_averages],
+        'production_date': [entry.get('production_date') for entry in pass_averages],
+        'timestamp': [entry.get('timestamp', '') for entry in pass_averages]
+    }, dtype=object)
+    for key in PASS_NUMERIC_ATTRIBUTES:
+        if key in PASS_VISCOSITY_ATTRIBUTES:
+            values = [(entry.get('viscosity_data') or {}).get(key) for entry in pass_averages]
+        else:
+            values = [entry.get(key) for entry in pass_averages]
+        frame[key] = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype(float)
+    return frame
+
+def _pairwise_pearson(stack):
+    """(k, k, n) 배열의 [i, j]와 [j, i] 행 사이 피어슨 상관계수 (NaN은 제외, 반환: 상관계수, 표본 수)"""
+    valid = ~np.isnan(stack)
+    counts = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(valid, stack, 0).sum(axis=-1, keepdims=True) / counts[..., None]
+        centered = np.where(valid, stack - means, 0)
+        cov = (centered * centered.transpose(1, 0, 2)).sum(axis=-1)
+        var = (centered * centered).sum(axis=-1)
+        r = np.clip(cov / np.sqrt(var * var.T), -1, 1)
+    r[(counts < 3) | ~(var > 0) | ~(var.T > 0)] = np.nan
+    return r, counts
+
+def _correlation_p_values(r, counts):
+    """상관계수 유의확률 (t 분포, 자유도 n - 2)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt((counts - 2) / np.clip(1 - r ** 2, 1e-300, None))
+        p = 2 * stats.t.sf(np.abs(t), np.maximum(counts - 2, 1))
+    p[np.isnan(r)] = np.nan
+    return p
+
+def correlation_matrices(values):
+    """열별 쌍 완전 사례(pairwise-complete) 피어슨/스피어만 상관 행렬
+    
+    values: (n, k) 배열 (NaN = 결측). 모든 열 쌍을 (k, k, n) 배열 하나로 만들어
+    쌍마다 두 값이 모두 있는 행만 남긴 뒤, 스피어만은 그 행들 안에서 순위를 매겨 한 번에 계산
+    """
+    columns = np.asarray(values, dtype=float).T
+    present = ~np.isnan(columns)
+    pair_rows = present[:, None, :] & present[None, :, :]
+    stack = np.where(pair_rows, columns[:, None, :], np.nan)
+    pearson, counts = _pairwise_pearson(stack)
+    spearman, _ = _pairwise_pearson(stats.rankdata(stack, axis=-1, nan_policy='omit'))
+    return {
+        'n': counts.tolist(),
+        'pearson': _matrix_to_list(pearson),
+        'pearson_p': _matrix_to_list(_correlation_p_values(pearson, counts)),
+        'spearman': _matrix_to_list(spearman),
+        'spearman_p': _matrix_to_list(_correlation_p_values(spearman, counts))
+    }
+
+# 사용자 정의 값 상관관계 차트에서 color_mode=auto일 때 날짜별 트레이스를 만드는 최대 날짜 수
+CUSTOM_CORRELATION_MAX_DATE_TRACES = 20
+
+def grouped_linear_fits(frame, group_column, x_column, y_column):
+    """그룹별 단순 선형 회귀 (groupby 합계로 한 번에 계산, 점 2개 미만 또는 x 분산 0인 그룹 제외)"""
+    x = frame[x_column].to_numpy(dtype=float)
+    y = frame[y_column].to_numpy(dtype=float)
+    sums = pd.DataFrame({'group': frame[group_column].to_numpy(), 'n': 1, 'x': x, 'y': y,
+                         'xx': x * x, 'xy': x * y, 'yy': y * y}).groupby('group', sort=True)
+    totals = sums.sum()
+    x_range = sums['x'].agg(['min', 'max'])
+    n = totals['n']
+    sxx = totals['xx'] - totals['x'] ** 2 / n
+    sxy = totals['xy'] - totals['x'] * totals['y'] / n
+    syy = totals['yy'] - totals['y'] ** 2 / n
+    fits = []
+    for group in totals.index[(n >= 2) & (sxx > 0)]:
+        slope = sxy[group] / sxx[group]
+        intercept = (totals['y'][group] - slope * totals['x'][group]) / n[group]
+        r = sxy[group] / np.sqrt(sxx[group] * syy[group]) if syy[group] > 0 else None
+        fits.append({'group': group, 'n': int(n[group]), 'slope': float(slope), 'intercept': float(intercept),
+                     'r': float(r) if r is not None else None,
+                     'x_min': float(x_range['min'][group]), 'x_max': float(x_range['max'][group])})
+    return fits
+
+def add_fit_traces(fig, fits, colors, single_trace=False):
+    """회귀선 표시 (single_trace면 모든 선분을 None으로 끊어 트레이스 1개로)"""
+    if single_trace:
+        xs, ys = [], []
+        for fit in fits:
+            xs += [fit['x_min'], fit['x_max'], None]
+            ys += [fit['intercept'] + fit['slope'] * fit['x_min'], fit['intercept'] + fit['slope'] * fit['x_max'], None]
+        fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', name='회귀선',
+                                 line=dict(color='gray', width=2, dash='dash'), hoverinfo='skip'))
+        return
+    for fit in fits:
+        fig.add_trace(go.Scatter(
+            x=[fit['x_min'], fit['x_max']],
+            y=[fit['intercept'] + fit['slope'] * fit['x_min'], fit['intercept'] + fit['slope'] * fit['x_max']],
+            mode='lines',
+            name=f"{fit['group']} 회귀선",
+            legendgroup=fit['group'],
+            showlegend=False,
+            line=dict(color=colors.get(fit['group'], 'red'), width=2, dash='dash'),
+            hovertemplate=f"{fit['group']}: y = {fit['slope']:.4g}x + {fit['intercept']:.4g}<extra></extra>"
+        ))
+
+# 관리도(SPC) 설정
+# 부분군 크기별 관리도 상수 (d2: 범위→시그마, D3/D4: R 관리도 하한/상한 계수)
+SPC_CONSTANTS = {
+    2: (1.128, 0.0, 3.267), 3: (1.693, 0.0, 2.574), 4: (2.059, 0.0, 2.282), 5: (2.326, 0.0, 2.114),
+    6: (2.534, 0.0, 2.004), 7: (2.704, 0.076, 1.924), 8: (2.847, 0.136, 1.864), 9: (2.970, 0.184, 1.816),
+    10: (3.078, 0.223, 1.777)
+}
+SPC_MAX_SUBGROUP = 10
+# Nelson 규칙 (Western Electric 규칙 1, 5, 6, 8 포함)
+SPC_RULES = {
+    1: '1점이 3σ 밖',
+    2: '9점 연속 중심선 한쪽',
+    3: '6점 연속 증가 또는 감소',
+    4: '14점 연속 교대로 증감',
+    5: '3점 중 2점이 같은 쪽 2σ 밖',
+    6: '5점 중 4점이 같은 쪽 1σ 밖',
+    7: '15점 연속 1σ 이내',
+    8: '8점 연속 1σ 밖 (양쪽)'
+}
+
+def _run_lengths(cond):
+    """각 위치에서 끝나는 연속 True 구간 길이"""
+    index = np.arange(len(cond))
+    last_false = np.maximum.accumulate(np.where(cond, -1, index))
+    return index - last_false
+
+def _expand_windows(ends, window, n):
+    """규칙을 만족한 구간 끝 위치들로부터 구간 전체(window개 점)를 표시한 마스크"""
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, np.maximum(ends - window + 1, 0), 1)
+    np.add.at(marks, ends + 1, -1)
+    return np.cumsum(marks[:n]) > 0
+
+def _count_window_ends(cond, window, required):
+    """길이 window 구간 안에 cond가 required개 이상인 구간의 끝 위치"""
+    if len(cond) < window:
+        return np.empty(0, dtype=np.int64)
+    counts = sliding_window_view(cond.astype(np.int8), window).sum(axis=1)
+    return np.flatnonzero(counts >= required) + window - 1
+
+def evaluate_spc_rules(values, center, sigma, rules=None):
+    """Nelson 규칙 평가 (반환: 규칙 번호별 위반 점 인덱스 목록, 구간 규칙은 구간 내 모든 점)"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    rules = sorted(SPC_RULES) if rules is None else rules
+    violations = {}
+    if n == 0 or not sigma > 0:
+        return {rule: [] for rule in rules}
+    z = (values - center) / sigma
+    above, below = z > 0, z < 0
+    diffs = np.diff(values)
+    
+    for rule in rules:
+        if rule == 1:
+            mask = np.abs(z) > 3
+        elif rule == 2:
+            ends = np.flatnonzero((_run_lengths(above) >= 9) | (_run_lengths(below) >= 9))
+            mask = _expand_windows(ends, 9, n)
+        elif rule == 3:
+            # 5개 연속 증가/감소 구간 = 6점
+            ends = np.flatnonzero((_run_lengths(diffs > 0) >= 5) | (_run_lengths(diffs < 0) >= 5)) + 1
+            mask = _expand_windows(ends, 6, n)
+        elif rule == 4:
+            # 인접한 증감 부호가 12번 연속 바뀜 = 14점
+            alternating = diffs[1:] * diffs[:-1] < 0
+            ends = np.flatnonzero(_run_lengths(alternating) >= 12) + 2
+            mask = _expand_windows(ends, 14, n)
+        elif rule == 5:
+            ends = np.union1d(_count_window_ends(z > 2, 3, 2), _count_window_ends(z < -2, 3, 2))
+            mask = _expand_windows(ends, 3, n)
+        elif rule == 6:
+            ends = np.union1d(_count_window_ends(z > 1, 5, 4), _count_window_ends(z < -1, 5, 4))
+            mask = _expand_windows(ends, 5, n)
+        elif rule == 7:
+            ends = np.flatnonzero(_run_lengths(np.abs(z) < 1) >= 15)
+            mask = _expand_windows(ends, 15, n)
+        elif rule == 8:
+            ends = np.flatnonzero(_run_lengths(np.abs(z) > 1) >= 8)
+            mask = _expand_windows(ends, 8, n)
+        else:
+            raise ValueError(f'알 수 없는 관리도 규칙입니다: {rule}')
+        violations[rule] = np.flatnonzero(mask).tolist()
+    return violations
+
+def process_capability(values, sigma_within, lsl=None, usl=None):
+    """공정 능력 지수: Cp/Cpk(군내 시그마), Pp/Ppk(전체 표준편차), 한쪽 규격이면 해당 쪽만 계산"""
+    values = np.asarray(values, dtype=float)
+    if (lsl is None and usl is None) or len(values) < 2:
+        return None
+    mean = float(values.mean())
+    sigma_overall = float(values.std(ddof=1))
+    capability = {'lsl': lsl, 'usl': usl, 'sigma_within': sigma_within, 'sigma_overall': sigma_overall}
+    for prefix, sigma in (('c', sigma_within), ('p', sigma_overall)):
+        if not sigma > 0:
+            capability[f'{prefix}p'] = capability[f'{prefix}pk'] = None
+            continue
+        sides = []
+        if usl is not None:
+            sides.append((usl - mean) / (3 * sigma))
+        if lsl is not None:
+            sides.append((mean - lsl) / (3 * sigma))
+        capability[f'{prefix}p'] = (usl - lsl) / (6 * sigma) if lsl is not None and usl is not None else None
+        capability[f'{prefix}pk'] = float(min(sides))
+    out_of_spec = np.zeros(len(values), dtype=bool)
+    if lsl is not None:
+        out_of_spec |= values < lsl
+    if usl is not None:
+        out_of_spec |= values > usl
+    capability['out_of_spec'] = int(out_of_spec.sum())
+    return capability
+
+def spc_analysis(values, subgroup_size=1, lsl=None, usl=None, rules=None):
+    """관리도 계산: 부분군 크기 1이면 I-MR, 2 이상이면 X̄-R (연속된 값을 부분군으로 묶고 나머지는 제외)"""
+    values = np.asarray(values, dtype=float)
+    if subgroup_size < 1 or subgroup_size > SPC_MAX_SUBGROUP:
+        raise ValueError(f'부분군 크기는 1~{SPC_MAX_SUBGROUP} 사이여야 합니다.')
+    
+    if subgroup_size == 1:
+        if len(values) < 2:
+            return None
+        points = values
+        moving_range = np.abs(np.diff(values))
+        range_bar = float(moving_range.mean())
+        d2, d3, d4 = SPC_CONSTANTS[2]
+        sigma_within = range_bar / d2
+        sigma_points = sigma_within
+        chart_type = 'I-MR'
+        ranges = moving_range
+    else:
+        groups = len(values) // subgroup_size
+        if groups < 2:
+            return None
+        subgroups = values[:groups * subgroup_size].reshape(groups, subgroup_size)
+        points = subgroups.mean(axis=1)
+        ranges = np.ptp(subgroups, axis=1)
+        range_bar = float(ranges.mean())
+        d2, d3, d4 = SPC_CONSTANTS[subgroup_size]
+        sigma_within = range_bar / d2
+        sigma_points = sigma_within / np.sqrt(subgroup_size)
+        chart_type = 'Xbar-R'
+    
+    center = float(points.mean())
+    violations = evaluate_spc_rules(points, center, sigma_points, rules)
+    flagged = sorted(set().union(*violations.values())) if violations else []
+    return {
+        'chart_type': chart_type,
+        'subgroup_size': subgroup_size,
+        'points': points.tolist(),
+        'center': center,
+        'ucl': center + 3 * sigma_points,
+        'lcl': center - 3 * sigma_points,
+        'sigma': sigma_points,
+        'range': {
+            'values': ranges.tolist(),
+            'center': range_bar,
+            'ucl': d4 * range_bar,
+            'lcl': d3 * range_bar
+        },
+        'violations': {str(rule): indices for rule, indices in violations.items()},
+        'flagged_points': flagged,
+        'capability': process_capability(values, sigma_within, lsl, usl)
+    }
+
+def parse_spc_options(args, prefix):
+    """관리도 요청 옵션 파싱 (규격 한계는 <prefix>_lsl/<prefix>_usl, 빈 값은 미지정)"""
+    def optional_float(key):
+        value = args.get(key)
+        return float(value) if value not in (None, '') else None
+    lsl, usl = optional_float(f'{prefix}_lsl'), optional_float(f'{prefix}_usl')
+    if lsl is not None and usl is not None and lsl >= usl:
+        raise ValueError('규격 하한은 상한보다 작아야 합니다.')
+    rules = args.get('rules')
+    rules = [int(rule) for rule in str(rules).split(',') if rule.strip()] if rules else None
+    return {'subgroup_size': int(args.get('subgroup_size', 1)), 'lsl': lsl, 'usl': usl, 'rules': rules}
+
+def linear_trend(values):
+    """순서 대비 선형 회귀 기울기와 기울기 유의확률 (값이 모두 같으면 p=1)"""
+    values = np.asarray(values, dtype=float)
+    if np.ptp(values) == 0:
+        return 0.0, 1.0
+    result = stats.linregress(np.arange(len(values)), values)
+    return float(result.slope), float(result.pvalue)
+
+def add_spc_traces(fig, spc, x_values, label):
+    """트렌드 차트에 관리 한계선/규격선과 규칙 위반 점 표시"""
+    if spc is None:
+        return
+    if spc['subgroup_size'] > 1:
+        # X̄ 관리도는 부분군 평균을 부분군 마지막 점 위치에 표시
+        x_values = x_values[spc['subgroup_size'] - 1::spc['subgroup_size']][:len(spc['points'])]
+        fig.add_trace(go.Scatter(x=x_values, y=spc['points'], mode='lines+markers', name=f'{label} X̄',
+                                 line=dict(color='purple', width=2, dash='dot')))
+    for name, value, dash in (('CL', spc['center'], 'solid'), ('UCL', spc['ucl'], 'dash'), ('LCL', spc['lcl'], 'dash')):
+        fig.add_hline(y=value, line=dict(color='gray', width=1, dash=dash),
+                      annotation_text=f'{name} {value:.3f}', annotation_position='right')
+    capability = spc['capability'] or {}
+    for name in ('lsl', 'usl'):
+        if capability.get(name) is not None:
+            fig.add_hline(y=capability[name], line=dict(color='crimson', width=1, dash='dashdot'),
+                          annotation_text=f'{name.upper()} {capability[name]:g}', annotation_position='left')
+    flagged = spc['flagged_points']
+    if flagged:
+        rules_by_point = {}
+        for rule, indices in spc['violations'].items():
+            for index in indices:
+                rules_by_point.setdefault(index, []).append(rule)
+        fig.add_trace(go.Scatter(
+            x=[x_values[i] for i in flagged],
+            y=[spc['points'][i] for i in flagged],
+            mode='markers',
+            name=f'{label} 규칙 위반',
+            marker=dict(size=14, color='rgba(0,0,0,0)', line=dict(color='red', width=2)),
+            hovertext=[f"규칙 {', '.join(rules_by_point[i])}" for i in flagged],
+            hovertemplate='%{hovertext}<extra></extra>'
+        ))
+
+# 트렌드 차트 증분 갱신: 실험군/대조군 항목 추가·삭제를 데이터셋별 변경 로그에 기록하고
+# 클라이언트는 마지막으로 받은 버전 이후의 점 추가/삭제만 받아 Plotly.extendTraces/react로 반영
+TREND_LOG_MAX_OPS = 200
+TREND_MOMENT_KEYS = ('n', 's', 'p', 'ss', 'pp', 'sp')
+
+def trend_sort_key(entry):
+    """트렌드 차트 정렬 기준 (생산일자, 샘플명), 생산일자가 없으면 마지막에 배치"""
+    production_date = entry.get('production_date')
+    return (production_date if production_date else '9999-12-31', entry.get('sample_name', ''))
+
+def trend_hover_text(entry, label, value):
+    return f"샘플명: {entry.get('sample_name', '')}<br>생산일자: {entry.get('production_date') or '미지정'}<br>{label}: {value:.3f}"
+
+def _update_trend_moments(moments, entry, sign):
+    size, pi = entry['size_avg'], entry['pi_avg']
+    for key, value in zip(TREND_MOMENT_KEYS, (1, size, pi, size * size, pi * pi, size * pi)):
+        moments[key] += sign * value
+
+def _new_trend_log(pass_averages):
+    """새 id의 빈 변경 로그 (항목은 pass_averages 순서대로 trend_id 1, 2, ... 기준으로 누적 합계 반영)"""
+    log = {'id': uuid.uuid4().hex[:8], 'version': 0, 'base': 0, 'next_id': len(pass_averages) + 1, 'ops': [],
+           'moments': dict.fromkeys(TREND_MOMENT_KEYS, 0.0)}
+    for entry in pass_averages:
+        _update_trend_moments(log['moments'], entry, 1)
+    return log
+
+def ensure_trend_log(current_dataset):
+    """현재 데이터셋의 트렌드 변경 로그 (없으면 새로 만들고 기존 항목에 trend_id 부여)
+    세션을 변경하므로 데이터 버전을 올리는 라우트(@mutates_data)에서만 호출"""
+    log = current_dataset.get('trend_log')
+    if log is None:
+        pass_averages = current_dataset.get('pass_averages', [])
+        for trend_id, entry in enumerate(pass_averages, 1):
+            entry['trend_id'] = trend_id
+        log = _new_trend_log(pass_averages)
+        current_dataset['trend_log'] = log
+        session.modified = True
+    return log
+
+def get_trend_log(current_dataset):
+    """조회용 트렌드 변경 로그 (세션을 변경하지 않음)
+
+    로그가 아직 없는 세션이면 ensure_trend_log가 만들 것과 같은 trend_id 기준의 임시 로그를 반환
+    (임시 로그 id는 매번 달라지므로 클라이언트는 전체 갱신을 받음)
+    ops는 version이 1씩 증가하는 연속 구간이므로 since 이후 변경은 끝에서부터 잘라 O(변경 수)로 조회
+    """
+    log = current_dataset.get('trend_log')
+    if log is None:
+        log = _new_trend_log(current_dataset.get('pass_averages', []))
+    return log
+
+def trend_ids(current_dataset, entries):
+    """차트 점의 trend_id 목록 (로그가 없는 세션은 ensure_trend_log와 같은 pass_averages 순번)"""
+    if 'trend_log' in current_dataset:
+        return [entry['trend_id'] for entry in entries]
+    positions = {id(entry): index for index, entry in enumerate(current_dataset.get('pass_averages', []), 1)}
+    return [positions[id(entry)] for entry in entries]
+
+def trend_point(entry):
+    """변경 로그에 보관하는 점 (세 차트에 필요한 최소 값, 호버 텍스트는 응답 시 생성)"""
+    return {
+        'id': entry['trend_id'],
+        'sample_name': entry.get('sample_name', ''),
+        'production_date': entry.get('production_date', ''),
+        'size_avg': entry['size_avg'],
+        'pi_avg': entry['pi_avg']
+    }
+
+def trend_op_payload(op):
+    """변경 로그 항목을 응답 형식으로 변환 (추가된 점에 Size/PI 호버 텍스트 포함)"""
+    if op['op'] != 'insert':
+        return op
+    point = dict(op['point'],
+                 size_hovertext=trend_hover_text(op['point'], 'Size(nm)', op['point']['size_avg']),
+                 pi_hovertext=trend_hover_text(op['point'], 'PI', op['point']['pi_avg']))
+    return dict(op, point=point)
+
+def trend_log_record(current_dataset, added=(), removed=()):
+    """항목 추가/삭제를 트렌드 변경 로그에 기록 (pass_averages 반영 후 호출)
+
+    추가는 그룹 내 정렬 위치(index), 삭제는 trend_id로 기록
+    """
+    log = ensure_trend_log(current_dataset)
+    pass_averages = current_dataset.get('pass_averages', [])
+
+    def push(op):
+        log['version'] += 1
+        op['version'] = log['version']
+        log['ops'].append(op)
+
+    for entry in removed:
+        if entry.get('trend_id') is None:
+            continue
+        _update_trend_moments(log['moments'], entry, -1)
+        push({'op': 'remove', 'group': entry.get('group_type', 'experimental'), 'id': entry['trend_id']})
+
+    # 같은 요청에서 추가된 항목은 앞선 항목만 있는 상태 기준으로 위치 계산 (sorted()의 안정 정렬과 동일)
+    pending = {id(entry) for entry in added}
+    for entry in added:
+        pending.discard(id(entry))
+        if entry.get('trend_id') is None:
+            entry['trend_id'] = log['next_id']
+            log['next_id'] += 1
+            _update_trend_moments(log['moments'], entry, 1)
+        group = entry.get('group_type', 'experimental')
+        key = trend_sort_key(entry)
+        index = sum(1 for p in pass_averages
+                    if p is not entry and id(p) not in pending
+                    and p.get('group_type', 'experimental') == group and trend_sort_key(p) <= key)
+        push({'op': 'insert', 'group': group, 'index': index, 'point': trend_point(entry)})
+
+    if len(log['ops']) > TREND_LOG_MAX_OPS:
+        del log['ops'][:-TREND_LOG_MAX_OPS]
+        log['base'] = log['ops'][0]['version'] - 1
+    session.modified = True
+
+def trend_summary(moments):
+    """누적 합계로 요약 통계 계산 (전체 항목 기준, get_pass_trend_data의 통계와 동일한 정의)"""
+    n = moments['n']
+    summary = {'pass_count': int(round(n)), 'size_cv': 0, 'pi_cv': 0, 'correlation': 0}
+    if n < 1:
+        return summary
+    size_mean, pi_mean = moments['s'] / n, moments['p'] / n
+    size_var = max(moments['ss'] / n - size_mean ** 2, 0.0)
+    pi_var = max(moments['pp'] / n - pi_mean ** 2, 0.0)
+    if size_mean:
+        summary['size_cv'] = np.sqrt(size_var) / size_mean * 100
+    if pi_mean:
+        summary['pi_cv'] = np.sqrt(pi_var) / pi_mean * 100
+    if n >= 3 and size_var > 0 and pi_var > 0:
+        summary['correlation'] = (moments['sp'] / n - size_mean * pi_mean) / np.sqrt(size_var * pi_var)
+    return summary
+
+def spc_summary_payload(spc):
+    """SPC 결과에서 점별 배열(points, range.values)을 뺀 요약 (증분 응답용)"""
+    if spc is None:
+        return None
+    summary = {key: value for key, value in spc.items() if key != 'points'}
+    summary['range'] = {key: value for key, value in spc['range'].items() if key != 'values'}
+    return summary
+
+def spc_overlay_payload(spc, x_values, label):
+    """관리도 오버레이(X̄ 선, 규칙 위반 점, 관리 한계/규격선)만 담은 Plotly 조각"""
+    fig = go.Figure()
+    add_spc_traces(fig, spc, x_values, label)
+    payload = figure_payload(fig)
+    return {
+        'data': payload.get('data', []),
+        'shapes': payload.get('layout', {}).get('shapes', []),
+        'annotations': payload.get('layout', {}).get('annotations', [])
+    }
+
+# 조건부 GET용 데이터 버전 (세션별 epoch + 범위별 단조 증가 카운터)
+# current: 현재 데이터셋(테이블, 실험군/대조군 항목), datasets: 저장된 데이터셋 목록
+DATA_VERSION_SCOPES = ('current', 'datasets')
+# 버전별 계산 결과 캐시 (프로세스 내 LRU, 응답 본문 단위)
+PAYLOAD_CACHE_MAX_ENTRIES = int(os.environ.get('PAYLOAD_CACHE_MAX_ENTRIES', 256))
+_payload_cache = OrderedDict()
+_payload_cache_lock = threading.Lock()
+
+def get_data_versions():
+    """세션의 데이터 버전 (없으면 새 epoch로 생성)"""
+    versions = session.get('data_versions')
+    if versions is None:
+        versions = {'epoch': uuid.uuid4().hex[:12], **{scope: 0 for scope in DATA_VERSION_SCOPES}}
+        session['data_versions'] = versions
+        session.modified = True
+    return versions
+
+def bump_data_version(*scopes):
+    versions = get_data_versions()
+    for scope in scopes:
+        versions[scope] += 1
+    if 'current' in scopes and isinstance(session.get('current_dataset'), dict):
+        session['current_dataset']['version'] = versions['current']
+    session.modified = True
+
+def mutates_data(*scopes):
+    """데이터를 변경하는 라우트: 실행 후(오류 포함) 해당 범위 버전 증가"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            finally:
+                bump_data_version(*scopes)
+        return wrapper
+    return decorator
+
+def versioned_get(*scopes):
+    """버전 기반 ETag 조회 라우트: If-None-Match 일치 시 계산 없이 304, 같은 버전의 성공 응답은 캐시에서 반환"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_data_versions()
+            state = '.'.join(f'{scope[0]}{versions[scope]}' for scope in scopes)
+            path_hash = hashlib.sha1(request.full_path.encode('utf-8')).hexdigest()[:12]
+            etag = f"{versions['epoch']}.{state}.{path_hash}"
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+            
+            key = (versions['epoch'], state, request.full_path)
+            with _payload_cache_lock:
+                cached = _payload_cache.get(key)
+                if cached is not None:
+                    _payload_cache.move_to_end(key)
+            if cached is not None:
+                response = app.response_class(cached[0], mimetype=cached[1])
+            else:
+                response = make_response(view(*args, **kwargs))
+                payload = response.get_json(silent=True) if response.status_code == 200 else None
+                if not isinstance(payload, dict) or payload.get('status') != 'success':
+                    return response
+                with _payload_cache_lock:
+                    _payload_cache[key] = (response.get_data(), response.mimetype)
+                    while len(_payload_cache) > PAYLOAD_CACHE_MAX_ENTRIES:
+                        _payload_cache.popitem(last=False)
+            response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
+
+# 생산 이력 저장소 (SQLite, 앱 instance 디렉터리에 영구 보관 — 재부팅/컨테이너 재시작 후에도 유지)
+# 공정 전체의 생산 이력이므로 의도적으로 전역: 모든 세션이 같은 이력을 조회함 (/history/* 라우트)
+# owner 컬럼은 기록한 세션 식별용이며 조회 범위를 제한하지 않음 — 사용자별로 분리해야 하는 배포에서는 이 라우트를 노출하지 말 것
+# history_entries: 실험군/대조군 평균값 원본 (생산일자·샘플명·그룹 인덱스)
+# history_rollups: 일/주 단위 집계 (개수, 합, 제곱합, 최소/최대), 항목 추가/삭제 시 해당 구간만 재계산
+HISTORY_DB_PATH = os.environ.get('HISTORY_DB_PATH',
+                                 os.path.join(app.instance_path, 'outlier_history.sqlite3'))
+HISTORY_GROUP_TYPES = ('experimental', 'control')
+HISTORY_DEFAULT_MAX_POINTS = 500
+HISTORY_MAX_POINTS = 5000
+# 집계 대상 값 컬럼 (요청/응답 키: DB 컬럼)
+HISTORY_VALUE_COLUMNS = {'size': 'size_avg', 'pi': 'pi_avg', 'custom': 'custom_data_value'}
+
+_history_local = threading.local()
+_history_init_lock = threading.Lock()
+_history_initialized = set()
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    sample_name TEXT,
+    pass_number INTEGER,
+    production_date TEXT NOT NULL,
+    group_type TEXT NOT NULL,
+    size_avg REAL NOT NULL,
+    pi_avg REAL NOT NULL,
+    custom_data_value REAL,
+    removal_method TEXT,
+    threshold_used TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_date ON history_entries (production_date, group_type);
+CREATE INDEX IF NOT EXISTS idx_history_sample ON history_entries (sample_name, production_date);
+CREATE INDEX IF NOT EXISTS idx_history_group ON history_entries (group_type, production_date);
+CREATE TABLE IF NOT EXISTS history_rollups (
+    period TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    group_type TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    size_sum REAL NOT NULL, size_sumsq REAL NOT NULL, size_min REAL, size_max REAL,
+    pi_sum REAL NOT NULL, pi_sumsq REAL NOT NULL, pi_min REAL, pi_max REAL,
+    custom_n INTEGER NOT NULL, custom_sum REAL NOT NULL, custom_sumsq REAL NOT NULL,
+    custom_min REAL, custom_max REAL,
+    PRIMARY KEY (period, group_type, period_start)
+);
+"""
+
+def get_history_db():
+    """스레드별 SQLite 연결 반환 (최초 연결 시 스키마 생성)"""
+    conn = getattr(_history_local, 'conn', None)
+    if conn is None or getattr(_history_local, 'path', None) != HISTORY_DB_PATH:
+        os.makedirs(os.path.dirname(HISTORY_DB_PATH) or '.', exist_ok=True)
+        conn = sqlite3.connect(HISTORY_DB_PATH, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with _history_init_lock:
+            if HISTORY_DB_PATH not in _history_initialized:
+                conn.executescript(HISTORY_SCHEMA)
+                _history_initialized.add(HISTORY_DB_PATH)
+        _history_local.conn = conn
+        _history_local.path = HISTORY_DB_PATH
+    return conn
+
+def _history_date(entry):
+    """이력 기준 날짜 (생산일자가 없거나 형식이 다르면 기록 날짜 사용)"""
+    for value in (entry.get('production_date'), entry.get('timestamp')):
+        if value:
+            try:
+                return datetime.strptime(str(value)[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+    return datetime.now().strftime('%Y-%m-%d')
+
+def _history_period_ranges(day):
+    """날짜가 속한 일/주 구간의 (구간명, 시작일, 종료일) 목록 (주 단위는 월요일 시작)"""
+    date = datetime.strptime(day, '%Y-%m-%d')
+    week_start = date - timedelta(days=date.weekday())
+    return [('day', day, day),
+            ('week', week_start.strftime('%Y-%m-%d'), (week_start + timedelta(days=6)).strftime('%Y-%m-%d'))]
+
+def _refresh_history_rollups(conn, keys):
+    """(날짜, 그룹) 목록에 해당하는 일/주 집계 행만 다시 계산"""
+    ranges = {(period, lo, hi, group) for day, group in keys for period, lo, hi in _history_period_ranges(day)}
+    for period, lo, hi, group in ranges:
+        conn.execute('DELETE FROM history_rollups WHERE period = ? AND group_type = ? AND period_start = ?',
+                     (period, group, lo))
+        conn.execute("""
+            INSERT INTO history_rollups
+            SELECT ?, ?, group_type, COUNT(*),
+                   SUM(size_avg), SUM(size_avg * size_avg), MIN(size_avg), MAX(size_avg),
+                   SUM(pi_avg), SUM(pi_avg * pi_avg), MIN(pi_avg), MAX(pi_avg),
+                   COUNT(custom_data_value), TOTAL(custom_data_value),
+                   TOTAL(custom_data_value * custom_data_value),
+                   MIN(custom_data_value), MAX(custom_data_value)
+            FROM history_entries
+            WHERE group_type = ? AND production_date BETWEEN ? AND ?
+            GROUP BY group_type
+        """, (period, lo, group, lo, hi))
+
+def history_record_entries(entries):
+    """실험군/대조군 항목을 이력 저장소에 기록하고 각 항목에 history_id 부여"""
+    owner = get_storage_owner()
+    recorded_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = get_history_db()
+    keys = set()
+    with conn:
+        for entry in entries:
+            day = _history_date(entry)
+            group = entry.get('group_type', 'experimental')
+            cursor = conn.execute("""
+                INSERT INTO history_entries (owner, sample_name, pass_number, production_date, group_type,
+                                             size_avg, pi_avg, custom_data_value, removal_method,
+                                             threshold_used, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (owner, entry.get('sample_name'), entry.get('pass_number'), day, group,
+                  entry['size_avg'], entry['pi_avg'], entry.get('custom_data_value'),
+                  str(entry.get('removal_method', '')), str(entry.get('threshold_used', '')), recorded_at))
+            entry['history_id'] = cursor.lastrowid
+            keys.add((day, group))
+        _refresh_history_rollups(conn, keys)
+
+def history_delete_entries(entries):
+    """세션에서 삭제된 항목을 이력 저장소에서도 삭제 (history_id가 있는 항목만)"""
+    ids = [entry['history_id'] for entry in entries if entry.get('history_id') is not None]
+    if not ids:
+        return
+    conn = get_history_db()
+    with conn:
+        placeholders = ','.join('?' * len(ids))
+        keys = set(conn.execute(f'SELECT production_date, group_type FROM history_entries WHERE id IN ({placeholders})',
+                                ids).fetchall())
+        conn.execute(f'DELETE FROM history_entries WHERE id IN ({placeholders})', ids)
+        _refresh_history_rollups(conn, keys)
+
+def parse_history_filters(args):
+    """조회 조건 파싱: 기간(start/end), 그룹, 샘플명, 최대 포인트 수"""
+    filters = {}
+    for key in ('start', 'end'):
+        value = args.get(key)
+        if value:
+            filters[key] = datetime.strptime(value[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+    group_type = args.get('group_type')
+    if group_type:
+        if group_type not in HISTORY_GROUP_TYPES:
+            raise ValueError(f'알 수 없는 그룹입니다: {group_type}')
+        filters['group_type'] = group_type
+    if args.get('sample_name'):
+        filters['sample_name'] = args.get('sample_name')
+    max_points = int(args.get('max_points', HISTORY_DEFAULT_MAX_POINTS))
+    filters['max_points'] = min(max(max_points, 2), HISTORY_MAX_POINTS)
+    return filters
+
+def _history_where(filters, date_column='production_date'):
+    clauses, params = [], []
+    if 'start' in filters:
+        clauses.append(f'{date_column} >= ?')
+        params.append(filters['start'])
+    if 'end' in filters:
+        clauses.append(f'{date_column} <= ?')
+        params.append(filters['end'])
+    if 'group_type' in filters:
+        clauses.append('group_type = ?')
+        params.append(filters['group_type'])
+    if 'sample_name' in filters:
+        clauses.append('sample_name = ?')
+        params.append(filters['sample_name'])
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+def _rollup_arrays(rows):
+    """집계 행 목록을 컬럼별 배열로 변환"""
+    fields = ['n', 'size_sum', 'size_sumsq', 'size_min', 'size_max', 'pi_sum', 'pi_sumsq', 'pi_min', 'pi_max',
+              'custom_n', 'custom_sum', 'custom_sumsq', 'custom_min', 'custom_max']
+    table = np.array([row[1:] for row in rows], dtype=float).reshape(-1, len(fields))
+    return [row[0] for row in rows], {name: table[:, i] for i, name in enumerate(fields)}
+
+def _merge_rollups(starts, arrays, max_points):
+    """연속된 집계 구간을 max_points개 이하로 병합 (합/제곱합은 더하고 최소/최대는 유지)"""
+    size = -(-len(starts) // max_points)
+    if size <= 1:
+        return starts, arrays
+    offsets = np.arange(0, len(starts), size)
+    merged = {}
+    for name, values in arrays.items():
+        if name.endswith('_min'):
+            merged[name] = np.fmin.reduceat(values, offsets)
+        elif name.endswith('_max'):
+            merged[name] = np.fmax.reduceat(values, offsets)
+        else:
+            merged[name] = np.add.reduceat(values, offsets)
+    return [starts[i] for i in offsets], merged
+
+def _rollup_series(starts, arrays):
+    """집계 배열을 그래프용 시계열(평균/표준편차/최소/최대)로 변환"""
+    series = {'period_start': starts, 'n': arrays['n'].astype(int).tolist()}
+    for key in HISTORY_VALUE_COLUMNS:
+        n = arrays['custom_n'] if key == 'custom' else arrays['n']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = arrays[f'{key}_sum'] / n
+            var = (arrays[f'{key}_sumsq'] - n * mean ** 2) / (n - 1)
+        std = np.sqrt(np.clip(var, 0, None))
+        std[n < 2] = np.nan
+        series[key] = {
+            'mean': _nan_to_none(mean),
+            'std': _nan_to_none(std),
+            'min': _nan_to_none(arrays[f'{key}_min']),
+            'max': _nan_to_none(arrays[f'{key}_max'])
+        }
+    return series
+
+def _nan_to_none(values):
+    return [None if np.isnan(v) else v for v in np.asarray(values, dtype=float).tolist()]
+
+def query_history_trend(filters):
+    """기간 내 추세: 원본 항목 수가 max_points 이하이면 원본, 아니면 일/주 집계를 병합해 반환"""
+    conn = get_history_db()
+    max_points = filters['max_points']
+    groups = [filters['group_type']] if 'group_type' in filters else list(HISTORY_GROUP_TYPES)
+    result = {}
+    for group in groups:
+        group_filters = dict(filters, group_type=group)
+        where, params = _history_where(group_filters)
+        count = conn.execute(f'SELECT COUNT(*) FROM history_entries{where}', params).fetchone()[0]
+        if count <= max_points:
+            rows = conn.execute(f"""
+                SELECT id, sample_name, pass_number, production_date, size_avg, pi_avg, custom_data_value
+                FROM history_entries{where} ORDER BY production_date, id
+            """, params).fetchall()
+            result[group] = {
+                'resolution': 'raw',
+                'count': count,
+                'points': [dict(zip(['id', 'sample_name', 'pass_number', 'production_date',
+                                     'size_avg', 'pi_avg', 'custom_data_value'], row)) for row in rows]
+            }
+            continue
+        if 'sample_name' in filters:
+            # 집계 테이블은 샘플 구분이 없으므로 원본에서 일 단위로 집계
+            rows = conn.execute(f"""
+                SELECT production_date, COUNT(*),
+                       SUM(size_avg), SUM(size_avg * size_avg), MIN(size_avg), MAX(size_avg),
+                       SUM(pi_avg), SUM(pi_avg * pi_avg), MIN(pi_avg), MAX(pi_avg),
+                       COUNT(custom_data_value), TOTAL(custom_data_value),
+                       TOTAL(custom_data_value * custom_data_value),
+                       MIN(custom_data_value), MAX(custom_data_value)
+                FROM history_entries{where} GROUP BY production_date ORDER BY production_date
+            """, params).fetchall()
+            period = 'day'
+        else:
+            # 일 단위 구간 수가 max_points를 넘으면 주 단위 집계 사용
+            period = 'day'
+            rollup_where, rollup_params = _history_where(group_filters, 'period_start')
+            day_count = conn.execute(f"SELECT COUNT(*) FROM history_rollups{rollup_where} AND period = 'day'",
+                                     rollup_params).fetchone()[0]
+            if day_count > max_points:
+                period = 'week'
+                if 'start' in filters:
+                    # 시작일이 포함된 주부터 조회
+                    week_start = _history_period_ranges(filters['start'])[1][1]
+                    rollup_where, rollup_params = _history_where(dict(group_filters, start=week_start),
+                                                                 'period_start')
+            rows = conn.execute(f"""
+                SELECT period_start, n, size_sum, size_sumsq, size_min, size_max,
+                       pi_sum, pi_sumsq, pi_min, pi_max,
+                       custom_n, custom_sum, custom_sumsq, custom_min, custom_max
+                FROM history_rollups{rollup_where} AND period = ? ORDER BY period_start
+            """, rollup_params + [period]).fetchall()
+        starts, arrays = _rollup_arrays(rows)
+        merged_starts, merged = _merge_rollups(starts, arrays, max_points)
+        result[group] = {
+            'resolution': period if len(merged_starts) == len(starts) else f'{period}_merged',
+            'count': count,
+            'series': _rollup_series(merged_starts, merged)
+        }
+    return result
+
+def query_history_stats(filters):
+    """기간 내 그룹별 통계 (개수, 평균, 표준편차, 최소/최대) - 일 단위 집계 합산"""
+    conn = get_history_db()
+    groups = [filters['group_type']] if 'group_type' in filters else list(HISTORY_GROUP_TYPES)
+    stats_by_group = {}
+    for group in groups:
+        group_filters = dict(filters, group_type=group)
+        if 'sample_name' in filters:
+            where, params = _history_where(group_filters)
+            rows = conn.execute(f"""
+                SELECT '', COUNT(*),
+                       TOTAL(size_avg), TOTAL(size_avg * size_avg), MIN(size_avg), MAX(size_avg),
+                       TOTAL(pi_avg), TOTAL(pi_avg * pi_avg), MIN(pi_avg), MAX(pi_avg),
+                       COUNT(custom_data_value), TOTAL(custom_data_value),
+                       TOTAL(custom_data_value * custom_data_value),
+                       MIN(custom_data_value), MAX(custom_data_value)
+                FROM history_entries{where}
+            """, params).fetchall()
+        else:
+            where, params = _history_where(group_filters, 'period_start')
+            rows = conn.execute(f"""
+                SELECT '', TOTAL(n), TOTAL(size_sum), TOTAL(size_sumsq), MIN(size_min), MAX(size_max),
+                       TOTAL(pi_sum), TOTAL(pi_sumsq), MIN(pi_min), MAX(pi_max),
+                       TOTAL(custom_n), TOTAL(custom_sum), TOTAL(custom_sumsq), MIN(custom_min), MAX(custom_max)
+                FROM history_rollups{where} AND period = 'day'
+            """, params).fetchall()
+        _, arrays = _rollup_arrays(rows)
+        series = _rollup_series([''], arrays)
+        group_stats = {'count': series['n'][0]}
+        for key in HISTORY_VALUE_COLUMNS:
+            group_stats[key] = {name: values[0] for name, values in series[key].items()}
+        group_stats['custom']['count'] = int(arrays['custom_n'][0])
+        stats_by_group[group] = group_stats
+    return stats_by_group
+
+def query_history_correlation(filters):
+    """기간 내 그룹별 Size/PI/사용자 정의 값 상관계수 (피어슨, 사용자 정의 값은 있는 항목만)"""
+    conn = get_history_db()
+    groups = [filters['group_type']] if 'group_type' in filters else list(HISTORY_GROUP_TYPES)
+    result = {}
+    for group in groups:
+        where, params = _history_where(dict(filters, group_type=group))
+        rows = conn.execute(f'SELECT size_avg, pi_avg, custom_data_value FROM history_entries{where}',
+                            params).fetchall()
+        values = np.array(rows, dtype=float).reshape(-1, 3)
+        pairs = {}
+        for a, b in (('size', 'pi'), ('size', 'custom'), ('pi', 'custom')):
+            x = values[:, list(HISTORY_VALUE_COLUMNS).index(a)]
+            y = values[:, list(HISTORY_VALUE_COLUMNS).index(b)]
+            valid = ~(np.isnan(x) | np.isnan(y))
+            n = int(valid.sum())
+            r = p = None
+            if n >= 3 and np.ptp(x[valid]) > 0 and np.ptp(y[valid]) > 0:
+                r, p = stats.pearsonr(x[valid], y[valid])
+                r, p = float(r), float(p)
+            pairs[f'{a}_{b}'] = {'n': n, 'r': r, 'p_value': p}
+        result[group] = {'count': len(values), 'pairs': pairs}
+    return result
 
 @app.after_request
 def after_request(response):
@@ -178,9 +2526,12 @@ def index():
         }
         session.modified = True
     
-    clean_table_data = clean_data_for_json(session['current_dataset']['table_data'])
+    # 전체 테이블은 내려보내지 않고 첫 화면 분량의 행만 포함 (나머지는 /table_window로 조회)
+    current_dataset = session['current_dataset']
+    session_data = {key: value for key, value in current_dataset.items() if key != 'table_data'}
+    session_data['table'] = table_window(current_dataset.get('table_data', {}))
     return render_template('index.html',
-                         table_data=clean_table_data,
+                         session_data=session_data,
                          sample_name=session['current_dataset'].get('sample_name', ''),
                          production_date=session['current_dataset'].get('production_date', ''),
                          pass_count=session['current_dataset'].get('pass_count', 1),
@@ -192,30 +2543,26 @@ def health():
     return {'status': 'healthy'}, 200
 
 @app.route('/update_data', methods=['POST'])
+@mutates_data('current')
 def update_data():
     try:
         data = request.get_json()
         sample_name = data.get('sample_name', '')
         production_date = data.get('production_date', '')
         pass_count = data.get('pass_count', 1)
-        table_data = data.get('table_data', {})
-        
-        # 데이터 정리
-        for key in ['Size(nm)', 'PI']:
-            if key in table_data:
-                cleaned_values = []
-                for v in table_data[key]:
-                    if v is None or v == '' or (isinstance(v, str) and v.strip() == ''):
-                        cleaned_values.append(None)
-                    else:
-                        try:
-                            cleaned_values.append(float(v))
-                        except (ValueError, TypeError):
-                            cleaned_values.append(None)
-                table_data[key] = cleaned_values
+        current_dataset = session.get('current_dataset', {})
+        
+        # table_data가 없으면 메타데이터만 갱신 (셀 단위 수정은 /update_cells 사용)
+        if 'table_data' in data:
+            table_data = data.get('table_data') or {}
+            # 데이터 정리
+            for key in ['Size(nm)', 'PI']:
+                if key in table_data:
+                    table_data[key] = [normalize_cell_value(v) for v in table_data[key]]
+        else:
+            table_data = current_dataset.get('table_data', {})
         
         # 패스 데이터 초기화 옵션 처리
-        current_dataset = session.get('current_dataset', {})
         if data.get('clear_passes'):
             current_dataset['pass_averages'] = []
         
@@ -227,6 +2574,10 @@ def update_data():
             'pass_averages': current_dataset.get('pass_averages', []),
             'custom_data_field_name': current_dataset.get('custom_data_field_name', '사용자 정의 필드')
         }
+        # 트렌드 변경 로그 유지 (패스 초기화 시에는 버리고 새 로그로 전체 갱신 유도)
+        if 'trend_log' in current_dataset and not data.get('clear_passes'):
+            session['current_dataset']['trend_log'] = current_dataset['trend_log']
+        ensure_trend_log(session['current_dataset'])
         session.modified = True
         
         return jsonify({'status': 'success'})
@@ -234,24 +2585,27 @@ def update_data():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_row', methods=['POST'])
+@mutates_data('current')
 def add_row():
     try:
         table_data = session.get('current_dataset', {}).get('table_data', {'No.': [], 'Size(nm)': [], 'PI': []})
         new_no = len(table_data['No.']) + 1
         
         table_data['No.'].append(new_no)
-        table_data['Size(nm)'].append(None)
-        table_data['PI'].append(None)
+        # 추가 컬럼까지 모두 빈 값으로 확장 (행 창 조회 시 컬럼 길이 일치)
+        for column in ordered_table_columns(table_data)[1:]:
+            table_data[column].append(None)
         
         session['current_dataset']['table_data'] = table_data
         session.modified = True
-        clean_table_data = clean_data_for_json(table_data)
         
-        return jsonify({'status': 'success', 'table_data': clean_table_data})
+        # 추가된 행만 반환
+        return jsonify({'status': 'success', 'table': table_window(table_data, new_no - 1, 1)})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_column', methods=['POST'])
+@mutates_data('current')
 def add_column():
     try:
         data = request.get_json()
@@ -271,13 +2625,84 @@ def add_column():
         
         session['current_dataset']['table_data'] = table_data
         session.modified = True
-        clean_table_data = clean_data_for_json(table_data)
         
-        return jsonify({'status': 'success', 'table_data': clean_table_data})
+        # 클라이언트가 보고 있는 범위의 새 컬럼 값만 반환
+        offset, limit, _ = parse_table_window(data)
+        return jsonify({'status': 'success',
+                        'table': table_window(table_data, offset, limit, columns=[column_name])})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/table_window', methods=['GET'])
+@versioned_get('current')
+def get_table_window():
+    """현재 테이블의 일부 행만 조회
+    
+    쿼리 파라미터: offset, limit(최대 TABLE_WINDOW_MAX_LIMIT), columns(쉼표 구분 컬럼 투영)
+    """
+    try:
+        offset, limit, columns = parse_table_window(request.args)
+        table_data = session.get('current_dataset', {}).get('table_data', {})
+        return jsonify({'status': 'success', 'table': table_window(table_data, offset, limit, columns)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/update_cells', methods=['POST'])
+@mutates_data('current')
+def update_cells():
+    """셀 단위 수정: changes=[{row, column, value}] (row는 0부터 시작)"""
+    try:
+        data = request.get_json()
+        changes = data.get('changes', [])
+        table_data = session.get('current_dataset', {}).get('table_data', {})
+        row_count = len(table_data.get('No.', []))
+        
+        # 모든 변경을 먼저 검증한 뒤 한꺼번에 반영 (일부만 적용된 채 오류를 반환하지 않도록)
+        updated = []
+        for change in changes:
+            row = change.get('row')
+            column = change.get('column')
+            if column not in table_data or column == 'No.':
+                return jsonify({'status': 'error', 'message': f'존재하지 않는 컬럼입니다: {column}'})
+            if not isinstance(row, int) or not 0 <= row < row_count:
+                return jsonify({'status': 'error', 'message': f'잘못된 행 번호입니다: {row}'})
+            updated.append({'row': row, 'column': column, 'value': normalize_cell_value(change.get('value'))})
+        
+        for cell in updated:
+            table_data[cell['column']][cell['row']] = cell['value']
+        session.modified = True
+        return jsonify({'status': 'success', 'cells': updated, 'total_rows': row_count})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/delete_rows', methods=['POST'])
+@mutates_data('current')
+def delete_rows():
+    """행 삭제: rows=[행 인덱스] (0부터 시작), 삭제 후 No. 재부여
+    
+    첫 삭제 위치 이후 행들이 당겨지므로 그 위치부터 limit개 행을 반환
+    """
+    try:
+        data = request.get_json()
+        table_data = session.get('current_dataset', {}).get('table_data', {})
+        row_count = len(table_data.get('No.', []))
+        rows = sorted({row for row in data.get('rows', []) if isinstance(row, int) and 0 <= row < row_count})
+        if not rows:
+            return jsonify({'status': 'error', 'message': '삭제할 행이 없습니다.'})
+        
+        removed = set(rows)
+        for column, values in table_data.items():
+            table_data[column] = [v for i, v in enumerate(values) if i not in removed]
+        table_data['No.'] = list(range(1, row_count - len(rows) + 1))
+        session.modified = True
+        
+        _, limit, _ = parse_table_window(data)
+        return jsonify({'status': 'success', 'table': table_window(table_data, rows[0], limit)})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/reset_data', methods=['POST'])
+@mutates_data('current')
 def reset_data():
     try:
         default_rows = 10
@@ -293,13 +2718,15 @@ def reset_data():
             'pass_averages': [],  # 실험군 패스별 평균값 저장
             'control_data': []  # 대조군 독립 저장
         }
+        ensure_trend_log(session['current_dataset'])
         
         if 'last_results' in session:
             del session['last_results']
         
-        clean_table_data = clean_data_for_json(session['current_dataset']['table_data'])
+        offset, limit, _ = parse_table_window(request.get_json(silent=True) or {})
         
-        return jsonify({'status': 'success', 'table_data': clean_table_data,
+        return jsonify({'status': 'success',
+                       'table': table_window(session['current_dataset']['table_data'], offset, limit),
                        'sample_name': '', 'production_date': datetime.now().strftime('%Y-%m-%d'),
                        'pass_count': 1})
     except Exception as e:
@@ -320,72 +2747,82 @@ def calculate_with_thresholds():
         if not table_data:
             return jsonify({'status': 'error', 'message': '데이터가 없습니다.'})
         
-        df = pd.DataFrame(table_data)
-        
         # 유효한 데이터 추출
-        valid_data = []
-        for i in range(len(df)):
-            size_val = df.iloc[i]['Size(nm)']
-            pi_val = df.iloc[i]['PI']
-            
-            try:
-                if size_val is not None and pi_val is not None:
-                    size_float = float(size_val)
-                    pi_float = float(pi_val)
-                    if not (np.isnan(size_float) or np.isnan(pi_float) or
-                            np.isinf(size_float) or np.isinf(pi_float)):
-                        valid_data.append({
-                            'No.': len(valid_data) + 1,
-                            'Size(nm)': size_float,
-                            'PI': pi_float
-                        })
-            except (ValueError, TypeError):
-                continue
+        sizes, pis, row_index = extract_valid_pairs(table_data)
         
-        if len(valid_data) == 0:
+        if len(sizes) == 0:
             return jsonify({'status': 'error', 'message': '유효한 데이터가 없습니다.'})
         
-        valid_df = pd.DataFrame(valid_data)
-        arr = valid_df['Size(nm)'].values
-        
-        # 각 방법별 이상치 검출 (사용자 지정 임계값 적용)
-        methods = ['zscore', 'iqr', 'mad']
-        method_names = {'zscore': 'Z-Score', 'iqr': 'IQR', 'mad': 'MAD'}
-        
-        def get_cleaned_stats(mask, name, threshold_used):
-            cleaned = valid_df.loc[~mask].reset_index(drop=True)
-            cleaned['No.'] = range(1, len(cleaned) + 1)
-            outliers_removed = valid_df.loc[mask].reset_index(drop=True) if mask.any() else pd.DataFrame()
-            
-            return {
-                'name': name,
-                'threshold': threshold_used,
-                'data': cleaned.to_dict('records'),
-                'outliers': outliers_removed.to_dict('records'),
-                'size_mean': float(cleaned['Size(nm)'].mean()) if len(cleaned) > 0 else 0,
-                'size_std': float(cleaned['Size(nm)'].std()) if len(cleaned) > 0 else 0,
-                'pi_mean': float(cleaned['PI'].mean()) if len(cleaned) > 0 else 0,
-                'pi_std': float(cleaned['PI'].std()) if len(cleaned) > 0 else 0,
-                'count': len(cleaned),
-                'outliers_count': len(outliers_removed)
-            }
+        # 각 방법별 이상치 검출 (사용자 지정 임계값 적용, 방법 미지정 시 전체)
+        group_by = data.get('group_by')
+        supported = GROUPED_METHODS if group_by else METHOD_NAMES
+        methods = [m for m in (data.get('methods') or supported) if m in supported]
+        if not methods:
+            return jsonify({'status': 'error', 'message': '지원하지 않는 이상치 검출 방법입니다.'})
+        # 마할라노비스 임계값은 카이제곱 분위 확률이므로 (0, 1) 범위만 허용 (범위 밖이면 chi2.ppf가 NaN)
+        if 'mahalanobis' in methods and thresholds.get('mahalanobis') is not None:
+            if not 0 < float(thresholds['mahalanobis']) < 1:
+                return jsonify({'status': 'error', 'message': '마할라노비스 임계값은 0과 1 사이의 확률이어야 합니다 (예: 0.975).'})
+        # GESD 임계값은 유의수준(alpha)이므로 같은 (0, 1) 범위만 허용
+        if 'gesd' in methods and thresholds.get('gesd') is not None:
+            if not 0 < float(thresholds['gesd']) < 1:
+                return jsonify({'status': 'error', 'message': 'GESD 임계값은 0과 1 사이의 유의수준이어야 합니다 (예: 0.05).'})
+        max_outliers = data.get('max_outliers')
+        if max_outliers is not None:
+            max_outliers = int(max_outliers)
+            if max_outliers <= 0:
+                return jsonify({'status': 'error', 'message': '최대 이상치 개수는 1 이상이어야 합니다.'})
+        arrays = {'Size(nm)': sizes, 'PI': pis}
+        
+        # 그룹별 검출: 그룹 컬럼 값을 그룹 번호로 변환
+        group_labels = None
+        if group_by:
+            if group_by not in table_data or group_by in ('No.', 'Size(nm)', 'PI'):
+                return jsonify({'status': 'error', 'message': f'그룹 컬럼 "{group_by}"을 사용할 수 없습니다.'})
+            arrays['group'], group_labels = group_codes(pd.Series(table_data[group_by]).iloc[row_index].tolist())
+        
+        # 정제 평균의 부트스트랩 신뢰구간 옵션 (bootstrap: true 또는 {resamples, confidence, seed})
+        bootstrap = data.get('bootstrap')
+        if bootstrap:
+            options = bootstrap if isinstance(bootstrap, dict) else {}
+            resamples = int(options.get('resamples', BOOTSTRAP_DEFAULT_RESAMPLES))
+            confidence = float(options.get('confidence', 0.95))
+            seed = int(options.get('seed', 0))
+            if not 1 <= resamples <= BOOTSTRAP_MAX_RESAMPLES:
+                return jsonify({'status': 'error', 'message': f'부트스트랩 반복 수는 1~{BOOTSTRAP_MAX_RESAMPLES}이어야 합니다.'})
+            if not 0 < confidence < 1:
+                return jsonify({'status': 'error', 'message': '신뢰수준은 0과 1 사이여야 합니다.'})
+        
+        # Hampel 측정 순서: 타임스탬프 컬럼 지정 시 그 순서, 없으면 행 순서
+        order_by = data.get('order_by')
+        hampel_window = data.get('hampel_window')
+        if hampel_window is not None:
+            hampel_window = int(hampel_window)
+        if order_by and 'hampel' in methods:
+            if order_by not in table_data:
+                return jsonify({'status': 'error', 'message': f'순서 컬럼 "{order_by}"이 없습니다.'})
+            arrays['order'] = measurement_order(pd.Series(table_data[order_by]).iloc[row_index].tolist())
         
         results = {
             'status': 'success',
             'sample_name': sample_name,
             'production_date': production_date,
-            'pass_count': pass_count,
-            'original_data': valid_df.to_dict('records'),
-            'original_count': len(valid_df)
+            'pass_count': pass_count
         }
+        results.update(run_analysis_task(_outlier_analysis_task, arrays, methods=methods,
+                                         method_names=METHOD_NAMES, thresholds=thresholds,
+                                         max_outliers=max_outliers, group_by=group_by,
+                                         group_labels=group_labels, hampel_window=hampel_window))
         
-        for method in methods:
-            threshold = thresholds.get(method)
-            mask = detect_outliers_with_threshold(arr, method, threshold)
-            results[method] = get_cleaned_stats(mask, method_names[method], threshold)
+        if bootstrap:
+            for method in methods:
+                keep = np.ones(len(sizes), dtype=bool)
+                keep[[int(outlier['No.']) - 1 for outlier in results[method]['outliers']]] = False
+                results[method]['bootstrap'] = bootstrap_mean_ci(sizes[keep], pis[keep], resamples, confidence, seed)
         
         # 시각화 데이터 생성
-        results['scatter_plot'] = create_scatter_plot(valid_data, f"{sample_name} - Original Data")
+        results['scatter_plot'] = run_analysis_task(_scatter_plot_task, arrays,
+                                                    title=f"{sample_name} - Original Data")
         
         session['last_results'] = results
         return jsonify(results)
@@ -393,7 +2830,85 @@ def calculate_with_thresholds():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+@app.route('/stream/append', methods=['POST'])
+def stream_append():
+    """실시간 측정값 추가 및 온라인 이상치 판정 (이력은 저장하지 않음)"""
+    try:
+        data = request.get_json()
+        sample_name = data.get('sample_name', '').strip()
+        readings = data.get('readings')
+        if readings is None and data.get('value') is not None:
+            readings = [data.get('value')]
+        thresholds = data.get('thresholds', {})
+        
+        if not sample_name:
+            return jsonify({'status': 'error', 'message': '샘플명이 필요합니다.'})
+        if not readings:
+            return jsonify({'status': 'error', 'message': '측정값이 없습니다.'})
+        
+        try:
+            values = [float(v) for v in readings]
+        except (ValueError, TypeError):
+            return jsonify({'status': 'error', 'message': '측정값은 숫자여야 합니다.'})
+        if not all(np.isfinite(values)):
+            return jsonify({'status': 'error', 'message': '측정값은 유한한 숫자여야 합니다.'})
+        
+        stream_states = session.get('stream_state', {})
+        state = stream_states.get(sample_name) or new_stream_state()
+        flags = [stream_update(state, value, thresholds) for value in values]
+        
+        stream_states[sample_name] = state
+        session['stream_state'] = stream_states
+        session.modified = True
+        
+        return jsonify({
+            'status': 'success',
+            'sample_name': sample_name,
+            'flags': flags,
+            'statistics': stream_summary(state)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/stream/state', methods=['GET'])
+def stream_state():
+    """스트리밍 샘플별 현재 통계"""
+    try:
+        stream_states = session.get('stream_state', {})
+        sample_name = request.args.get('sample_name')
+        if sample_name:
+            if sample_name not in stream_states:
+                return jsonify({'status': 'error', 'message': f'스트리밍 샘플 "{sample_name}"이 없습니다.'})
+            return jsonify({'status': 'success', 'statistics': {sample_name: stream_summary(stream_states[sample_name])}})
+        
+        return jsonify({
+            'status': 'success',
+            'statistics': {name: stream_summary(state) for name, state in stream_states.items()}
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/stream/reset', methods=['POST'])
+def stream_reset():
+    """스트리밍 샘플 상태 초기화 (sample_name이 없으면 전체)"""
+    try:
+        data = request.get_json() or {}
+        sample_name = data.get('sample_name')
+        stream_states = session.get('stream_state', {})
+        
+        if sample_name:
+            stream_states.pop(sample_name, None)
+        else:
+            stream_states = {}
+        
+        session['stream_state'] = stream_states
+        session.modified = True
+        return jsonify({'status': 'success', 'message': '스트리밍 상태가 초기화되었습니다.'})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
 @app.route('/save_dataset', methods=['POST'])
+@mutates_data('datasets')
 def save_dataset():
     try:
         data = request.get_json()
@@ -406,21 +2921,14 @@ def save_dataset():
         if not current_dataset.get('table_data'):
             return jsonify({'status': 'error', 'message': '저장할 데이터가 없습니다.'})
         
-        if 'datasets' not in session:
-            session['datasets'] = {}
-        
-        # 현재 시간 추가
-        save_data = current_dataset.copy()
-        save_data['saved_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        session['datasets'][dataset_name] = save_data
-        session.modified = True
+        store_dataset(dataset_name, current_dataset)
         
         return jsonify({'status': 'success', 'message': f'데이터셋 "{dataset_name}"이 저장되었습니다.'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/load_dataset', methods=['POST'])
+@mutates_data('current')
 def load_dataset():
     try:
         data = request.get_json()
@@ -430,15 +2938,22 @@ def load_dataset():
             return jsonify({'status': 'error', 'message': '존재하지 않는 데이터셋입니다.'})
         
         # 불러온 데이터셋을 현재 세션에 설정
-        loaded_dataset = session['datasets'][dataset_name].copy()
+        entry = session['datasets'][dataset_name]
+        if 'storage_id' in entry:
+            loaded_dataset = read_dataset_storage(get_storage_owner(), entry['storage_id'])
+        else:
+            loaded_dataset = entry.copy()
+        # 저장된 항목의 trend_id는 이전 로그 기준이므로 새 로그로 다시 부여
+        loaded_dataset.pop('trend_log', None)
+        ensure_trend_log(loaded_dataset)
         session['current_dataset'] = loaded_dataset
         session.modified = True
         
-        clean_table_data = clean_data_for_json(session['current_dataset']['table_data'])
+        offset, limit, _ = parse_table_window(data)
         
         return jsonify({
             'status': 'success',
-            'table_data': clean_table_data,
+            'table': table_window(loaded_dataset.get('table_data', {}), offset, limit),
             'sample_name': loaded_dataset.get('sample_name', ''),
             'production_date': loaded_dataset.get('production_date', ''),
             'pass_count': loaded_dataset.get('pass_count', 1),
@@ -448,31 +2963,33 @@ def load_dataset():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/get_saved_datasets', methods=['GET'])
+@versioned_get('datasets')
 def get_saved_datasets():
-    """저장된 데이터셋 목록을 반환"""
+    """저장된 데이터셋 목록을 반환 (메타데이터 인덱스 기반 페이지 조회)
+    
+    쿼리 파라미터: q(이름 접두어), sort(production_date/name), order(asc/desc), offset, limit
+    """
     try:
-        datasets = session.get('datasets', {})
-        dataset_list = []
-        
-        for name, data in datasets.items():
-            dataset_info = {
-                'name': name,
-                'sample_name': data.get('sample_name', ''),
-                'production_date': data.get('production_date', ''),
-                'pass_count': data.get('pass_count', 1),
-                'saved_at': data.get('saved_at', ''),
-                'data_count': len(data.get('table_data', {}).get('No.', []))
-            }
-            dataset_list.append(dataset_info)
+        limit = request.args.get('limit', type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        total, dataset_list = query_dataset_index(prefix=request.args.get('q', ''),
+                                                  sort=request.args.get('sort'),
+                                                  order=request.args.get('order', 'asc'),
+                                                  offset=offset,
+                                                  limit=limit)
         
         return jsonify({
             'status': 'success',
-            'datasets': dataset_list
+            'datasets': dataset_list,
+            'total': total,
+            'offset': offset,
+            'limit': limit
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/delete_dataset', methods=['POST'])
+@mutates_data('datasets')
 def delete_dataset():
     """데이터셋 삭제"""
     try:
@@ -487,7 +3004,10 @@ def delete_dataset():
         if dataset_name not in datasets:
             return jsonify({'status': 'error', 'message': '존재하지 않는 데이터셋입니다.'})
         
-        del datasets[dataset_name]
+        dataset_index_remove(dataset_name)
+        removed = datasets.pop(dataset_name)
+        if 'storage_id' in removed:
+            delete_dataset_storage(get_storage_owner(), removed['storage_id'])
         session['datasets'] = datasets
         session.modified = True  # Explicitly mark session as modified for persistence
         
@@ -499,83 +3019,643 @@ def delete_dataset():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
-@app.route('/compare_datasets', methods=['POST'])
-def compare_datasets():
+@app.route('/compare_datasets', methods=['POST'])
+def compare_datasets():
+    try:
+        data = request.get_json()
+        dataset_names = data.get('dataset_names', [])
+        
+        if len(dataset_names) < 2:
+            return jsonify({'status': 'error', 'message': '비교하려면 최소 2개의 데이터셋을 선택해주세요.'})
+        
+        datasets = session.get('datasets', {})
+        valid_columns = {}
+        
+        for name in dataset_names:
+            if name in datasets:
+                # 저장소의 컬럼을 메모리 매핑으로 읽어 유효한 데이터만 추출
+                columns = get_saved_dataset_columns(datasets[name], ['Size(nm)', 'PI'])
+                if 'Size(nm)' not in columns or 'PI' not in columns:
+                    continue
+                sizes = np.asarray(columns['Size(nm)'], dtype=float)
+                pis = np.asarray(columns['PI'], dtype=float)
+                valid = ~(np.isnan(sizes) | np.isnan(pis))
+                if valid.any():
+                    valid_columns[name] = (sizes[valid], pis[valid])
+        
+        if not valid_columns:
+            return jsonify({'status': 'error', 'message': '비교할 유효한 데이터가 없습니다.'})
+        
+        # 비교 시각화 생성
+        df_compare = pd.DataFrame({
+            'Size(nm)': np.concatenate([sizes for sizes, _ in valid_columns.values()]),
+            'PI': np.concatenate([pis for _, pis in valid_columns.values()]),
+            'dataset': np.repeat(list(valid_columns.keys()), [len(sizes) for sizes, _ in valid_columns.values()])
+        })
+        
+        fig = px.scatter(df_compare, x='Size(nm)', y='PI', color='dataset',
+                        title='Dataset Comparison',
+                        labels={'Size(nm)': 'Size (nm)', 'PI': 'PI'})
+        
+        comparison_plot = figure_payload(fig)
+        
+        # 통계 요약
+        stats_summary = {}
+        for name in dataset_names:
+            if name in valid_columns:
+                sizes, pis = valid_columns[name]
+                
+                stats_summary[name] = {
+                    'count': len(sizes),
+                    'size_mean': np.mean(sizes),
+                    'size_std': np.std(sizes),
+                    'pi_mean': np.mean(pis),
+                    'pi_std': np.std(pis)
+                }
+        
+        return jsonify({
+            'status': 'success',
+            'comparison_plot': comparison_plot,
+            'stats_summary': stats_summary
+        })
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/compare_datasets/matrix', methods=['POST'])
+def compare_datasets_matrix():
+    """선택된 데이터셋 쌍별 Welch t / Mann-Whitney U / KS 검정 행렬 (히트맵용)"""
+    try:
+        data = request.get_json()
+        dataset_names = data.get('dataset_names', [])
+        
+        if len(dataset_names) < 2:
+            return jsonify({'status': 'error', 'message': '비교하려면 최소 2개의 데이터셋을 선택해주세요.'})
+        
+        datasets = session.get('datasets', {})
+        labels, summaries = [], []
+        for name in dataset_names:
+            if name in datasets and name not in labels:
+                summary = get_dataset_summary(datasets[name])
+                if summary is not None and len(summary['Size(nm)']) > 0:
+                    labels.append(name)
+                    summaries.append(summary)
+        
+        if len(labels) < 2:
+            return jsonify({'status': 'error', 'message': '비교할 유효한 데이터셋이 2개 이상 필요합니다.'})
+        
+        matrices = comparison_matrix(summaries)
+        return jsonify({
+            'status': 'success',
+            'labels': labels,
+            'counts': [len(summary['Size(nm)']) for summary in summaries],
+            'variables': {
+                variable: {
+                    test: {key: _matrix_to_list(matrix) for key, matrix in values.items()}
+                    for test, values in tests.items()
+                }
+                for variable, tests in matrices.items()
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/distribution', methods=['GET'])
+@versioned_get('current', 'datasets')
+def get_distribution():
+    """현재 데이터/저장된 데이터셋의 Size(nm), PI 분포 (히스토그램 + KDE)
+    dataset=이름 (여러 개 가능), current=1 이면 현재 데이터 포함 (데이터셋 미지정 시 기본)"""
+    try:
+        dataset_names = request.args.getlist('dataset')
+        include_current = request.args.get('current', '1' if not dataset_names else '0') == '1'
+        bins = request.args.get('bins', DISTRIBUTION_DEFAULT_BINS, type=int)
+        if not 1 <= bins <= DISTRIBUTION_MAX_BINS:
+            return jsonify({'status': 'error', 'message': f'구간 수는 1~{DISTRIBUTION_MAX_BINS}이어야 합니다.'})
+        
+        distributions = []
+        if include_current:
+            table_data = session.get('current_dataset', {}).get('table_data', {})
+            if table_data:
+                sizes, pis, _ = extract_valid_pairs(table_data)
+                distribution = distribution_summary(sizes, pis, bins)
+                distribution.update({'name': session['current_dataset'].get('sample_name', '현재 데이터'), 'source': 'current'})
+                distributions.append(distribution)
+        
+        datasets = session.get('datasets', {})
+        for name in dataset_names:
+            if name in datasets:
+                distribution = get_saved_distribution(datasets[name], bins)
+                if distribution is None:
+                    # 저장소가 사라졌거나 필수 컬럼이 없는 데이터셋은 오류 항목으로 표시
+                    distributions.append({'name': name, 'source': 'saved', 'error': '데이터셋을 읽을 수 없습니다.'})
+                    continue
+                distribution = dict(distribution)
+                distribution.update({'name': name, 'source': 'saved'})
+                distributions.append(distribution)
+        
+        if not distributions:
+            return jsonify({'status': 'error', 'message': '분포를 계산할 데이터가 없습니다.'})
+        
+        return jsonify({'status': 'success', 'bins': bins, 'distributions': distributions})
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+# 업로드 파일 파싱 캐시: 파일 내용 SHA-256을 키로 파싱된 컬럼(dtype 유지) + 메타데이터를 디스크에 저장
+# 같은 파일을 다시 올리면 디코딩/메타데이터 탐색/pandas·openpyxl 파싱을 모두 건너뛰고 컬럼 매핑만 수행
+# 기본 위치는 앱 instance 디렉터리 아래 (소유자 전용 0700 권한), 캐시 파일은 pickle 없이 읽음
+UPLOAD_CACHE_DIR = os.environ.get('UPLOAD_CACHE_DIR', os.path.join(app.instance_path, 'upload_cache'))
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get('UPLOAD_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 파싱 로직이 바뀌면 올려서 이전 캐시 항목을 무효화
+UPLOAD_PARSER_VERSION = 2
+_upload_cache_lock = threading.Lock()
+# 압축 해제 후 최대 크기 (gzip/zip 압축 폭탄 방지)
+UPLOAD_MAX_DECOMPRESSED_BYTES = int(os.environ.get('UPLOAD_MAX_DECOMPRESSED_BYTES', 1024 * 1024 * 1024))
+# zip 업로드: 멤버 파일 형식, 최대 멤버 수, 프로세스 풀이 없을 때 파싱 스레드 수
+UPLOAD_ARCHIVE_MEMBER_EXTENSIONS = ('csv', 'csv.gz', 'xlsx', 'xls')
+UPLOAD_ARCHIVE_MAX_MEMBERS = int(os.environ.get('UPLOAD_ARCHIVE_MAX_MEMBERS', 50))
+UPLOAD_ARCHIVE_THREADS = int(os.environ.get('UPLOAD_ARCHIVE_THREADS', 4))
+# 업로드 파일을 워커 프로세스와 공유하기 위해 임시로 기록하는 디렉터리
+UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR',
+                                  os.path.join(tempfile.gettempdir(), 'outlier_upload_spool'))
+
+class DecompressedSizeLimit(io.RawIOBase):
+    """압축 해제 스트림을 읽은 크기가 한도를 넘으면 중단 (처음 위치로 되감기만 지원)"""
+    
+    def __init__(self, raw, limit):
+        self.raw = raw
+        self.limit = limit
+        self.position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        size = self.raw.readinto(buffer)
+        self.position += size
+        if self.position > self.limit:
+            raise ValueError(f'압축 해제 크기가 한도({self.limit // (1024 * 1024)}MB)를 초과했습니다.')
+        return size
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('압축 해제 스트림은 처음 위치로만 되감을 수 있습니다.')
+        self.raw.seek(0)
+        self.position = 0
+        return 0
+    
+    def tell(self):
+        return self.position
+
+def open_gzip_stream(file):
+    """gzip 파일을 청크 단위로 압축 해제하며 읽는 스트림 (전체 내용을 메모리에 풀지 않음)"""
+    raw = DecompressedSizeLimit(gzip.GzipFile(fileobj=file, mode='rb'), UPLOAD_MAX_DECOMPRESSED_BYTES)
+    return io.BufferedReader(raw, UPLOAD_CHUNK_SIZE)
+
+def scan_csv_metadata(stream):
+    """CSV를 한 줄씩 읽으며 메타데이터와 데이터 시작 행을 찾아 (metadata, data_start_line) 반환
+    
+    데이터 헤더 행에서 멈추므로 파일 전체를 메모리에 올리지 않음 (탐색 후 처음 위치로 되돌림)
+    """
+    metadata = {}
+    data_start_line = 0
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='\n')
+    try:
+        # 메타데이터 추출 및 데이터 시작점 찾기
+        in_data_section = False
+        for i, line in enumerate(text):
+            line = line.strip()
+            
+            # combined_data_outliers 파일의 특별한 구조 처리
+            if '=== 데이터 + 이상치 분석 결과 ===' in line:
+                in_data_section = True
+                continue
+            
+            # 메타데이터 추출 (데이터 섹션 이전에만)
+            if not in_data_section and ',' in line and not line.startswith('No.'):
+                parts = line.split(',', 1)
+                if len(parts) == 2:
+                    key = parts[0].strip()
+                    value = parts[1].strip()
+                    
+                    # 키-값 매핑
+                    if key in ['샘플명', 'sample_name', 'Sample Name']:
+                        metadata['sample_name'] = value
+                    elif key in ['생산일자', 'production_date', 'Production Date']:
+                        metadata['production_date'] = value
+                    elif key in ['패스', 'pass', 'Pass', '패스 수', 'pass_count']:
+                        try:
+                            metadata['pass_count'] = int(value)
+                        except ValueError:
+                            metadata['pass_count'] = 1
+            
+            # 데이터 시작점 찾기 (No. 컬럼이 있는 행)
+            if 'No.' in line and ('Size(nm)' in line or 'size(nm)' in line):
+                data_start_line = i
+                break
+    finally:
+        # 래퍼가 닫히면서 원본 스트림까지 닫지 않도록 분리
+        text.detach()
+    stream.seek(0)
+    return metadata, data_start_line
+
+def parse_upload(file, filename):
+    """업로드 파일을 DataFrame과 메타데이터(샘플명/생산일자/패스)로 파싱 (.csv.gz는 스트리밍 압축 해제)"""
+    metadata = {}
+    extension = upload_extension(filename)
+    if extension in ('csv', 'csv.gz'):
+        if extension == 'csv.gz':
+            file = open_gzip_stream(file)
+        # CSV 파일을 읽을 때 메타데이터 추출 및 데이터 부분 분리
+        try:
+            metadata, data_start_line = scan_csv_metadata(file)
+            
+            if data_start_line > 0:
+                # 메타데이터 부분을 건너뛰고 데이터 부분만 읽기
+                df = pd.read_csv(file, skiprows=data_start_line)
+            else:
+                df = pd.read_csv(file)
+        except Exception:
+            # 일반적인 CSV 읽기로 fallback
+            file.seek(0)
+            df = pd.read_csv(file)
+    else:
+        df = pd.read_excel(file)
+    # 엑셀 헤더가 날짜/숫자여도 컬럼 매핑과 캐시 기록이 가능하도록 컬럼명은 문자열로 통일
+    df.columns = [str(col) for col in df.columns]
+    return df, metadata
+
+def map_upload_frame(df):
+    """파싱된 DataFrame을 테이블 컬럼(No., Size(nm), PI, 기타 숫자/이상치 컬럼)으로 매핑"""
+    table_data = {'No.': list(range(1, len(df) + 1))}
+    
+    # 기본 컬럼들 찾기
+    size_cols = [col for col in df.columns if 'size' in col.lower() or 'nm' in col.lower()]
+    pi_cols = [col for col in df.columns if 'pi' in col.lower()]
+    
+    if size_cols:
+        table_data['Size(nm)'] = df[size_cols[0]].fillna('').tolist()
+    else:
+        table_data['Size(nm)'] = [None] * len(df)
+    
+    if pi_cols:
+        table_data['PI'] = df[pi_cols[0]].fillna('').tolist()
+    else:
+        table_data['PI'] = [None] * len(df)
+    
+    # 기타 컬럼들 추가 (숫자 및 이상치 컬럼 포함)
+    for col in df.columns:
+        if col not in size_cols + pi_cols and col != 'No.':
+            # 숫자 컬럼 또는 이상치 관련 컬럼 추가
+            if pd.api.types.is_numeric_dtype(df[col]) or '_이상치' in col:
+                table_data[col] = df[col].fillna('').tolist()
+    
+    columns_mapped = {
+        'Size(nm)': size_cols[0] if size_cols else None,
+        'PI': pi_cols[0] if pi_cols else None,
+        'outlier_columns': [col for col in df.columns if '_이상치' in col]
+    }
+    return table_data, columns_mapped
+
+def hash_upload_stream(stream):
+    """업로드 스트림을 청크 단위로 읽으며 SHA-256 계산 (다 읽은 뒤 처음 위치로 되돌림)"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def upload_cache_key(content_hash, filename):
+    """캐시 키 (내용 해시 + 파서 종류 + 파서 버전)"""
+    kind = 'csv' if upload_extension(filename) in ('csv', 'csv.gz') else 'excel'
+    return f'{content_hash}-{kind}-v{UPLOAD_PARSER_VERSION}'
+
+def _upload_cache_dir(key):
+    return os.path.join(UPLOAD_CACHE_DIR, key[:2], key)
+
+def read_upload_cache(key):
+    """캐시 적중 시 (DataFrame, 메타데이터), 없으면 None (적중한 항목은 최근 사용으로 갱신)"""
+    directory = _upload_cache_dir(key)
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        columns = {column['name']: _read_cache_column(directory, column) for column in meta['columns']}
+        os.utime(meta_path)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return pd.DataFrame(columns), meta['metadata']
+
+def _read_cache_column(directory, column):
+    """캐시 컬럼 읽기 (숫자/날짜는 .npy, 문자열 등 object 컬럼은 JSON — 어느 쪽도 pickle을 쓰지 않음)"""
+    path = os.path.join(directory, column['file'])
+    if column['object']:
+        with open(path, encoding='utf-8') as f:
+            values = json.load(f)
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    return np.load(path, allow_pickle=False)
+
+def write_upload_cache(key, df, metadata):
+    """파싱 결과를 캐시에 기록 (컬럼별 .npy/JSON, dtype 유지) 후 용량 한도 초과분 정리
+    
+    JSON으로 표현할 수 없는 값(날짜 헤더 등)이 있으면 예외를 내고 임시 디렉터리는 남기지 않음
+    """
+    target_dir = _upload_cache_dir(key)
+    if os.path.exists(target_dir):
+        return
+    os.makedirs(UPLOAD_CACHE_DIR, mode=0o700, exist_ok=True)
+    tmp_dir = f'{target_dir}.{uuid.uuid4().hex}.tmp'
+    os.makedirs(tmp_dir, mode=0o700, exist_ok=True)
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            array = df[name].to_numpy()
+            is_object = array.dtype.kind == 'O'
+            if is_object:
+                filename = f'col_{i}.json'
+                with open(os.path.join(tmp_dir, filename), 'w', encoding='utf-8') as f:
+                    json.dump(array.tolist(), f, ensure_ascii=False)
+            else:
+                filename = f'col_{i}.npy'
+                np.save(os.path.join(tmp_dir, filename), array, allow_pickle=False)
+            columns.append({'name': name, 'file': filename, 'object': is_object})
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'metadata': metadata, 'columns': columns, 'rows': len(df)}, f, ensure_ascii=False)
+        os.replace(tmp_dir, target_dir)
+    finally:
+        # 기록 실패 또는 다른 요청이 같은 파일을 먼저 기록한 경우
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    evict_upload_cache()
+
+def evict_upload_cache(max_bytes=UPLOAD_CACHE_MAX_BYTES):
+    """캐시 총 크기가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)"""
+    with _upload_cache_lock:
+        entries = []
+        for prefix in os.listdir(UPLOAD_CACHE_DIR):
+            prefix_dir = os.path.join(UPLOAD_CACHE_DIR, prefix)
+            for key in os.listdir(prefix_dir):
+                directory = os.path.join(prefix_dir, key)
+                try:
+                    size = sum(entry.stat().st_size for entry in os.scandir(directory))
+                    last_used = os.path.getmtime(os.path.join(directory, 'meta.json'))
+                except OSError:
+                    continue
+                entries.append((last_used, size, directory))
+        total = sum(size for _, size, _ in entries)
+        for _, size, directory in sorted(entries):
+            if total <= max_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+
+def parse_upload_cached(file, filename, parse=None):
+    """내용 해시로 캐시를 조회해 (DataFrame, 메타데이터, 'hit'/'miss') 반환
+    
+    parse: 캐시가 없을 때 (DataFrame, 메타데이터)를 돌려줄 함수 (기본: 스트림을 직접 파싱)
+    """
+    key = upload_cache_key(hash_upload_stream(file), filename)
+    cached = read_upload_cache(key)
+    if cached is not None:
+        return cached[0], cached[1], 'hit'
+    df, metadata = parse() if parse is not None else parse_upload(file, filename)
+    try:
+        write_upload_cache(key, df, metadata)
+    except Exception:
+        pass  # 캐시 기록 실패는 업로드 결과에 영향 없음
+    return df, metadata, 'miss'
+
+def list_archive_members(archive):
+    """zip 안에서 파싱할 CSV/Excel 멤버 목록 (디렉터리, 숨김 파일, macOS 메타데이터 제외)"""
+    members = [info for info in archive.infolist()
+               if not info.is_dir()
+               and upload_extension(info.filename) in UPLOAD_ARCHIVE_MEMBER_EXTENSIONS
+               and not info.filename.startswith('__MACOSX/')
+               and not os.path.basename(info.filename).startswith('.')]
+    if not members:
+        raise ValueError('압축 파일에 CSV/Excel 파일이 없습니다.')
+    if len(members) > UPLOAD_ARCHIVE_MAX_MEMBERS:
+        raise ValueError(f'압축 파일의 파일 수가 너무 많습니다. (최대 {UPLOAD_ARCHIVE_MAX_MEMBERS}개)')
+    if sum(info.file_size for info in members) > UPLOAD_MAX_DECOMPRESSED_BYTES:
+        raise ValueError(f'압축 해제 크기가 한도({UPLOAD_MAX_DECOMPRESSED_BYTES // (1024 * 1024)}MB)를 초과했습니다.')
+    return [info.filename for info in members]
+
+def parse_archive_member(archive_path, member_name):
+    """zip 멤버 하나를 압축 해제 스트림에서 바로 파싱 (프로세스 풀 워커에서 실행되므로 모듈 최상위 함수)"""
+    with zipfile.ZipFile(archive_path) as archive, archive.open(member_name) as member:
+        if upload_extension(member_name) in ('xlsx', 'xls'):
+            # 엑셀은 임의 위치 읽기가 필요하므로 (자체 압축된) 파일 내용만 메모리로 읽음
+            return parse_upload(io.BytesIO(member.read()), member_name)
+        return parse_upload(member, member_name)
+
+def archive_dataset_name(member_name, taken):
+    """zip 멤버 경로에서 확장자를 뗀 데이터셋 이름
+    
+    이미 저장된 데이터셋이나 같은 zip의 다른 멤버(a.csv / a.xlsx 등)와 겹치면 "a (2)"처럼 번호를 붙임
+    """
+    extension = upload_extension(member_name)
+    base_name = member_name[:-(len(extension) + 1)]
+    dataset_name = base_name
+    suffix = 2
+    while dataset_name in taken:
+        dataset_name = f'{base_name} ({suffix})'
+        suffix += 1
+    taken.add(dataset_name)
+    return dataset_name
+
+def parse_upload_archive(file, archive_hash):
+    """zip 업로드 스트림을 디스크에 기록한 뒤 parse_archive_file로 파싱"""
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, archive_path = tempfile.mkstemp(suffix='.zip', dir=UPLOAD_SPOOL_DIR)
     try:
-        data = request.get_json()
-        dataset_names = data.get('dataset_names', [])
-        
-        if len(dataset_names) < 2:
-            return jsonify({'status': 'error', 'message': '비교하려면 최소 2개의 데이터셋을 선택해주세요.'})
-        
-        datasets = session.get('datasets', {})
-        comparison_data = []
-        
-        for name in dataset_names:
-            if name in datasets:
-                dataset = datasets[name]
-                table_data = dataset.get('table_data', {})
-                df = pd.DataFrame(table_data)
-                
-                # 유효한 데이터만 추출
-                valid_data = []
-                for i in range(len(df)):
-                    size_val = df.iloc[i].get('Size(nm)')
-                    pi_val = df.iloc[i].get('PI')
-                    
-                    try:
-                        if size_val is not None and pi_val is not None:
-                            size_float = float(size_val)
-                            pi_float = float(pi_val)
-                            if not (np.isnan(size_float) or np.isnan(pi_float)):
-                                valid_data.append({
-                                    'Size(nm)': size_float,
-                                    'PI': pi_float,
-                                    'dataset': name
-                                })
-                    except (ValueError, TypeError):
-                        continue
-                
-                comparison_data.extend(valid_data)
-        
-        if not comparison_data:
-            return jsonify({'status': 'error', 'message': '비교할 유효한 데이터가 없습니다.'})
-        
-        # 비교 시각화 생성
-        df_compare = pd.DataFrame(comparison_data)
-        
-        fig = px.scatter(df_compare, x='Size(nm)', y='PI', color='dataset',
-                        title='Dataset Comparison',
-                        labels={'Size(nm)': 'Size (nm)', 'PI': 'PI'})
-        
-        comparison_plot = json.dumps(fig, cls=PlotlyJSONEncoder)
-        
-        # 통계 요약
-        stats_summary = {}
-        for name in dataset_names:
-            dataset_data = [d for d in comparison_data if d['dataset'] == name]
-            if dataset_data:
-                sizes = [d['Size(nm)'] for d in dataset_data]
-                pis = [d['PI'] for d in dataset_data]
-                
-                stats_summary[name] = {
-                    'count': len(dataset_data),
-                    'size_mean': np.mean(sizes),
-                    'size_std': np.std(sizes),
-                    'pi_mean': np.mean(pis),
-                    'pi_std': np.std(pis)
-                }
-        
+        # 워커 프로세스가 각자 멤버를 열 수 있도록 zip을 디스크에 기록
+        with os.fdopen(fd, 'wb') as spool:
+            shutil.copyfileobj(file, spool, UPLOAD_CHUNK_SIZE)
+        return parse_archive_file(archive_path, archive_hash)
+    finally:
+        try:
+            os.remove(archive_path)
+        except OSError:
+            pass
+
+def parse_archive_file(archive_path, archive_hash):
+    """zip 파일의 멤버들을 병렬로 파싱해 [(멤버명, DataFrame, 메타데이터, 캐시 상태 또는 오류)] 반환
+    
+    멤버별 파싱 결과도 (zip 해시 + 멤버명) 키로 업로드 캐시에 저장
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        names = list_archive_members(archive)
+    
+    results = {}
+    keys = {}
+    for name in names:
+        member_hash = hashlib.sha256(f'{archive_hash}:{name}'.encode('utf-8')).hexdigest()
+        keys[name] = upload_cache_key(member_hash, name)
+        cached = read_upload_cache(keys[name])
+        if cached is not None:
+            results[name] = (cached[0], cached[1], 'hit')
+    
+    pending = [name for name in names if name not in results]
+    for name, outcome in zip(pending, _map_archive_members(archive_path, pending)):
+        if isinstance(outcome, Exception):
+            results[name] = (None, {}, str(outcome))
+            continue
+        df, metadata = outcome
+        try:
+            write_upload_cache(keys[name], df, metadata)
+        except Exception:
+            pass  # 캐시 기록 실패는 업로드 결과에 영향 없음
+        results[name] = (df, metadata, 'miss')
+    return [(name, *results[name]) for name in names]
+
+def _map_archive_members(archive_path, names):
+    """멤버들을 병렬 파싱해 결과 또는 예외 목록 반환 (프로세스 풀이 없으면 스레드 사용)"""
+    pool = get_analysis_pool() if len(names) > 1 else None
+    if pool is not None:
+        try:
+            futures = [pool.submit(parse_archive_member, archive_path, name) for name in names]
+            outcomes = [future.exception() or future.result() for future in futures]
+            if not any(isinstance(outcome, BrokenProcessPool) for outcome in outcomes):
+                return outcomes
+        except BrokenProcessPool:
+            pass
+        # 워커가 비정상 종료된 경우 풀을 재생성하도록 초기화하고 스레드로 실행
+        _reset_analysis_pool()
+    
+    # 압축 해제(zlib)와 pandas CSV 토큰화는 GIL을 놓으므로 스레드로도 겹쳐 실행됨
+    workers = max(1, min(len(names), UPLOAD_ARCHIVE_THREADS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_archive_member, archive_path, name) for name in names]
+        return [future.exception() or future.result() for future in futures]
+
+def store_archive_datasets(parsed):
+    """zip 멤버별 파싱 결과를 각각의 저장된 데이터셋으로 기록하고 (저장 목록, 실패 목록) 반환"""
+    saved = []
+    failed = []
+    # 기존 데이터셋을 덮어쓰지 않도록 이미 쓰인 이름 목록에서 시작
+    taken = set(session.get('datasets', {}))
+    for name, df, metadata, status in parsed:
+        if df is None or len(df) == 0:
+            failed.append({'file': name, 'message': status if df is None else '빈 파일입니다.'})
+            continue
+        table_data, columns_mapped = map_upload_frame(df)
+        dataset_name = archive_dataset_name(name, taken)
+        dataset = {
+            'sample_name': metadata.get('sample_name', dataset_name),
+            'production_date': metadata.get('production_date', ''),
+            'pass_count': metadata.get('pass_count', 1),
+            'table_data': table_data
+        }
+        store_dataset(dataset_name, dataset)
+        saved.append({
+            'dataset_name': dataset_name,
+            'file': name,
+            'rows': len(df),
+            'sample_name': dataset['sample_name'],
+            'columns_mapped': columns_mapped,
+            'parse_cache': status
+        })
+    return saved, failed
+
+def apply_upload_to_session(table_data, metadata):
+    """매핑된 테이블과 추출된 메타데이터를 현재 데이터셋에 반영"""
+    current_dataset = session.get('current_dataset', {})
+    
+    # 메타데이터가 있으면 기존 정보 업데이트
+    if metadata:
+        if 'sample_name' in metadata:
+            current_dataset['sample_name'] = metadata['sample_name']
+        if 'production_date' in metadata:
+            current_dataset['production_date'] = metadata['production_date']
+        if 'pass_count' in metadata:
+            current_dataset['pass_count'] = metadata['pass_count']
+    
+    current_dataset['table_data'] = table_data
+    ensure_trend_log(current_dataset)
+    session['current_dataset'] = current_dataset
+    return current_dataset
+
+def upload_message(row_count, metadata, columns_mapped):
+    """업로드 결과 안내 메시지"""
+    message = f'파일이 성공적으로 업로드되었습니다. ({row_count}행)'
+    
+    # combined_data_outliers 파일인지 확인
+    outlier_cols = columns_mapped['outlier_columns']
+    if outlier_cols:
+        message += f' 이상치 분석 결과 파일이 감지되었습니다. ({len(outlier_cols)}개 이상치 컬럼 포함)'
+    
+    if metadata:
+        metadata_info = []
+        if 'sample_name' in metadata:
+            metadata_info.append(f"샘플명: {metadata['sample_name']}")
+        if 'production_date' in metadata:
+            metadata_info.append(f"생산일자: {metadata['production_date']}")
+        if 'pass_count' in metadata:
+            metadata_info.append(f"패스: {metadata['pass_count']}")
+        
+        if metadata_info:
+            message += f' 메타데이터도 자동 업데이트되었습니다. ({", ".join(metadata_info)})'
+    return message
+
+def upload_response(stream, filename, window_source, spool_path=None, parse=None):
+    """업로드 스트림을 파싱해 현재 데이터(또는 zip이면 저장된 데이터셋)에 반영하고 응답 생성
+    
+    spool_path: 스트림이 디스크에 있는 파일이면 그 경로 (zip을 다시 기록하지 않음)
+    parse: 미리 시작한 파싱 결과를 돌려줄 함수 (캐시가 없을 때 사용)
+    """
+    if upload_extension(filename) == 'zip':
+        # zip: 멤버마다 별도의 저장된 데이터셋 생성 (현재 데이터는 유지)
+        archive_hash = hash_upload_stream(stream)
+        if spool_path is not None:
+            parsed = parse_archive_file(spool_path, archive_hash)
+        else:
+            parsed = parse_upload_archive(stream, archive_hash)
+        saved, failed = store_archive_datasets(parsed)
+        if not saved:
+            reasons = ', '.join(f"{item['file']}: {item['message']}" for item in failed)
+            return jsonify({'status': 'error', 'message': f'파일 읽기 오류: {reasons}'})
+        message = f'압축 파일에서 데이터셋 {len(saved)}개를 저장했습니다. ({sum(item["rows"] for item in saved)}행)'
+        if failed:
+            message += f' {len(failed)}개 파일은 읽지 못했습니다.'
         return jsonify({
             'status': 'success',
-            'comparison_plot': comparison_plot,
-            'stats_summary': stats_summary
+            'archive': True,
+            'message': message,
+            'datasets': saved,
+            'failed': failed
         })
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)})
+    
+    # 파일 읽기 및 메타데이터 추출 (같은 내용의 파일은 캐시된 파싱 결과 사용)
+    df, metadata, cache_status = parse_upload_cached(stream, filename, parse)
+    
+    # 데이터 변환
+    if len(df) == 0:
+        return jsonify({'status': 'error', 'message': '빈 파일입니다.'})
+    
+    table_data, columns_mapped = map_upload_frame(df)
+    current_dataset = apply_upload_to_session(table_data, metadata)
+    offset, limit, _ = parse_table_window(window_source)
+    
+    return jsonify({
+        'status': 'success',
+        'table': table_window(table_data, offset, limit),
+        'message': upload_message(len(df), metadata, columns_mapped),
+        'metadata': metadata,  # 추출된 메타데이터 정보
+        'sample_name': current_dataset.get('sample_name', ''),
+        'production_date': current_dataset.get('production_date', ''),
+        'pass_count': current_dataset.get('pass_count', 1),
+        'columns_mapped': columns_mapped,
+        'parse_cache': cache_status
+    })
 
 @app.route('/upload_file', methods=['POST'])
+@mutates_data('current', 'datasets')
 def upload_file():
     try:
         if 'file' not in request.files:
@@ -589,152 +3669,355 @@ def upload_file():
             filename = secure_filename(file.filename)
             
             try:
-                # 파일 읽기 및 메타데이터 추출
-                metadata = {}
-                if filename.endswith('.csv'):
-                    # CSV 파일을 읽을 때 메타데이터 추출 및 데이터 부분 분리
-                    try:
-                        # 먼저 전체 파일을 읽어서 메타데이터와 데이터 시작점 찾기
-                        file_content = file.read().decode('utf-8')
-                        file.seek(0)  # 파일 포인터 리셋
-                        
-                        lines = file_content.split('\n')
-                        data_start_line = 0
-                        
-                        # 메타데이터 추출 및 데이터 시작점 찾기
-                        in_data_section = False
-                        for i, line in enumerate(lines):
-                            line = line.strip()
-                            
-                            # combined_data_outliers 파일의 특별한 구조 처리
-                            if '=== 데이터 + 이상치 분석 결과 ===' in line:
-                                in_data_section = True
-                                continue
-                            
-                            # 메타데이터 추출 (데이터 섹션 이전에만)
-                            if not in_data_section and ',' in line and not line.startswith('No.'):
-                                parts = line.split(',', 1)
-                                if len(parts) == 2:
-                                    key = parts[0].strip()
-                                    value = parts[1].strip()
-                                    
-                                    # 키-값 매핑
-                                    if key in ['샘플명', 'sample_name', 'Sample Name']:
-                                        metadata['sample_name'] = value
-                                    elif key in ['생산일자', 'production_date', 'Production Date']:
-                                        metadata['production_date'] = value
-                                    elif key in ['패스', 'pass', 'Pass', '패스 수', 'pass_count']:
-                                        try:
-                                            metadata['pass_count'] = int(value)
-                                        except ValueError:
-                                            metadata['pass_count'] = 1
-                            
-                            # 데이터 시작점 찾기 (No. 컬럼이 있는 행)
-                            if 'No.' in line and ('Size(nm)' in line or 'size(nm)' in line):
-                                data_start_line = i
-                                break
-                        
-                        if data_start_line > 0:
-                            # 메타데이터 부분을 건너뛰고 데이터 부분만 읽기
-                            df = pd.read_csv(file, skiprows=data_start_line)
-                        else:
-                            df = pd.read_csv(file)
-                    except Exception:
-                        # 일반적인 CSV 읽기로 fallback
-                        file.seek(0)
-                        df = pd.read_csv(file)
-                else:
-                    df = pd.read_excel(file)
-                
-                # 데이터 변환
-                if len(df) == 0:
-                    return jsonify({'status': 'error', 'message': '빈 파일입니다.'})
-                
-                # 컬럼 매핑 시도
-                table_data = {'No.': list(range(1, len(df) + 1))}
-                
-                # 기본 컬럼들 찾기
-                size_cols = [col for col in df.columns if 'size' in col.lower() or 'nm' in col.lower()]
-                pi_cols = [col for col in df.columns if 'pi' in col.lower()]
-                
-                if size_cols:
-                    table_data['Size(nm)'] = df[size_cols[0]].fillna('').tolist()
-                else:
-                    table_data['Size(nm)'] = [None] * len(df)
-                
-                if pi_cols:
-                    table_data['PI'] = df[pi_cols[0]].fillna('').tolist()
-                else:
-                    table_data['PI'] = [None] * len(df)
-                
-                # 기타 컬럼들 추가 (숫자 및 이상치 컬럼 포함)
-                for col in df.columns:
-                    if col not in size_cols + pi_cols and col != 'No.':
-                        # 숫자 컬럼 또는 이상치 관련 컬럼 추가
-                        if pd.api.types.is_numeric_dtype(df[col]) or '_이상치' in col:
-                            table_data[col] = df[col].fillna('').tolist()
-                
-                # 세션 데이터 업데이트 (메타데이터 포함)
-                current_dataset = session.get('current_dataset', {})
-                
-                # 메타데이터가 있으면 기존 정보 업데이트
-                if metadata:
-                    if 'sample_name' in metadata:
-                        current_dataset['sample_name'] = metadata['sample_name']
-                    if 'production_date' in metadata:
-                        current_dataset['production_date'] = metadata['production_date']
-                    if 'pass_count' in metadata:
-                        current_dataset['pass_count'] = metadata['pass_count']
-                
-                current_dataset['table_data'] = table_data
-                session['current_dataset'] = current_dataset
-                
-                clean_table_data = clean_data_for_json(table_data)
-                
-                # 응답 메시지 생성
-                message = f'파일이 성공적으로 업로드되었습니다. ({len(df)}행)'
-                
-                # combined_data_outliers 파일인지 확인
-                outlier_cols = [col for col in df.columns if '_이상치' in col]
-                if outlier_cols:
-                    message += f' 이상치 분석 결과 파일이 감지되었습니다. ({len(outlier_cols)}개 이상치 컬럼 포함)'
-                
-                if metadata:
-                    metadata_info = []
-                    if 'sample_name' in metadata:
-                        metadata_info.append(f"샘플명: {metadata['sample_name']}")
-                    if 'production_date' in metadata:
-                        metadata_info.append(f"생산일자: {metadata['production_date']}")
-                    if 'pass_count' in metadata:
-                        metadata_info.append(f"패스: {metadata['pass_count']}")
-                    
-                    if metadata_info:
-                        message += f' 메타데이터도 자동 업데이트되었습니다. ({", ".join(metadata_info)})'
-                
-                return jsonify({
-                    'status': 'success',
-                    'table_data': clean_table_data,
-                    'message': message,
-                    'metadata': metadata,  # 추출된 메타데이터 정보
-                    'sample_name': current_dataset.get('sample_name', ''),
-                    'production_date': current_dataset.get('production_date', ''),
-                    'pass_count': current_dataset.get('pass_count', 1),
-                    'columns_mapped': {
-                        'Size(nm)': size_cols[0] if size_cols else None,
-                        'PI': pi_cols[0] if pi_cols else None,
-                        'outlier_columns': outlier_cols
-                    }
-                })
-                
+                return upload_response(file.stream, filename, request.form)
             except Exception as e:
                 return jsonify({'status': 'error', 'message': f'파일 읽기 오류: {str(e)}'})
         
-        return jsonify({'status': 'error', 'message': '지원되지 않는 파일 형식입니다. (xlsx, xls, csv만 지원)'})
+        return jsonify({'status': 'error', 'message': UNSUPPORTED_UPLOAD_MESSAGE})
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+# 청크 업로드: 시작 → 번호별 청크 PUT → 완료 순서로 큰 파일을 나눠 전송
+# 청크는 스풀 파일의 해당 위치에 바로 기록하고, 도착 표시 파일로 수신 여부를 남겨 여러 워커/재시작 후에도 이어받기 가능
+# CSV(.csv, .csv.gz)는 앞쪽 청크가 도착하는 대로 백그라운드 스레드에서 파싱을 시작
+CHUNKED_UPLOAD_DIR = os.path.join(UPLOAD_SPOOL_DIR, 'chunked')
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_MB', 1024)) * 1024 * 1024
+# 마지막 청크 이후 이 시간(초)이 지난 미완료 업로드는 정리
+CHUNKED_UPLOAD_TTL = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 3600))
+# 다음 청크를 기다리는 파싱 스레드가 디스크 상태를 다시 확인하는 간격 / 포기하는 시간 (초)
+CHUNKED_UPLOAD_POLL_INTERVAL = 0.5
+CHUNKED_UPLOAD_WAIT_TIMEOUT = int(os.environ.get('CHUNKED_UPLOAD_WAIT_TIMEOUT', 600))
+# 사용자별 동시 진행 업로드 수 (넘으면 가장 오래 진행되지 않은 업로드부터 정리)
+CHUNKED_UPLOAD_MAX_ACTIVE = int(os.environ.get('CHUNKED_UPLOAD_MAX_ACTIVE', 4))
+# 이 프로세스에서 진행 중인 점진 파싱: upload_id → {'condition', 'future', 'cancelled'}
+_chunked_parsers = {}
+_chunked_parsers_lock = threading.Lock()
+
+def chunked_upload_dir(upload_id):
+    """현재 사용자의 청크 업로드 스풀 디렉터리 (잘못된 ID는 ValueError)"""
+    if len(upload_id) != 32 or any(c not in '0123456789abcdef' for c in upload_id):
+        raise ValueError('잘못된 업로드 ID입니다.')
+    return os.path.join(CHUNKED_UPLOAD_DIR, get_storage_owner(), upload_id)
+
+def read_chunked_upload(upload_id):
+    """청크 업로드 메타데이터 읽기 (없으면 None)"""
+    try:
+        with open(os.path.join(chunked_upload_dir(upload_id), 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return None
+
+def received_chunks(directory):
+    """도착 표시 파일로 확인한 수신 완료 청크 번호 (정렬)"""
+    try:
+        return sorted(int(name) for name in os.listdir(os.path.join(directory, 'received')))
+    except OSError:
+        return []
+
+def chunked_upload_status(upload_id, meta):
+    """클라이언트에 돌려줄 업로드 상태 (수신 청크, 이어서 보낼 청크 번호)"""
+    received = received_chunks(chunked_upload_dir(upload_id))
+    received_set = set(received)
+    next_chunk = next((index for index in range(meta['total_chunks']) if index not in received_set),
+                      meta['total_chunks'])
+    return {
+        'upload_id': upload_id,
+        'filename': meta['filename'],
+        'size': meta['size'],
+        'chunk_size': meta['chunk_size'],
+        'total_chunks': meta['total_chunks'],
+        'received': received,
+        'next_chunk': next_chunk
+    }
+
+def chunk_length(meta, index):
+    """청크 번호별 바이트 수 (마지막 청크는 나머지)"""
+    return min(meta['chunk_size'], meta['size'] - index * meta['chunk_size'])
+
+def contiguous_upload_bytes(directory, meta):
+    """파일 앞에서부터 빠짐없이 도착한 바이트 수"""
+    received = set(received_chunks(directory))
+    index = 0
+    while index in received:
+        index += 1
+    return min(index * meta['chunk_size'], meta['size'])
+
+def evict_stale_chunked_uploads():
+    """오래 진행되지 않은 미완료 업로드의 스풀 파일 삭제"""
+    cutoff = datetime.now().timestamp() - CHUNKED_UPLOAD_TTL
+    # 다른 워커에서 완료된 업로드의 파싱 결과는 이 프로세스에서 더 이상 쓰이지 않으므로 해제
+    with _chunked_parsers_lock:
+        orphaned = [upload_id for upload_id, state in _chunked_parsers.items()
+                    if not os.path.isdir(state['directory'])]
+    for upload_id in orphaned:
+        cancel_chunked_parser(upload_id)
+    try:
+        owners = os.listdir(CHUNKED_UPLOAD_DIR)
+    except OSError:
+        return
+    for owner in owners:
+        owner_dir = os.path.join(CHUNKED_UPLOAD_DIR, owner)
+        for upload_id in os.listdir(owner_dir):
+            directory = os.path.join(owner_dir, upload_id)
+            try:
+                last_activity = os.path.getmtime(os.path.join(directory, 'data'))
+            except OSError:
+                last_activity = 0
+            if last_activity < cutoff:
+                cancel_chunked_parser(upload_id)
+                shutil.rmtree(directory, ignore_errors=True)
+
+def limit_active_chunked_uploads():
+    """새 업로드를 시작하기 전에 현재 사용자의 진행 중 업로드를 최대 개수 미만으로 줄임
+    (스풀 파일은 전체 크기로 미리 만들어지므로 개수 제한이 없으면 디스크를 빠르게 점유)"""
+    owner_dir = os.path.join(CHUNKED_UPLOAD_DIR, get_storage_owner())
+    try:
+        upload_ids = os.listdir(owner_dir)
+    except OSError:
+        return
+    
+    def last_activity(upload_id):
+        try:
+            return os.path.getmtime(os.path.join(owner_dir, upload_id, 'data'))
+        except OSError:
+            return 0
+    
+    upload_ids.sort(key=last_activity)
+    for upload_id in upload_ids[:max(len(upload_ids) - CHUNKED_UPLOAD_MAX_ACTIVE + 1, 0)]:
+        cancel_chunked_parser(upload_id)
+        shutil.rmtree(os.path.join(owner_dir, upload_id), ignore_errors=True)
+
+class SpooledUploadReader(io.RawIOBase):
+    """청크 업로드 스풀 파일을 앞에서부터 읽는 스트림 (아직 도착하지 않은 구간은 도착할 때까지 대기)"""
+    
+    def __init__(self, directory, meta, state):
+        self.directory = directory
+        self.meta = meta
+        self.state = state
+        self.file = open(os.path.join(directory, 'data'), 'rb')
+        self.position = 0
+        self.available = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def _wait_for(self, position):
+        # 같은 프로세스의 청크 PUT은 condition으로 깨우고, 다른 워커가 받은 청크는 주기적으로 디스크에서 확인
+        deadline = time.monotonic() + CHUNKED_UPLOAD_WAIT_TIMEOUT
+        with self.state['condition']:
+            while True:
+                # 다른 워커에서 완료/취소되어 스풀 디렉터리가 지워진 경우도 중단
+                if self.state['cancelled'] or not os.path.isdir(self.directory):
+                    raise ValueError('업로드가 취소되었습니다.')
+                self.available = contiguous_upload_bytes(self.directory, self.meta)
+                if self.available > position or self.available >= self.meta['size']:
+                    return
+                if time.monotonic() > deadline:
+                    raise ValueError('업로드 청크를 기다리는 시간이 초과되었습니다.')
+                self.state['condition'].wait(CHUNKED_UPLOAD_POLL_INTERVAL)
+    
+    def readinto(self, buffer):
+        if self.position >= self.meta['size']:
+            return 0
+        if self.position >= self.available:
+            self._wait_for(self.position)
+        size = min(len(buffer), self.available - self.position)
+        self.file.seek(self.position)
+        size = self.file.readinto(memoryview(buffer)[:size])
+        self.position += size
+        return size
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('청크 업로드 스트림은 처음 위치로만 되감을 수 있습니다.')
+        self.position = 0
+        return 0
+    
+    def tell(self):
+        return self.position
+    
+    def close(self):
+        self.file.close()
+        super().close()
+
+def _run_chunked_parser(directory, meta, state):
+    """백그라운드 스레드: 청크가 도착하는 대로 스풀 파일을 파싱"""
+    future = state['future']
+    reader = SpooledUploadReader(directory, meta, state)
+    try:
+        future.set_result(parse_upload(io.BufferedReader(reader, UPLOAD_CHUNK_SIZE), meta['filename']))
+    except Exception as e:
+        future.set_exception(e)
+    finally:
+        reader.close()
+
+def chunked_parse_result(state, data_path, filename):
+    """점진 파싱 결과 반환 (청크 대기 시간 초과 등으로 중단되었으면 완성된 스풀 파일을 다시 파싱)"""
+    try:
+        return state['future'].result()
+    except Exception:
+        # 대기 시간(CHUNKED_UPLOAD_WAIT_TIMEOUT)보다 오래 끊겼다가 이어받은 업로드도 여기서 복구
+        with open(data_path, 'rb') as stream:
+            return parse_upload(stream, filename)
+
+def start_chunked_parser(upload_id, directory, meta):
+    """CSV 업로드면 점진 파싱 스레드 시작 (엑셀/zip은 파일 끝의 목록이 필요하므로 완료 시 파싱)"""
+    if upload_extension(meta['filename']) not in ('csv', 'csv.gz'):
+        return
+    state = {'condition': threading.Condition(), 'future': Future(), 'cancelled': False, 'directory': directory}
+    with _chunked_parsers_lock:
+        _chunked_parsers[upload_id] = state
+    threading.Thread(target=_run_chunked_parser, args=(directory, meta, state), daemon=True).start()
+
+def notify_chunked_parser(upload_id):
+    """새 청크 도착을 파싱 스레드에 알림"""
+    state = _chunked_parsers.get(upload_id)
+    if state is not None:
+        with state['condition']:
+            state['condition'].notify_all()
+
+def cancel_chunked_parser(upload_id):
+    """파싱 스레드를 중단하고 등록 해제 (진행 중이던 상태 반환)"""
+    with _chunked_parsers_lock:
+        state = _chunked_parsers.pop(upload_id, None)
+    if state is not None:
+        with state['condition']:
+            state['cancelled'] = True
+            state['condition'].notify_all()
+    return state
+
+@app.route('/upload_chunks', methods=['POST'])
+def start_chunked_upload():
+    """청크 업로드 시작: 스풀 파일을 만들고 upload_id와 청크 크기 반환"""
+    try:
+        data = request.get_json()
+        if not data.get('filename') or not allowed_file(data['filename']):
+            return jsonify({'status': 'error', 'message': UNSUPPORTED_UPLOAD_MESSAGE})
+        size = int(data.get('size', 0))
+        if size <= 0:
+            return jsonify({'status': 'error', 'message': '빈 파일입니다.'})
+        if size > CHUNKED_UPLOAD_MAX_BYTES:
+            return jsonify({'status': 'error',
+                            'message': f'파일이 너무 큽니다. (최대 {CHUNKED_UPLOAD_MAX_BYTES // (1024 * 1024)}MB)'})
+        
+        evict_stale_chunked_uploads()
+        limit_active_chunked_uploads()
+        
+        upload_id = uuid.uuid4().hex
+        directory = chunked_upload_dir(upload_id)
+        os.makedirs(os.path.join(directory, 'received'))
+        # 청크 요청 하나가 MAX_CONTENT_LENGTH를 넘지 않도록 제한
+        chunk_size = min(CHUNKED_UPLOAD_CHUNK_SIZE, app.config['MAX_CONTENT_LENGTH'])
+        meta = {
+            'filename': secure_filename(data['filename']),
+            'size': size,
+            'chunk_size': chunk_size,
+            'total_chunks': -(-size // chunk_size)
+        }
+        # 청크를 도착 순서와 무관하게 제 위치에 쓰도록 전체 크기로 미리 생성
+        with open(os.path.join(directory, 'data'), 'wb') as f:
+            f.truncate(size)
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        
+        start_chunked_parser(upload_id, directory, meta)
+        return jsonify({'status': 'success', **chunked_upload_status(upload_id, meta)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/upload_chunks/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """이어받기용 업로드 상태 조회 (수신 완료 청크 목록)"""
+    try:
+        meta = read_chunked_upload(upload_id)
+        if meta is None:
+            return jsonify({'status': 'error', 'message': '존재하지 않는 업로드입니다.'})
+        return jsonify({'status': 'success', **chunked_upload_status(upload_id, meta)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/upload_chunks/<upload_id>/<int:index>', methods=['PUT'])
+def put_upload_chunk(upload_id, index):
+    """청크 하나를 스풀 파일의 해당 위치에 기록 (다 쓴 뒤에 수신 완료로 표시)"""
+    try:
+        meta = read_chunked_upload(upload_id)
+        if meta is None:
+            return jsonify({'status': 'error', 'message': '존재하지 않는 업로드입니다.'})
+        if not 0 <= index < meta['total_chunks']:
+            return jsonify({'status': 'error', 'message': '잘못된 청크 번호입니다.'})
+        
+        expected = chunk_length(meta, index)
+        if request.content_length != expected:
+            return jsonify({'status': 'error', 'message': f'청크 크기가 올바르지 않습니다. ({expected}바이트 필요)'})
+        
+        directory = chunked_upload_dir(upload_id)
+        written = 0
+        with open(os.path.join(directory, 'data'), 'r+b') as f:
+            f.seek(index * meta['chunk_size'])
+            for block in iter(lambda: request.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                f.write(block)
+                written += len(block)
+        if written != expected:
+            return jsonify({'status': 'error', 'message': '청크 전송이 중간에 끊겼습니다.'})
+        
+        open(os.path.join(directory, 'received', str(index)), 'wb').close()
+        notify_chunked_parser(upload_id)
+        return jsonify({'status': 'success', **chunked_upload_status(upload_id, meta)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/upload_chunks/<upload_id>/finalize', methods=['POST'])
+@mutates_data('current', 'datasets')
+def finalize_chunked_upload(upload_id):
+    """모든 청크 수신 후 파싱 결과를 현재 데이터(zip은 저장된 데이터셋)에 반영하고 스풀 파일 삭제"""
+    try:
+        meta = read_chunked_upload(upload_id)
+        if meta is None:
+            return jsonify({'status': 'error', 'message': '존재하지 않는 업로드입니다.'})
+        status = chunked_upload_status(upload_id, meta)
+        if len(status['received']) < meta['total_chunks']:
+            return jsonify({'status': 'error', 'message': '아직 받지 못한 청크가 있습니다.', **status})
+        
+        directory = chunked_upload_dir(upload_id)
+        data_path = os.path.join(directory, 'data')
+        # 다른 워커에서 시작했거나 재시작된 업로드는 점진 파싱 결과가 없으므로 스풀 파일을 직접 파싱
+        state = _chunked_parsers.get(upload_id)
+        parse = None
+        if state is not None:
+            parse = functools.partial(chunked_parse_result, state, data_path, meta['filename'])
+        try:
+            with open(data_path, 'rb') as stream:
+                response = upload_response(stream, meta['filename'], request.get_json(silent=True) or {},
+                                           spool_path=data_path, parse=parse)
+        except Exception as e:
+            # 실패하면 스풀 파일을 남겨 다시 완료 요청할 수 있게 함 (미완료 업로드와 같이 TTL/개수 제한으로 정리)
+            cancel_chunked_parser(upload_id)
+            return jsonify({'status': 'error', 'message': f'파일 읽기 오류: {str(e)}'})
+        cancel_chunked_parser(upload_id)
+        if response.get_json().get('status') == 'success':
+            shutil.rmtree(directory, ignore_errors=True)
+        return response
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/upload_chunks/<upload_id>', methods=['DELETE'])
+def cancel_chunked_upload(upload_id):
+    """진행 중인 청크 업로드 취소"""
+    try:
+        directory = chunked_upload_dir(upload_id)
+        cancel_chunked_parser(upload_id)
+        shutil.rmtree(directory, ignore_errors=True)
+        return jsonify({'status': 'success'})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
 @app.route('/add_experimental_data', methods=['POST'])
+@mutates_data('current')
 def add_experimental_data():
     """실험군 데이터 추가 (샘플별 저장)"""
     try:
@@ -776,7 +4059,9 @@ def add_experimental_data():
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
+        history_record_entries([new_sample])
         current_dataset['pass_averages'].append(new_sample)
+        trend_log_record(current_dataset, added=[new_sample])
         session['current_dataset'] = current_dataset
         
         return jsonify({
@@ -790,6 +4075,7 @@ def add_experimental_data():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_control_data', methods=['POST'])
+@mutates_data('current')
 def add_control_data():
     """대조군 데이터 추가 (독립 저장)"""
     try:
@@ -827,6 +4113,8 @@ def add_control_data():
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
+        history_record_entries([new_control])
+        
         # control_data와 pass_averages 모두에 추가 (호환성)
         current_dataset['control_data'].append(new_control)
         
@@ -834,6 +4122,7 @@ def add_control_data():
         if 'pass_averages' not in current_dataset:
             current_dataset['pass_averages'] = []
         current_dataset['pass_averages'].append(new_control)
+        trend_log_record(current_dataset, added=[new_control])
         
         session['current_dataset'] = current_dataset
         session.modified = True
@@ -849,6 +4138,7 @@ def add_control_data():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_pass_average', methods=['POST'])
+@mutates_data('current')
 def add_pass_average():
     try:
         data = request.get_json()
@@ -890,7 +4180,9 @@ def add_pass_average():
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
+        history_record_entries([new_pass])
         current_dataset['pass_averages'].append(new_pass)
+        trend_log_record(current_dataset, added=[new_pass])
         session['current_dataset'] = current_dataset
         
         return jsonify({
@@ -904,6 +4196,7 @@ def add_pass_average():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_both_groups_pass_average', methods=['POST'])
+@mutates_data('current')
 def add_both_groups_pass_average():
     """실험군과 대조군 데이터를 동시에 추가"""
     try:
@@ -944,6 +4237,7 @@ def add_both_groups_pass_average():
         existing_passes = [(p['pass_number'], p.get('group_type', 'experimental')) for p in current_dataset['pass_averages']]
         
         added_groups = []
+        added_entries = []
         
         # 실험군 데이터 추가
         if exp_complete:
@@ -960,7 +4254,7 @@ def add_both_groups_pass_average():
                 'custom_data_value': float(exp_custom_value) if exp_custom_value is not None and exp_custom_value != '' else None,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            current_dataset['pass_averages'].append(exp_pass)
+            added_entries.append(exp_pass)
             added_groups.append('실험군')
         
         # 대조군 데이터 추가
@@ -978,9 +4272,12 @@ def add_both_groups_pass_average():
                 'custom_data_value': float(ctrl_custom_value) if ctrl_custom_value is not None and ctrl_custom_value != '' else None,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            current_dataset['pass_averages'].append(ctrl_pass)
+            added_entries.append(ctrl_pass)
             added_groups.append('대조군')
         
+        history_record_entries(added_entries)
+        current_dataset['pass_averages'].extend(added_entries)
+        trend_log_record(current_dataset, added=added_entries)
         session['current_dataset'] = current_dataset
         
         groups_text = ', '.join(added_groups)
@@ -995,6 +4292,7 @@ def add_both_groups_pass_average():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/delete_control_data', methods=['POST'])
+@mutates_data('current')
 def delete_control_data():
     """대조군 데이터 삭제"""
     try:
@@ -1010,21 +4308,26 @@ def delete_control_data():
         
         # control_data에서 삭제
         original_length = len(current_dataset['control_data'])
+        removed = [c for c in current_dataset['control_data'] if c['sample_name'] == sample_name]
         current_dataset['control_data'] = [
             c for c in current_dataset['control_data'] 
             if c['sample_name'] != sample_name
         ]
         
         # pass_averages에서도 삭제 (대조군)
+        removed_points = []
         if 'pass_averages' in current_dataset:
-            current_dataset['pass_averages'] = [
-                p for p in current_dataset['pass_averages']
-                if not (p.get('sample_name') == sample_name and p.get('group_type') == 'control')
-            ]
+            def is_removed(p):
+                return p.get('sample_name') == sample_name and p.get('group_type') == 'control'
+            removed_points = [p for p in current_dataset['pass_averages'] if is_removed(p)]
+            current_dataset['pass_averages'] = [p for p in current_dataset['pass_averages'] if not is_removed(p)]
         
         if len(current_dataset['control_data']) == original_length:
             return jsonify({'status': 'error', 'message': f'대조군 샘플 "{sample_name}"을 찾을 수 없습니다.'})
         
+        history_delete_entries(removed)
+        trend_log_record(current_dataset, removed=removed_points)
+        
         session['current_dataset'] = current_dataset
         session.modified = True
         
@@ -1038,6 +4341,7 @@ def delete_control_data():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/delete_pass_average', methods=['POST'])
+@mutates_data('current')
 def delete_pass_average():
     try:
         data = request.get_json()
@@ -1053,19 +4357,20 @@ def delete_pass_average():
             return jsonify({'status': 'error', 'message': '삭제할 데이터가 없습니다.'})
         
         # 해당 샘플명 또는 패스 번호로 삭제
-        original_length = len(current_dataset['pass_averages'])
-        current_dataset['pass_averages'] = [
-            p for p in current_dataset['pass_averages'] 
-            if not (
-                (p.get('sample_name') == str(identifier) or p.get('pass_number') == identifier) and 
-                p.get('group_type', 'experimental') == group_type
-            )
-        ]
+        def matches(p):
+            return ((p.get('sample_name') == str(identifier) or p.get('pass_number') == identifier) and
+                    p.get('group_type', 'experimental') == group_type)
         
-        if len(current_dataset['pass_averages']) == original_length:
+        removed = [p for p in current_dataset['pass_averages'] if matches(p)]
+        current_dataset['pass_averages'] = [p for p in current_dataset['pass_averages'] if not matches(p)]
+        
+        if not removed:
             group_name = '실험군' if group_type == 'experimental' else '대조군'
             return jsonify({'status': 'error', 'message': f'{group_name} 샘플 "{identifier}"을 찾을 수 없습니다.'})
         
+        history_delete_entries(removed)
+        trend_log_record(current_dataset, removed=removed)
+        
         session['current_dataset'] = current_dataset
         session.modified = True
         
@@ -1079,9 +4384,65 @@ def delete_pass_average():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+@app.route('/history/trend', methods=['GET'])
+def history_trend():
+    """생산 이력 추세 조회 (start/end 기간, 긴 기간은 일/주 집계로 다운샘플링, 모든 사용자의 공용 이력)"""
+    try:
+        filters = parse_history_filters(request.args)
+        return jsonify({'status': 'success', 'filters': filters, 'groups': query_history_trend(filters)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/history/stats', methods=['GET'])
+def history_stats():
+    """생산 이력 기간별 그룹 통계"""
+    try:
+        filters = parse_history_filters(request.args)
+        return jsonify({'status': 'success', 'filters': filters, 'groups': query_history_stats(filters)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/history/correlation', methods=['GET'])
+def history_correlation():
+    """생산 이력 기간별 Size/PI/사용자 정의 값 상관관계"""
+    try:
+        filters = parse_history_filters(request.args)
+        return jsonify({'status': 'success', 'filters': filters, 'groups': query_history_correlation(filters)})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@app.route('/history/spc', methods=['GET'])
+def history_spc():
+    """생산 이력 기간 관리도 (그룹 기본값: 실험군, 생산일자 순)"""
+    try:
+        filters = parse_history_filters(request.args)
+        filters.setdefault('group_type', 'experimental')
+        where, params = _history_where(filters)
+        rows = get_history_db().execute(f'''
+            SELECT id, sample_name, production_date, size_avg, pi_avg
+            FROM history_entries{where} ORDER BY production_date, id
+        ''', params).fetchall()
+        sizes = np.array([row[3] for row in rows], dtype=float)
+        pis = np.array([row[4] for row in rows], dtype=float)
+        return jsonify({
+            'status': 'success',
+            'filters': filters,
+            'entries': [{'id': row[0], 'sample_name': row[1], 'production_date': row[2]} for row in rows],
+            'size': spc_analysis(sizes, **parse_spc_options(request.args, 'size')),
+            'pi': spc_analysis(pis, **parse_spc_options(request.args, 'pi')),
+            'rules': SPC_RULES
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
 @app.route('/get_pass_trend_data', methods=['GET'])
+@versioned_get('current')
 def get_pass_trend_data():
     try:
+        # 관리도 옵션 (부분군 크기, 규칙, Size/PI 규격 한계)
+        size_spc_options = parse_spc_options(request.args, 'size')
+        pi_spc_options = parse_spc_options(request.args, 'pi')
+        
         current_dataset = session.get('current_dataset', {})
         pass_averages = current_dataset.get('pass_averages', [])
         
@@ -1093,25 +4454,21 @@ def get_pass_trend_data():
         control_data = [p for p in pass_averages if p.get('group_type') == 'control']
         
         # 생산일자별로 정렬 (생산일자가 없으면 샘플명으로 정렬)
-        def sort_key(x):
-            production_date = x.get('production_date')
-            if production_date:
-                return (production_date, x.get('sample_name', ''))
-            else:
-                return ('9999-12-31', x.get('sample_name', ''))  # 날짜가 없으면 마지막에 배치
+        sorted_exp = sorted(experimental_data, key=trend_sort_key)
+        sorted_ctrl = sorted(control_data, key=trend_sort_key)
         
-        sorted_exp = sorted(experimental_data, key=sort_key)
-        sorted_ctrl = sorted(control_data, key=sort_key)
+        # 증분 갱신 기준 버전 (각 점의 trend_id는 customdata, 그룹은 trace meta로 전달)
+        trend_log = get_trend_log(current_dataset)
+        exp_ids = trend_ids(current_dataset, sorted_exp)
+        ctrl_ids = trend_ids(current_dataset, sorted_ctrl)
         
         # 트렌드 차트용 데이터 준비 (실험군)
         exp_sample_names = [p['sample_name'] for p in sorted_exp]
-        exp_production_dates = [p.get('production_date', '') for p in sorted_exp]
         exp_size_avgs = [p['size_avg'] for p in sorted_exp]
         exp_pi_avgs = [p['pi_avg'] for p in sorted_exp]
         
         # 대조군 데이터
         ctrl_sample_names = [p['sample_name'] for p in sorted_ctrl]
-        ctrl_production_dates = [p.get('production_date', '') for p in sorted_ctrl]
         ctrl_size_avgs = [p['size_avg'] for p in sorted_ctrl]
         ctrl_pi_avgs = [p['pi_avg'] for p in sorted_ctrl]
         
@@ -1120,8 +4477,7 @@ def get_pass_trend_data():
         
         # 실험군 데이터 추가
         if sorted_exp:
-            exp_hover_text = [f"샘플명: {name}<br>생산일자: {date if date else '미지정'}<br>Size(nm): {size:.3f}" 
-                             for name, date, size in zip(exp_sample_names, exp_production_dates, exp_size_avgs)]
+            exp_hover_text = [trend_hover_text(p, 'Size(nm)', p['size_avg']) for p in sorted_exp]
             fig_size.add_trace(go.Scatter(
                 x=list(range(1, len(exp_sample_names) + 1)),
                 y=exp_size_avgs,
@@ -1131,13 +4487,14 @@ def get_pass_trend_data():
                 marker=dict(size=8),
                 text=exp_sample_names,
                 hovertext=exp_hover_text,
+                customdata=exp_ids,
+                meta=dict(group='experimental'),
                 hovertemplate='%{hovertext}<extra></extra>'
             ))
         
         # 대조군 데이터 추가
         if sorted_ctrl:
-            ctrl_hover_text = [f"샘플명: {name}<br>생산일자: {date if date else '미지정'}<br>Size(nm): {size:.3f}" 
-                              for name, date, size in zip(ctrl_sample_names, ctrl_production_dates, ctrl_size_avgs)]
+            ctrl_hover_text = [trend_hover_text(p, 'Size(nm)', p['size_avg']) for p in sorted_ctrl]
             fig_size.add_trace(go.Scatter(
                 x=list(range(1, len(ctrl_sample_names) + 1)),
                 y=ctrl_size_avgs,
@@ -1147,9 +4504,17 @@ def get_pass_trend_data():
                 marker=dict(size=8),
                 text=ctrl_sample_names,
                 hovertext=ctrl_hover_text,
+                customdata=ctrl_ids,
+                meta=dict(group='control'),
                 hovertemplate='%{hovertext}<extra></extra>'
             ))
         
+        # 실험군 관리도 (관리 한계선 + 규칙 위반 점)
+        exp_x = list(range(1, len(exp_sample_names) + 1))
+        size_spc = spc_analysis(exp_size_avgs, **size_spc_options)
+        pi_spc = spc_analysis(exp_pi_avgs, **pi_spc_options)
+        add_spc_traces(fig_size, size_spc, exp_x, '실험군 Size(nm)')
+        
         fig_size.update_layout(
             title='실험군/대조군 Size(nm) 평균값 비교',
             xaxis_title='샘플 순서',
@@ -1165,8 +4530,7 @@ def get_pass_trend_data():
         
         # 실험군 데이터 추가
         if sorted_exp:
-            exp_pi_hover_text = [f"샘플명: {name}<br>생산일자: {date if date else '미지정'}<br>PI: {pi:.3f}" 
-                                for name, date, pi in zip(exp_sample_names, exp_production_dates, exp_pi_avgs)]
+            exp_pi_hover_text = [trend_hover_text(p, 'PI', p['pi_avg']) for p in sorted_exp]
             fig_pi.add_trace(go.Scatter(
                 x=list(range(1, len(exp_sample_names) + 1)),
                 y=exp_pi_avgs,
@@ -1176,13 +4540,14 @@ def get_pass_trend_data():
                 marker=dict(size=8),
                 text=exp_sample_names,
                 hovertext=exp_pi_hover_text,
+                customdata=exp_ids,
+                meta=dict(group='experimental'),
                 hovertemplate='%{hovertext}<extra></extra>'
             ))
         
         # 대조군 데이터 추가
         if sorted_ctrl:
-            ctrl_pi_hover_text = [f"샘플명: {name}<br>생산일자: {date if date else '미지정'}<br>PI: {pi:.3f}" 
-                                 for name, date, pi in zip(ctrl_sample_names, ctrl_production_dates, ctrl_pi_avgs)]
+            ctrl_pi_hover_text = [trend_hover_text(p, 'PI', p['pi_avg']) for p in sorted_ctrl]
             fig_pi.add_trace(go.Scatter(
                 x=list(range(1, len(ctrl_sample_names) + 1)),
                 y=ctrl_pi_avgs,
@@ -1192,9 +4557,13 @@ def get_pass_trend_data():
                 marker=dict(size=8),
                 text=ctrl_sample_names,
                 hovertext=ctrl_pi_hover_text,
+                customdata=ctrl_ids,
+                meta=dict(group='control'),
                 hovertemplate='%{hovertext}<extra></extra>'
             ))
         
+        add_spc_traces(fig_pi, pi_spc, exp_x, '실험군 PI')
+        
         fig_pi.update_layout(
             title='실험군/대조군 PI 평균값 비교',
             xaxis_title='샘플 순서',
@@ -1218,7 +4587,9 @@ def get_pass_trend_data():
                 text=exp_sample_names,
                 textposition='top center',
                 marker=dict(size=10, color='blue'),
-                name='실험군'
+                name='실험군',
+                customdata=exp_ids,
+                meta=dict(group='experimental')
             ))
         
         # 대조군 상관관계
@@ -1230,7 +4601,9 @@ def get_pass_trend_data():
                 text=ctrl_sample_names,
                 textposition='top center',
                 marker=dict(size=10, color='green'),
-                name='Reference Values'
+                name='Reference Values',
+                customdata=ctrl_ids,
+                meta=dict(group='control')
             ))
         
         fig_correlation.update_layout(
@@ -1286,61 +4659,80 @@ def get_pass_trend_data():
         else:
             stats['ctrl_correlation'] = 0
         
-        # 트렌드 계산 (실험군 기준)
-        if len(exp_size_avgs) >= 3:
-            # 리니어 회귀로 기울기 계산
-            x = np.array(range(len(exp_size_avgs)))
-            y_size = np.array(exp_size_avgs)
-            slope_size = np.polyfit(x, y_size, 1)[0]
-            
-            if abs(slope_size) > 0.01:  # 임계값 조정
-                if slope_size > 0:
-                    stats['size_trend'] = 'increasing'
-                else:
-                    stats['size_trend'] = 'decreasing'
-            stats['size_slope'] = float(slope_size)
-        else:
-            stats['size_slope'] = 0
-                
-        if len(exp_pi_avgs) >= 3:
-            x = np.array(range(len(exp_pi_avgs)))
-            y_pi = np.array(exp_pi_avgs)
-            slope_pi = np.polyfit(x, y_pi, 1)[0]
-            
-            if abs(slope_pi) > 0.001:  # PI는 더 작은 임계값
-                if slope_pi > 0:
-                    stats['pi_trend'] = 'increasing'
-                else:
-                    stats['pi_trend'] = 'decreasing'
-            stats['pi_slope'] = float(slope_pi)
-        else:
-            stats['pi_slope'] = 0
-        
-        # 공정 능력 지수 (Cpk 근사치)
-        if len(all_size_avgs) >= 6:  # 충분한 데이터가 있을 때
-            size_mean = np.mean(all_size_avgs)
-            size_std = np.std(all_size_avgs)
-            if size_std > 0:
-                # 가정: 사양 3시그마 공정 능력
-                stats['size_capability'] = (3 * size_std) / size_mean * 100
-            else:
-                stats['size_capability'] = 0
-        else:
-            stats['size_capability'] = 0
+        # 트렌드 계산 (실험군 기준): 회귀 기울기가 유의하거나(p < 0.05) 관리도 추세 규칙(3) 위반 시 증가/감소
+        for key, values, spc in (('size', exp_size_avgs, size_spc), ('pi', exp_pi_avgs, pi_spc)):
+            stats[f'{key}_slope'] = 0
+            if len(values) < 3:
+                continue
+            slope, trend_p = linear_trend(values)
+            stats[f'{key}_slope'] = slope
+            stats[f'{key}_trend_p_value'] = trend_p
+            trending = trend_p < 0.05 or bool(spc and spc['violations'].get('3'))
+            if trending and slope != 0:
+                stats[f'{key}_trend'] = 'increasing' if slope > 0 else 'decreasing'
+        
+        # 공정 능력(Cp/Cpk)은 관리도 결과(spc)에 규격 한계가 주어졌을 때만 포함
+        stats['spc'] = {'size': size_spc, 'pi': pi_spc}
+        stats['spc_rules'] = SPC_RULES
         
         return jsonify({
             'status': 'success',
-            'size_trend_chart': json.dumps(fig_size, cls=PlotlyJSONEncoder),
-            'pi_trend_chart': json.dumps(fig_pi, cls=PlotlyJSONEncoder),
-            'correlation_chart': json.dumps(fig_correlation, cls=PlotlyJSONEncoder),
+            'size_trend_chart': figure_payload(fig_size),
+            'pi_trend_chart': figure_payload(fig_pi),
+            'correlation_chart': figure_payload(fig_correlation),
             'statistics': stats,
-            'pass_data': pass_averages
+            'pass_data': pass_averages,
+            'trend_version': f"{trend_log['id']}:{trend_log['version']}"
         })
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+@app.route('/get_pass_trend_delta', methods=['GET'])
+@versioned_get('current')
+def get_pass_trend_delta():
+    """since(= trend_version) 이후의 트렌드 점 추가/삭제만 반환
+    
+    로그 id가 다르거나 since가 보관 구간 밖이면 mode='full' (클라이언트가 전체 차트를 다시 요청)
+    관리 한계선은 모든 점에 의존하므로 변경이 있을 때 실험군 값으로만 다시 계산해 오버레이로 전달
+    """
+    try:
+        current_dataset = session.get('current_dataset', {})
+        trend_log = get_trend_log(current_dataset)
+        version = f"{trend_log['id']}:{trend_log['version']}"
+        
+        log_id, _, since = request.args.get('since', '').partition(':')
+        if log_id != trend_log['id'] or not since.isdigit() or not trend_log['base'] <= int(since) <= trend_log['version']:
+            return jsonify({'status': 'success', 'mode': 'full', 'trend_version': version})
+        
+        pending = trend_log['version'] - int(since)
+        ops = trend_log['ops'][len(trend_log['ops']) - pending:] if pending else []
+        response = {
+            'status': 'success',
+            'mode': 'delta',
+            'trend_version': version,
+            'ops': [trend_op_payload(op) for op in ops],
+            'summary': trend_summary(trend_log['moments'])
+        }
+        
+        if ops:
+            sorted_exp = sorted((p for p in current_dataset.get('pass_averages', [])
+                                 if p.get('group_type', 'experimental') == 'experimental'), key=trend_sort_key)
+            exp_x = list(range(1, len(sorted_exp) + 1))
+            size_spc = spc_analysis([p['size_avg'] for p in sorted_exp], **parse_spc_options(request.args, 'size'))
+            pi_spc = spc_analysis([p['pi_avg'] for p in sorted_exp], **parse_spc_options(request.args, 'pi'))
+            response['spc'] = {'size': spc_summary_payload(size_spc), 'pi': spc_summary_payload(pi_spc)}
+            response['spc_overlay'] = {
+                'size': spc_overlay_payload(size_spc, exp_x, '실험군 Size(nm)'),
+                'pi': spc_overlay_payload(pi_spc, exp_x, '실험군 PI')
+            }
+        
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
 @app.route('/get_custom_data_correlation', methods=['GET'])
+@versioned_get('current')
 def get_custom_data_correlation():
     """사용자 정의 데이터와 Size(nm) 간의 상관관계 분석 (실험군/대조군 구분)"""
     try:
@@ -1350,32 +4742,32 @@ def get_custom_data_correlation():
         production_date = current_dataset.get('production_date', '')
         custom_field_name = current_dataset.get('custom_data_field_name', '사용자 정의 필드')
         
-        # 실험군과 대조군 데이터 분리 및 날짜별 그룹화
-        experimental_data = []
-        control_data = []
-        
-        for pass_data in pass_averages:
-            if pass_data.get('custom_data_value') is not None:
-                # 생산일자 우선 사용, 없으면 타임스탬프에서 날짜 추출
-                production_date = pass_data.get('production_date')
-                if production_date:
-                    date_part = production_date
-                else:
-                    timestamp = pass_data.get('timestamp', '')
-                    date_part = timestamp.split(' ')[0] if timestamp else '2025-07-17'  # 기본값
-                
-                data_point = {
-                    'sample_name': pass_data.get('sample_name', 'Unknown'),
-                    'size_avg': pass_data['size_avg'],
-                    'custom_value': pass_data['custom_data_value'],
-                    'date': date_part,
-                    'timestamp': pass_data.get('timestamp', '')
-                }
-                
-                if pass_data.get('group_type', 'experimental') == 'experimental':
-                    experimental_data.append(data_point)
-                else:
-                    control_data.append(data_point)
+        # 단일 트레이스(색상 배열) 모드: single, auto(날짜 수가 많을 때만), 그룹별 회귀선 옵션
+        color_mode = request.args.get('color_mode', 'dates')
+        show_fit = request.args.get('fit', 'false').lower() == 'true'
+        
+        # 사용자 정의 값이 있는 항목만 컬럼형으로 변환
+        frame = pass_entries_frame(pass_averages)
+        frame = frame[frame['custom_data_value'].notna()].reset_index(drop=True)
+        # 생산일자 우선 사용, 없으면 타임스탬프에서 날짜 추출
+        timestamp_dates = frame['timestamp'].fillna('').astype(str).str.split(' ').str[0]
+        production_dates = frame['production_date'].fillna('')
+        frame['date'] = production_dates.mask(production_dates == '', timestamp_dates)
+        frame['date'] = frame['date'].mask(frame['date'] == '', '2025-07-17')
+        frame['sample_name'] = frame['sample_name'].fillna('Unknown')
+        # 샘플명의 마지막 숫자 (숫자가 없으면 전체 이름)
+        frame['sample_number'] = frame['sample_name'].astype(str).str.extract(r'(\d+)\D*$')[0].fillna(frame['sample_name'])
+        
+        is_experimental = (frame['group_type'] == 'experimental').to_numpy()
+        exp_frame = frame[is_experimental]
+        ctrl_frame = frame[~is_experimental]
+        
+        def to_records(part):
+            return [{'sample_name': row.sample_name, 'size_avg': row.size_avg, 'custom_value': row.custom_data_value,
+                     'date': row.date, 'timestamp': row.timestamp}
+                    for row in part[['sample_name', 'size_avg', 'custom_data_value', 'date', 'timestamp']].itertuples(index=False)]
+        experimental_data = to_records(exp_frame)
+        control_data = to_records(ctrl_frame)
         
         if len(experimental_data) == 0 and len(control_data) == 0:
             return jsonify({'status': 'error', 'message': f'{custom_field_name} 상관관계 분석을 위해서는 최소 1개의 데이터가 필요합니다.'})
@@ -1408,74 +4800,74 @@ def get_custom_data_correlation():
                 showlegend=True
             ))
         
+        # 날짜별 회귀선 (그룹별 합계로 기울기/절편 계산)
+        fits = []
+        if show_fit and len(frame):
+            fit_groups = frame.assign(group=np.where(is_experimental, frame['date'], 'Reference Values (Control)'))
+            fits = grouped_linear_fits(fit_groups, 'group', 'custom_data_value', 'size_avg')
+        
         # 실험군 데이터: 날짜별 색상 구분
+        color_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+        date_colors = {}
+        single_trace = color_mode == 'single'
         if experimental_data:
-            # 고유 날짜 추출 및 색상 매핑 (실험군만)
-            unique_dates = sorted(list(set([d['date'] for d in experimental_data])))
-            color_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+            # 고유 날짜 정렬 후 색상 매핑 (실험군만)
+            date_codes, unique_dates = pd.factorize(exp_frame['date'], sort=True)
+            single_trace = color_mode == 'single' or (color_mode == 'auto' and len(unique_dates) > CUSTOM_CORRELATION_MAX_DATE_TRACES)
             date_colors = {date: color_palette[i % len(color_palette)] for i, date in enumerate(unique_dates)}
+            hovertemplate = ('날짜: %{customdata}<br>샘플: %{text}<br>' +
+                             f'{custom_field_name}: %{{x}}<br>Size: %{{y}}<extra></extra>')
             
-            # 실험군 데이터를 날짜별로 그룹화하여 플롯
-            for date in unique_dates:
-                date_data = [d for d in experimental_data if d['date'] == date]
-                if not date_data:
-                    continue
-                
-                # 샘플 번호 추출 (샘플명에서 숫자 부분 찾기)
-                sample_numbers = []
-                for d in date_data:
-                    sample_name = d['sample_name']
-                    # 샘플명에서 숫자 추출 시도
-                    import re
-                    numbers = re.findall(r'\d+', sample_name)
-                    if numbers:
-                        sample_numbers.append(numbers[-1])  # 마지막 숫자 사용
-                    else:
-                        sample_numbers.append(sample_name)  # 숫자가 없으면 전체 이름 사용
-                
-                x_values = [d['custom_value'] for d in date_data]
-                y_values = [d['size_avg'] for d in date_data]
-                
+            if single_trace:
+                # 날짜 수와 무관하게 트레이스 1개 (마커 색상 배열로 날짜 구분)
                 fig.add_trace(go.Scatter(
-                    x=x_values,
-                    y=y_values,
+                    x=exp_frame['custom_data_value'],
+                    y=exp_frame['size_avg'],
                     mode='markers+text',
-                    text=sample_numbers,
+                    text=exp_frame['sample_number'],
+                    customdata=exp_frame['date'],
                     textposition='middle center',
                     textfont=dict(size=10, color='black'),
                     marker=dict(
-                        size=12, 
-                        color=date_colors[date], 
+                        size=12,
+                        color=np.array(color_palette)[date_codes % len(color_palette)],
                         symbol='circle',
                         line=dict(width=2, color='black')
                     ),
-                    name=date,
+                    name='실험군',
                     showlegend=True,
-                    hovertemplate='날짜: %{fullData.name}<br>샘플: %{text}<br>' + 
-                                f'{custom_field_name}: %{{x}}<br>Size: %{{y}}<extra></extra>'
+                    hovertemplate=hovertemplate
                 ))
+            else:
+                # 날짜별 트레이스 (한 번의 groupby로 분할)
+                for date, date_data in exp_frame.groupby('date', sort=True):
+                    fig.add_trace(go.Scatter(
+                        x=date_data['custom_data_value'],
+                        y=date_data['size_avg'],
+                        mode='markers+text',
+                        text=date_data['sample_number'],
+                        customdata=date_data['date'],
+                        textposition='middle center',
+                        textfont=dict(size=10, color='black'),
+                        marker=dict(
+                            size=12, 
+                            color=date_colors[date], 
+                            symbol='circle',
+                            line=dict(width=2, color='black')
+                        ),
+                        name=date,
+                        legendgroup=date,
+                        showlegend=True,
+                        hovertemplate=hovertemplate
+                    ))
         
         # 대조군 데이터: Reference Values로 별도 표시
         if control_data:
-            # 샘플 번호 추출 (대조군)
-            ctrl_sample_numbers = []
-            for d in control_data:
-                sample_name = d['sample_name']
-                import re
-                numbers = re.findall(r'\d+', sample_name)
-                if numbers:
-                    ctrl_sample_numbers.append(numbers[-1])
-                else:
-                    ctrl_sample_numbers.append(sample_name)
-            
-            ctrl_x_values = [d['custom_value'] for d in control_data]
-            ctrl_y_values = [d['size_avg'] for d in control_data]
-            
             fig.add_trace(go.Scatter(
-                x=ctrl_x_values,
-                y=ctrl_y_values,
+                x=ctrl_frame['custom_data_value'],
+                y=ctrl_frame['size_avg'],
                 mode='markers+text',
-                text=ctrl_sample_numbers,
+                text=ctrl_frame['sample_number'],
                 textposition='middle center',
                 textfont=dict(size=10, color='white'),
                 marker=dict(
@@ -1490,6 +4882,9 @@ def get_custom_data_correlation():
                             f'{custom_field_name}: %{{x}}<br>Size: %{{y}}<extra></extra>'
             ))
         
+        if fits:
+            add_fit_traces(fig, fits, date_colors, single_trace)
+        
         # 레이아웃 설정
         x_axis_title = f'{custom_field_name}'
         if custom_field_name in ['점도', 'viscosity']:
@@ -1519,9 +4914,8 @@ def get_custom_data_correlation():
         )
         
         # 통계 정보
-        all_data = experimental_data + control_data
-        all_custom_values = [d['custom_value'] for d in all_data]
-        all_sizes = [d['size_avg'] for d in all_data]
+        all_custom_values = frame['custom_data_value'].to_numpy()
+        all_sizes = frame['size_avg'].to_numpy()
         
         # 상관계수 계산
         if len(all_custom_values) >= 2:
@@ -1530,23 +4924,20 @@ def get_custom_data_correlation():
         else:
             correlation = 0
         
-        # 실험군 데이터와 대조군 데이터 분리 계산
-        exp_custom_values = [d['custom_value'] for d in experimental_data]
-        exp_sizes = [d['size_avg'] for d in experimental_data]
-        ctrl_custom_values = [d['custom_value'] for d in control_data]
-        ctrl_sizes = [d['size_avg'] for d in control_data]
+        def column_mean(part, column):
+            return float(part[column].mean()) if len(part) else 0
         
         stats = {
             'correlation': float(correlation),
-            'data_count': len(all_data),  # 전체 데이터 수
+            'data_count': len(frame),  # 전체 데이터 수
             'experimental_count': len(experimental_data),
             'control_count': len(control_data),
-            'custom_mean': float(np.mean(all_custom_values)) if all_custom_values else 0,
-            'size_mean': float(np.mean(all_sizes)) if all_sizes else 0,
-            'exp_custom_mean': float(np.mean(exp_custom_values)) if exp_custom_values else 0,
-            'exp_size_mean': float(np.mean(exp_sizes)) if exp_sizes else 0,
-            'ctrl_custom_mean': float(np.mean(ctrl_custom_values)) if ctrl_custom_values else 0,
-            'ctrl_size_mean': float(np.mean(ctrl_sizes)) if ctrl_sizes else 0,
+            'custom_mean': column_mean(frame, 'custom_data_value'),
+            'size_mean': column_mean(frame, 'size_avg'),
+            'exp_custom_mean': column_mean(exp_frame, 'custom_data_value'),
+            'exp_size_mean': column_mean(exp_frame, 'size_avg'),
+            'ctrl_custom_mean': column_mean(ctrl_frame, 'custom_data_value'),
+            'ctrl_size_mean': column_mean(ctrl_frame, 'size_avg'),
             'sample_name': sample_name,
             'production_date': production_date,
             'custom_field_name': custom_field_name
@@ -1554,8 +4945,9 @@ def get_custom_data_correlation():
         
         return jsonify({
             'status': 'success',
-            'custom_correlation_chart': json.dumps(fig, cls=PlotlyJSONEncoder),
+            'custom_correlation_chart': figure_payload(fig),
             'statistics': stats,
+            'fits': fits,
             'experimental_data': experimental_data,
             'control_data': control_data,
             'custom_field_name': custom_field_name
@@ -1565,6 +4957,7 @@ def get_custom_data_correlation():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/add_viscosity_data', methods=['POST'])
+@mutates_data('current')
 def add_viscosity_data():
     """점도 데이터 추가 (향후 확장용)"""
     try:
@@ -1605,6 +4998,7 @@ def add_viscosity_data():
         return jsonify({'status': 'error', 'message': str(e)})
 
 @app.route('/get_viscosity_correlation', methods=['GET'])
+@versioned_get('current')
 def get_viscosity_correlation():
     """점도와 입자 특성 간 상관관계 분석 (향후 확장용)"""
     try:
@@ -1673,8 +5067,8 @@ def get_viscosity_correlation():
         
         return jsonify({
             'status': 'success',
-            'size_viscosity_chart': json.dumps(fig_size_visc, cls=PlotlyJSONEncoder),
-            'pi_viscosity_chart': json.dumps(fig_pi_visc, cls=PlotlyJSONEncoder),
+            'size_viscosity_chart': figure_payload(fig_size_visc),
+            'pi_viscosity_chart': figure_payload(fig_pi_visc),
             'correlations': {
                 'size_viscosity': float(size_visc_corr) if not np.isnan(size_visc_corr) else 0,
                 'pi_viscosity': float(pi_visc_corr) if not np.isnan(pi_visc_corr) else 0
@@ -1685,6 +5079,48 @@ def get_viscosity_correlation():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+@app.route('/pass_correlation_matrix', methods=['GET'])
+@versioned_get('current')
+def pass_correlation_matrix():
+    """실험군/대조군 항목의 모든 숫자 속성 간 피어슨/스피어만 상관 행렬 (group_by=group_type이면 그룹별 추가)"""
+    try:
+        current_dataset = session.get('current_dataset', {})
+        pass_averages = current_dataset.get('pass_averages', [])
+        custom_field_name = current_dataset.get('custom_data_field_name', '사용자 정의 필드')
+        group_by = request.args.get('group_by')
+        if group_by not in (None, '', 'group_type'):
+            return jsonify({'status': 'error', 'message': f'지원하지 않는 그룹 기준입니다: {group_by}'})
+        
+        frame = pass_entries_frame(pass_averages)
+        # 값이 2개 이상 있는 속성만 행렬에 포함
+        columns = [key for key in PASS_NUMERIC_ATTRIBUTES if frame[key].notna().sum() >= 2]
+        if len(columns) < 2:
+            return jsonify({'status': 'error', 'message': '상관 행렬을 계산하려면 값이 2개 이상인 숫자 속성이 2개 이상 필요합니다.'})
+        labels = [custom_field_name if key == 'custom_data_value' else PASS_ATTRIBUTE_LABELS[key] for key in columns]
+        
+        values = frame[columns].to_numpy()
+        overall = correlation_matrices(values)
+        result = {'status': 'success', 'columns': columns, 'labels': labels, 'count': len(frame), 'all': overall}
+        
+        if group_by:
+            result['groups'] = {}
+            for group_type in HISTORY_GROUP_TYPES:
+                selected = (frame['group_type'] == group_type).to_numpy()
+                if selected.any():
+                    result['groups'][group_type] = correlation_matrices(values[selected])
+        
+        fig = go.Figure(go.Heatmap(
+            z=overall['pearson'], x=labels, y=labels, zmin=-1, zmax=1, colorscale='RdBu', reversescale=True,
+            text=[[f'{v:.2f}' if v is not None else '-' for v in row] for row in overall['pearson']],
+            texttemplate='%{text}', hovertemplate='%{y} - %{x}: %{z:.3f}<extra></extra>'
+        ))
+        fig.update_layout(title='숫자 속성 상관 행렬 (Pearson, 전체)', height=450)
+        result['heatmap_chart'] = figure_payload(fig)
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
 @app.route('/download_table_data')
 def download_table_data():
     """현재 데이터 테이블을 CSV로 다운로드"""
@@ -1791,6 +5227,18 @@ def download_csv():
         csv_content.append(f"계산일시,{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         csv_content.append("")
         
+        if results.get('groups'):
+            methods = [m for m in METHOD_NAMES if m in results]
+            csv_content.append(f"=== 그룹별 요약 (그룹 컬럼: {results['group_by']}) ===")
+            csv_content.append(','.join(['그룹', '개수', 'Size(nm) 평균', 'Size(nm) 표준편차', 'PI 평균', 'PI 표준편차'] +
+                                        [f'{METHOD_NAMES[m]} 이상치' for m in methods]))
+            for group in results['groups']:
+                csv_content.append(','.join([str(group['group']), str(group['count']),
+                                             f"{group['size_mean']:.3f}", f"{group['size_std']:.3f}",
+                                             f"{group['pi_mean']:.3f}", f"{group['pi_std']:.3f}"] +
+                                            [str(group['outliers'].get(m, 0)) for m in methods]))
+            csv_content.append("")
+        
         csv_content.append("=== 원본 데이터 ===")
         original_df = pd.DataFrame(results['original_data'])
         csv_content.append(f"총 {results['original_count']}개 데이터")
@@ -1803,13 +5251,13 @@ def download_csv():
         column_order = [col for col in ordered_columns if col in all_columns] + other_columns
         original_df = original_df[column_order]
         
-        original_csv = original_df.to_csv(index=False, encoding='utf-8')
+        original_csv = frame_to_csv(original_df)
         csv_content.append(original_csv.strip())
         csv_content.append("")
         csv_content.append("")
         
-        methods = ['zscore', 'iqr', 'mad']
-        method_names = {'zscore': 'Z-Score 이상치 제거', 'iqr': 'IQR 이상치 제거', 'mad': 'MAD 이상치 제거'}
+        methods = [m for m in METHOD_NAMES if m in results]
+        method_names = {m: f'{name} 이상치 제거' for m, name in METHOD_NAMES.items()}
         
         for method in methods:
             method_result = results[method]
@@ -1830,7 +5278,7 @@ def download_csv():
                 cleaned_column_order = [col for col in ordered_columns if col in cleaned_all_columns] + cleaned_other_columns
                 cleaned_df = cleaned_df[cleaned_column_order]
                 
-                cleaned_csv = cleaned_df.to_csv(index=False, encoding='utf-8')
+                cleaned_csv = frame_to_csv(cleaned_df)
                 csv_content.append(cleaned_csv.strip())
             csv_content.append("")
             csv_content.append("")
@@ -1874,75 +5322,38 @@ def download_combined_results():
         production_date = current_dataset.get('production_date', '')
         pass_count = current_dataset.get('pass_count', 1)
         
-        # 원본 데이터 테이블 처리
+        # 계산에 사용된 유효 행(Size/PI 모두 숫자)의 원본 테이블 위치
         original_df = pd.DataFrame(table_data)
+        sizes, pis, row_index = extract_valid_pairs(table_data)
         
-        # 유효한 데이터만 추출 (빈 행 제거)
-        valid_rows = []
-        for i in range(len(original_df)):
-            row_data = {}
-            has_data = False
-            
-            for col in original_df.columns:
-                if col == 'No.':
-                    row_data[col] = original_df.iloc[i][col]
-                else:
-                    value = original_df.iloc[i][col]
-                    if value is not None and value != '' and str(value).strip() != '':
-                        row_data[col] = value
-                        has_data = True
-                    else:
-                        row_data[col] = ''
-            
-            if has_data:
-                valid_rows.append(row_data)
-        
-        if not valid_rows:
+        if len(row_index) == 0:
             return jsonify({'status': 'error', 'message': '유효한 데이터가 없습니다.'})
         
-        # 결합된 데이터 생성
-        combined_data = []
-        
-        # 원본 데이터에 이상치 분석 결과 추가
-        original_data_dict = {row['No.']: row for row in valid_rows}
-        
-        # 이상치 계산 결과에서 각 데이터 포인트의 이상치 여부 확인
-        methods = ['zscore', 'iqr', 'mad']
-        method_names = {'zscore': 'Z-Score', 'iqr': 'IQR', 'mad': 'MAD'}
-        
-        # 계산 결과에서 원본 데이터 순서 유지
+        # 계산 이후 테이블이 바뀌었으면 행 위치가 맞지 않으므로 재계산 요청
         calc_original_data = results.get('original_data', [])
-        
-        for calc_row in calc_original_data:
-            # 원본 테이블에서 해당 행 찾기
-            original_row = None
-            for orig_row in valid_rows:
-                if (abs(float(orig_row.get('Size(nm)', 0) or 0) - calc_row.get('Size(nm)', 0)) < 0.001 and
-                    abs(float(orig_row.get('PI', 0) or 0) - calc_row.get('PI', 0)) < 0.001):
-                    original_row = orig_row.copy()
-                    break
-            
-            if original_row is None:
-                continue
-            
-            # 각 방법별 이상치 여부 추가
-            for method in methods:
-                method_result = results.get(method, {})
-                outliers = method_result.get('outliers', [])
-                
-                is_outlier = False
-                for outlier in outliers:
-                    if (abs(outlier.get('Size(nm)', 0) - calc_row.get('Size(nm)', 0)) < 0.001 and
-                        abs(outlier.get('PI', 0) - calc_row.get('PI', 0)) < 0.001):
-                        is_outlier = True
-                        break
-                
-                original_row[f'{method_names[method]}_이상치'] = '예' if is_outlier else '아니오'
-            
-            combined_data.append(original_row)
-        
-        # DataFrame 생성
-        combined_df = pd.DataFrame(combined_data)
+        calc_df = pd.DataFrame(calc_original_data)
+        if (len(calc_df) != len(sizes) or
+                not np.allclose(calc_df['Size(nm)'].to_numpy(dtype=float), sizes, atol=0.001) or
+                not np.allclose(calc_df['PI'].to_numpy(dtype=float), pis, atol=0.001)):
+            return jsonify({'status': 'error', 'message': '데이터가 이상치 계산 이후 변경되었습니다. 다시 계산하세요.'})
+        
+        # 원본 값 유지, 빈 값은 빈 문자열로
+        combined_df = original_df.iloc[row_index].reset_index(drop=True).astype(object)
+        for col in combined_df.columns:
+            if col != 'No.':
+                combined_df[col] = [
+                    '' if value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == '' else value
+                    for value in combined_df[col]
+                ]
+        
+        # 방법별 이상치 여부 (결과의 이상치 No.는 유효 행 순번)
+        methods = [m for m in METHOD_NAMES if m in results]
+        method_names = METHOD_NAMES
+        for method in methods:
+            flags = np.full(len(combined_df), '아니오', dtype=object)
+            positions = [int(outlier['No.']) - 1 for outlier in results[method].get('outliers', [])]
+            flags[positions] = '예'
+            combined_df[f'{method_names[method]}_이상치'] = flags
         
         # 컬럼 순서 정렬
         base_columns = ['No.', 'Size(nm)', 'PI']
@@ -2007,5 +5418,6 @@ def download_combined_results():
         return jsonify({'status': 'error', 'message': str(e)})
 
 if __name__ == '__main__':
+    start_analysis_pool()
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
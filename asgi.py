@@ -0,0 +1,22 @@
+"""
+ASGI 진입점
+기존 Flask 라우트를 ASGI 서버(uvicorn)에서 동시에 처리하기 위한 래퍼
+
+실행 예:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app as flask_app, start_analysis_pool
+
+# 요청 처리 스레드 수 (워커 프로세스당)
+# NumPy/pandas 연산과 세션 파일 I/O는 이 스레드 풀에서 실행되므로
+# 이벤트 루프는 업로드/다운로드 중에도 다른 요청을 계속 받을 수 있음
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+
+app = WSGIMiddleware(flask_app, workers=ASGI_THREADS)
+
+# 분석용 프로세스 풀을 미리 띄워 첫 요청 지연 방지
+start_analysis_pool()
@@ -0,0 +1,107 @@
+"""
+부하 테스트 스크립트
+동시 사용자 N명이 각자 세션으로 데이터 입력 → 이상치 계산 → 결과 다운로드를 반복 실행하고
+처리량(요청/초)과 응답 시간 분포를 출력
+
+사용 예:
+    python load_test.py --url http://localhost:8000 --users 50 --duration 30 --rows 2000
+"""
+import argparse
+import http.cookiejar
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def make_opener():
+    """사용자별 쿠키(세션)를 유지하는 opener 생성"""
+    jar = http.cookiejar.CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+
+
+def timed_request(opener, url, payload=None):
+    """요청 1건을 실행하고 (소요 시간, 성공 여부) 반환"""
+    data = None
+    headers = {}
+    if payload is not None:
+        data = json.dumps(payload).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    req = urllib.request.Request(url, data=data, headers=headers)
+    start = time.perf_counter()
+    try:
+        with opener.open(req, timeout=600) as resp:
+            resp.read()
+            ok = resp.status == 200
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def run_user(base_url, rows, deadline, records, lock):
+    """한 명의 사용자 시나리오를 deadline까지 반복"""
+    opener = make_opener()
+    timed_request(opener, f'{base_url}/')
+
+    table_data = {
+        'No.': list(range(1, rows + 1)),
+        'Size(nm)': [random.gauss(180, 15) for _ in range(rows)],
+        'PI': [random.gauss(0.2, 0.03) for _ in range(rows)]
+    }
+    scenario = [
+        ('/update_data', {'sample_name': 'load-test', 'production_date': '2025-01-01',
+                          'pass_count': 1, 'table_data': table_data}),
+        ('/calculate_with_thresholds', {'thresholds': {'zscore': 3.0, 'iqr': 1.5, 'mad': 3.5}}),
+        ('/download_combined_results', None),
+        ('/get_saved_datasets', None),
+    ]
+
+    while time.perf_counter() < deadline:
+        for path, payload in scenario:
+            elapsed, ok = timed_request(opener, base_url + path, payload)
+            with lock:
+                records.append((path, elapsed, ok))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Outlier webapp 부하 테스트')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0, help='테스트 시간 (초)')
+    parser.add_argument('--rows', type=int, default=2000, help='사용자별 테이블 행 수')
+    args = parser.parse_args()
+
+    records = []
+    lock = threading.Lock()
+    base_url = args.url.rstrip('/')
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for _ in range(args.users):
+            pool.submit(run_user, base_url, args.rows, deadline, records, lock)
+    total_time = time.perf_counter() - start
+
+    print(f'동시 사용자: {args.users}, 테스트 시간: {total_time:.1f}s, 행 수: {args.rows}')
+    print(f'총 요청: {len(records)}, 실패: {sum(1 for r in records if not r[2])}')
+    print(f'처리량: {len(records) / total_time:.1f} req/s')
+    print(f'{"endpoint":<32}{"count":>8}{"mean":>10}{"p50":>10}{"p95":>10}{"p99":>10}')
+    for path in sorted({r[0] for r in records}):
+        times = [r[1] * 1000 for r in records if r[0] == path]
+        print(f'{path:<32}{len(times):>8}{statistics.mean(times):>9.0f}ms'
+              f'{percentile(times, 50):>8.0f}ms{percentile(times, 95):>8.0f}ms{percentile(times, 99):>8.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,10 @@
 #!/bin/bash
-gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 app:app
\ No newline at end of file
+# 배포 환경은 기본적으로 운영 모드 (템플릿 미리 컴파일, 자동 리로드 끔)
+export APP_ENV=${APP_ENV:-production}
+
+# SERVER_MODE=asgi 이면 uvicorn(ASGI)으로 실행하여 워커당 여러 요청을 동시에 처리
+if [ "$SERVER_MODE" = "asgi" ]; then
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers ${WEB_CONCURRENCY:-2} --timeout-keep-alive 600
+else
+    gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 app:app
+fi
@@ -10,6 +10,8 @@ class ChartHandler {
 
     // 이상치 검출 및 계산
     async calculateWithThresholds() {
+        // 아직 전송되지 않은 셀 수정을 반영한 뒤 계산
+        await dataManager.flushCellEdits();
         const calculateBtn = document.querySelector('button[onclick="calculateWithThresholds()"]');
         const originalText = calculateBtn?.innerHTML;
         
@@ -24,10 +26,34 @@ class ChartHandler {
             const thresholds = {
                 zscore: parseFloat(document.getElementById('zscore_threshold')?.value || 3.0),
                 iqr: parseFloat(document.getElementById('iqr_threshold')?.value || 1.5),
-                mad: parseFloat(document.getElementById('mad_threshold')?.value || 3.5)
+                mad: parseFloat(document.getElementById('mad_threshold')?.value || 3.5),
+                gesd: parseFloat(document.getElementById('gesd_threshold')?.value || 0.05),
+                mahalanobis: parseFloat(document.getElementById('mahalanobis_threshold')?.value || 0.975),
+                hampel: parseFloat(document.getElementById('hampel_threshold')?.value || 3.0)
             };
+            const maxOutliers = parseInt(document.getElementById('gesd_max_outliers')?.value, 10);
+            const payload = { thresholds };
+            if (!isNaN(maxOutliers) && maxOutliers > 0) {
+                payload.max_outliers = maxOutliers;
+            }
+            const hampelWindow = parseInt(document.getElementById('hampel_window')?.value, 10);
+            if (!isNaN(hampelWindow) && hampelWindow > 0) {
+                payload.hampel_window = hampelWindow;
+            }
+            const orderBy = document.getElementById('hampel_order_by')?.value.trim();
+            if (orderBy) {
+                payload.order_by = orderBy;
+            }
+            if (document.getElementById('bootstrap_enabled')?.checked) {
+                const resamples = parseInt(document.getElementById('bootstrap_resamples')?.value, 10);
+                payload.bootstrap = { resamples: isNaN(resamples) ? 2000 : resamples, confidence: 0.95, seed: 0 };
+            }
+            const groupBy = document.getElementById('group_by_column')?.value.trim();
+            if (groupBy) {
+                payload.group_by = groupBy;
+            }
 
-            const result = await utils.apiRequest('/calculate_with_thresholds', { thresholds }, 'POST');
+            const result = await utils.apiRequest('/calculate_with_thresholds', payload, 'POST');
 
             if (result.status === 'success') {
                 this.lastCalculationResult = result;
@@ -104,29 +130,100 @@ class ChartHandler {
 
                 <!-- 방법별 결과 -->
                 <div class="grid grid-cols-1 lg:grid-cols-3 gap-6 mb-8">
-                    ${this.renderMethodResult('Z-Score', data.zscore, 'blue')}
-                    ${this.renderMethodResult('IQR', data.iqr, 'green')}
-                    ${this.renderMethodResult('MAD', data.mad, 'purple')}
+                    ${ChartHandler.METHODS
+                        .filter(method => data[method.key])
+                        .map(method => this.renderMethodResult(method.name, data[method.key], method.color))
+                        .join('')}
                 </div>
 
+                ${data.groups ? this.renderGroupSummary(data) : ''}
+
                 <!-- 시각화 차트 -->
                 <div class="bg-gray-50 rounded-xl p-6">
                     <h3 class="text-lg font-semibold mb-4">데이터 분포 시각화</h3>
                     <div id="scatter_plot"></div>
+                    <div id="distribution_plot" class="mt-6"></div>
                 </div>
             </div>
         `;
 
         // 차트 렌더링
         if (data.scatter_plot) {
-            const chartData = JSON.parse(data.scatter_plot);
+            const chartData = utils.parseFigure(data.scatter_plot);
             Plotly.newPlot('scatter_plot', chartData.data, chartData.layout, {responsive: true});
         }
+        this.renderDistribution();
 
         // 결과 영역으로 스크롤
         resultsDiv.scrollIntoView({ behavior: 'smooth' });
     }
 
+    // 현재 데이터의 Size(nm) 분포 (히스토그램 밀도 + KDE)
+    async renderDistribution() {
+        try {
+            const result = await utils.apiRequest('/distribution?current=1');
+            if (result.status !== 'success') return;
+            
+            const size = result.distributions[0]['Size(nm)'];
+            if (!size) return;
+            const { edges, counts } = size.histogram;
+            const total = counts.reduce((sum, c) => sum + c, 0);
+            const traces = [{
+                type: 'bar',
+                x: counts.map((_, i) => (edges[i] + edges[i + 1]) / 2),
+                y: counts.map((c, i) => c / (total * (edges[i + 1] - edges[i]))),
+                width: counts.map((_, i) => edges[i + 1] - edges[i]),
+                name: '히스토그램',
+                marker: { color: 'rgba(59, 130, 246, 0.4)' }
+            }];
+            if (size.kde) {
+                traces.push({ type: 'scatter', mode: 'lines', x: size.kde.x, y: size.kde.y, name: 'KDE', line: { color: '#1d4ed8' } });
+            }
+            
+            Plotly.newPlot('distribution_plot', traces, {
+                title: 'Size(nm) 분포',
+                xaxis: { title: 'Size (nm)' },
+                yaxis: { title: '밀도' },
+                bargap: 0,
+                height: 350
+            }, { responsive: true });
+        } catch (error) {
+            console.error('분포 조회 오류:', error);
+        }
+    }
+
+    // 그룹별 요약 렌더링
+    renderGroupSummary(data) {
+        const methods = ChartHandler.METHODS.filter(method => data[method.key]);
+        const rows = data.groups.map(group => `
+            <tr class="border-t border-gray-100">
+                <td class="px-4 py-2 text-center font-medium">${group.group}</td>
+                <td class="px-4 py-2 text-center">${group.count}</td>
+                <td class="px-4 py-2 text-center">${group.size_mean.toFixed(3)} ± ${group.size_std.toFixed(3)}</td>
+                <td class="px-4 py-2 text-center">${group.pi_mean.toFixed(3)} ± ${group.pi_std.toFixed(3)}</td>
+                ${methods.map(method => `<td class="px-4 py-2 text-center text-${method.color}-600">${group.outliers[method.key] || 0}</td>`).join('')}
+            </tr>
+        `).join('');
+
+        return `
+            <div class="mb-8 bg-white rounded-xl p-6 border border-gray-200 shadow-sm overflow-x-auto">
+                <h3 class="text-lg font-semibold mb-4 text-gray-700">그룹별 요약 (${data.group_by})</h3>
+                <table class="w-full text-sm">
+                    <thead>
+                        <tr class="bg-gray-50">
+                            <th class="px-4 py-2">그룹</th>
+                            <th class="px-4 py-2">개수</th>
+                            <th class="px-4 py-2">Size(nm)</th>
+                            <th class="px-4 py-2">PI</th>
+                            ${methods.map(method => `<th class="px-4 py-2">${method.name} 이상치</th>`).join('')}
+                        </tr>
+                    </thead>
+                    <tbody>${rows}</tbody>
+                </table>
+            </div>
+        `;
+    }
+
     // 방법별 결과 렌더링
     renderMethodResult(methodName, methodData, color) {
         return `
@@ -162,6 +259,17 @@ class ChartHandler {
                         <span class="text-gray-600">PI 표준편차:</span>
                         <span class="font-medium">${methodData.pi_std.toFixed(3)}</span>
                     </div>
+                    ${methodData.bootstrap ? `
+                    <hr class="border-gray-200">
+                    <div class="flex justify-between">
+                        <span class="text-gray-600">Size(nm) 평균 ${Math.round(methodData.bootstrap.confidence * 100)}% CI:</span>
+                        <span class="font-medium">${methodData.bootstrap.size_mean_ci.map(v => v.toFixed(3)).join(' ~ ')}</span>
+                    </div>
+                    <div class="flex justify-between">
+                        <span class="text-gray-600">PI 평균 ${Math.round(methodData.bootstrap.confidence * 100)}% CI:</span>
+                        <span class="font-medium">${methodData.bootstrap.pi_mean_ci.map(v => v.toFixed(3)).join(' ~ ')}</span>
+                    </div>
+                    ` : ''}
                 </div>
             </div>
         `;
@@ -190,7 +298,7 @@ class ChartHandler {
     // 사용자 정의 데이터 상관관계 분석
     async showCustomDataCorrelation() {
         try {
-            const result = await utils.apiRequest('/get_custom_data_correlation');
+            const result = await utils.apiRequest('/get_custom_data_correlation?color_mode=auto&fit=true');
             
             if (result.status === 'error') {
                 utils.showNotification(result.message, 'error');
@@ -254,7 +362,7 @@ class ChartHandler {
         `;
         
         // 차트 렌더링
-        const chartData = JSON.parse(data.custom_correlation_chart);
+        const chartData = utils.parseFigure(data.custom_correlation_chart);
         Plotly.newPlot('custom_correlation_chart', chartData.data, chartData.layout, {responsive: true});
         
         document.getElementById('viscosity_results').classList.remove('hidden');
@@ -262,6 +370,16 @@ class ChartHandler {
     }
 }
 
+// 이상치 검출 방법 (서버 METHOD_NAMES와 동일한 키)
+ChartHandler.METHODS = [
+    { key: 'zscore', name: 'Z-Score', color: 'blue' },
+    { key: 'iqr', name: 'IQR', color: 'green' },
+    { key: 'mad', name: 'MAD', color: 'purple' },
+    { key: 'gesd', name: 'GESD', color: 'orange' },
+    { key: 'mahalanobis', name: 'Mahalanobis', color: 'teal' },
+    { key: 'hampel', name: 'Hampel', color: 'rose' }
+];
+
 // 전역 인스턴스 생성
 window.chartHandler = new ChartHandler();
 
@@ -6,6 +6,30 @@
 class DataManager {
     constructor() {
         this.currentData = {};
+
+        // 가상 스크롤 그리드 상태: 화면에 보이는 행만 DOM에 그리고, 행 값은 서버에서 블록 단위로 가져옴
+        this.rowHeight = 44;
+        this.blockSize = 100;
+        this.overscan = 10;
+        this.maxCachedRows = 5000;
+        this.totalRows = 0;
+        this.columns = ['No.', 'Size(nm)', 'PI'];
+        this.rowCache = new Map();      // 행 인덱스 → { 컬럼: 값 }
+        this.pendingBlocks = new Set();
+        this.generation = 0;            // 테이블 교체 시 증가 (이전 요청 응답 무시용)
+        this.renderScheduled = false;
+
+        // 셀 수정은 모아서 한 번의 /update_cells로 전송하고, 세션을 바꾸는 요청은 순서대로 하나씩 처리
+        // (서버는 요청마다 세션 전체를 읽고 다시 쓰므로 동시에 보내면 마지막 요청이 앞의 수정을 덮어씀)
+        this.pendingCells = new Map();  // "행\u0000컬럼" → { row, column, value }
+        this.cellFlushTimer = null;
+        this.cellFlushDelay = 150;
+        this.sessionWrites = Promise.resolve();
+
+        // 이 크기를 넘는 파일은 청크로 나눠 업로드 (끊겨도 받은 청크 이후부터 이어서 전송)
+        this.chunkedUploadThreshold = 8 * 1024 * 1024;
+        this.chunkRetries = 5;
+
         this.initializeEventListeners();
     }
 
@@ -18,21 +42,44 @@ class DataManager {
         if (sampleNameEl) sampleNameEl.addEventListener('input', () => this.updateData());
         if (productionDateEl) productionDateEl.addEventListener('change', () => this.updateData());
         if (passCountEl) passCountEl.addEventListener('change', () => this.updateData());
+
+        // 그리드 스크롤 / 셀 수정 (이벤트 위임)
+        const viewport = document.getElementById('dataTableViewport');
+        if (viewport) viewport.addEventListener('scroll', () => this.scheduleRender());
+
+        const tbody = document.querySelector('#dataTable tbody');
+        if (tbody) {
+            tbody.addEventListener('change', (event) => {
+                const input = event.target;
+                if (input.matches('input[data-column]')) {
+                    this.updateCell(parseInt(input.dataset.row), input.dataset.column, input.value);
+                }
+            });
+        }
+    }
+
+    // 기본 정보(샘플명/생산일자/패스) 업데이트 - 테이블 값은 셀 단위로 따로 저장
+    // 세션을 변경하는 요청을 앞선 요청이 끝난 뒤 실행
+    enqueueSessionWrite(task) {
+        const run = this.sessionWrites.then(task);
+        this.sessionWrites = run.catch(() => {});
+        return run;
     }
 
-    // 데이터 업데이트
     async updateData() {
+        await this.flushCellEdits();
+        return this.enqueueSessionWrite(() => this.sendMetadata());
+    }
+
+    async sendMetadata() {
         const sampleName = document.getElementById('sample_name')?.value || '';
         const productionDate = document.getElementById('production_date')?.value || '';
         const passCount = document.getElementById('pass_count')?.value || 1;
 
-        const tableData = this.getCurrentTableData();
-
         const requestData = {
             sample_name: sampleName,
             production_date: productionDate,
-            pass_count: parseInt(passCount),
-            table_data: tableData
+            pass_count: parseInt(passCount)
         };
 
         try {
@@ -45,54 +92,141 @@ class DataManager {
         }
     }
 
-    // 현재 테이블 데이터 가져오기
-    getCurrentTableData() {
-        const tableData = { 'No.': [], 'Size(nm)': [], 'PI': [] };
-        const tbody = document.querySelector('#dataTable tbody');
-        
-        if (!tbody) return tableData;
+    // 셀 단위 수정
+    updateCell(row, column, rawValue) {
+        const value = utils.validateAndConvertNumber(rawValue);
+        const cached = this.rowCache.get(row);
+        if (cached) cached[column] = value;
+        this.pendingCells.set(`${row}\u0000${column}`, { row, column, value });
 
-        const rows = tbody.querySelectorAll('tr');
-        
-        rows.forEach((row, index) => {
-            const cells = row.querySelectorAll('td');
-            tableData['No.'].push(index + 1);
-            
-            // size(nm) 값
-            const sizeInput = cells[1]?.querySelector('input');
-            const sizeValue = utils.validateAndConvertNumber(sizeInput?.value);
-            tableData['Size(nm)'].push(sizeValue);
-            
-            // PI 값
-            const piInput = cells[2]?.querySelector('input');
-            const piValue = utils.validateAndConvertNumber(piInput?.value);
-            tableData['PI'].push(piValue);
-            
-            // 추가 컬럼들 처리
-            for (let i = 3; i < cells.length - 1; i++) {
-                const input = cells[i]?.querySelector('input');
-                if (input) {
-                    const columnName = input.getAttribute('data-column');
-                    if (columnName && !tableData[columnName]) {
-                        tableData[columnName] = new Array(index).fill(null);
-                    }
-                    if (columnName) {
-                        const value = utils.validateAndConvertNumber(input.value);
-                        tableData[columnName].push(value);
-                    }
+        clearTimeout(this.cellFlushTimer);
+        this.cellFlushTimer = setTimeout(() => this.flushCellEdits(), this.cellFlushDelay);
+    }
+
+    // 대기 중인 셀 수정을 한 번에 전송 (행 추가/삭제, 계산 등 테이블을 쓰는 작업 전에 호출)
+    flushCellEdits() {
+        clearTimeout(this.cellFlushTimer);
+        this.cellFlushTimer = null;
+        if (this.pendingCells.size === 0) {
+            return this.sessionWrites;
+        }
+        const changes = Array.from(this.pendingCells.values());
+        this.pendingCells.clear();
+        return this.enqueueSessionWrite(() => this.sendCellChanges(changes));
+    }
+
+    async sendCellChanges(changes) {
+        try {
+            const result = await utils.apiRequest('/update_cells', { changes: changes }, 'POST');
+            if (result.status === 'success') {
+                result.cells.forEach(cell => {
+                    const cached = this.rowCache.get(cell.row);
+                    if (cached) cached[cell.column] = cell.value;
+                });
+            } else {
+                utils.showNotification(result.message, 'error');
+            }
+        } catch (error) {
+            utils.showNotification('데이터 업데이트 중 오류가 발생했습니다.', 'error');
+        }
+    }
+
+    // 현재 보이는 행 범위 (overscan 포함)
+    visibleRange() {
+        const viewport = document.getElementById('dataTableViewport');
+        const scrollTop = viewport ? viewport.scrollTop : 0;
+        const height = viewport ? viewport.clientHeight : this.rowHeight * 20;
+        const start = Math.max(0, Math.floor(scrollTop / this.rowHeight) - this.overscan);
+        const end = Math.min(this.totalRows, Math.ceil((scrollTop + height) / this.rowHeight) + this.overscan);
+        return { start, end };
+    }
+
+    // 서버 응답의 행 창(window)을 캐시에 반영
+    cacheWindow(table) {
+        const rows = table.rows || {};
+        const count = rows['No.']?.length || 0;
+        for (let i = 0; i < count; i++) {
+            const index = table.offset + i;
+            const row = this.rowCache.get(index) || {};
+            Object.keys(rows).forEach(column => {
+                row[column] = rows[column][i];
+            });
+            this.rowCache.set(index, row);
+        }
+    }
+
+    // 보이는 범위에서 멀리 떨어진 캐시 행 정리
+    trimCache(start, end) {
+        if (this.rowCache.size <= this.maxCachedRows) return;
+        const margin = Math.floor(this.maxCachedRows / 2);
+        for (const index of this.rowCache.keys()) {
+            if (index < start - margin || index > end + margin) {
+                this.rowCache.delete(index);
+            }
+        }
+    }
+
+    // 캐시에 없는 블록만 서버에서 조회
+    ensureRows(start, end) {
+        if (end <= start) return;
+        const firstBlock = Math.floor(start / this.blockSize);
+        const lastBlock = Math.floor((end - 1) / this.blockSize);
+
+        for (let block = firstBlock; block <= lastBlock; block++) {
+            const offset = block * this.blockSize;
+            const blockEnd = Math.min(offset + this.blockSize, this.totalRows);
+            let missing = false;
+            for (let i = Math.max(offset, start); i < Math.min(blockEnd, end); i++) {
+                if (!this.rowCache.has(i)) {
+                    missing = true;
+                    break;
                 }
             }
+            if (!missing || this.pendingBlocks.has(block)) continue;
+
+            this.pendingBlocks.add(block);
+            const generation = this.generation;
+            utils.apiRequest(`/table_window?offset=${offset}&limit=${this.blockSize}`)
+                .then(result => {
+                    if (generation !== this.generation) return;
+                    if (result.status === 'success') {
+                        this.cacheWindow(result.table);
+                        this.scheduleRender();
+                    }
+                })
+                .catch(error => console.warn('테이블 행 조회 실패:', error))
+                .finally(() => this.pendingBlocks.delete(block));
+        }
+    }
+
+    scheduleRender() {
+        if (this.renderScheduled) return;
+        this.renderScheduled = true;
+        requestAnimationFrame(() => {
+            this.renderScheduled = false;
+            this.renderVisibleRows();
         });
+    }
 
-        return tableData;
+    // 서버 요청에 함께 보낼 현재 화면 범위
+    currentWindowParams() {
+        const { start } = this.visibleRange();
+        return { offset: start, limit: this.blockSize };
     }
 
     // 행 추가
     async addRow() {
+        await this.flushCellEdits();
         try {
             const result = await utils.apiRequest('/add_row', {}, 'POST');
             if (result.status === 'success') {
-                this.renderTable(result.table_data);
+                this.totalRows = result.table.total_rows;
+                this.cacheWindow(result.table);
+                this.renderVisibleRows();
+
+                // 추가된 행으로 스크롤
+                const viewport = document.getElementById('dataTableViewport');
+                if (viewport) viewport.scrollTop = viewport.scrollHeight;
             } else {
                 utils.showNotification(result.message, 'error');
             }
@@ -108,10 +242,18 @@ class DataManager {
             return;
         }
 
+        await this.flushCellEdits();
         try {
-            const result = await utils.apiRequest('/add_column', { column_name: columnName.trim() }, 'POST');
+            const result = await utils.apiRequest('/add_column', {
+                column_name: columnName.trim(),
+                ...this.currentWindowParams()
+            }, 'POST');
             if (result.status === 'success') {
-                this.renderTable(result.table_data);
+                this.columns = result.table.columns;
+                // 새 컬럼은 모든 행이 빈 값
+                this.rowCache.forEach(row => { row[columnName.trim()] = null; });
+                this.renderHeader();
+                this.renderVisibleRows();
             } else {
                 utils.showNotification(result.message, 'error');
             }
@@ -125,14 +267,15 @@ class DataManager {
         if (!confirm('모든 데이터를 초기화하시겠습니까?')) {
             return;
         }
+        await this.flushCellEdits();
 
         try {
-            const result = await utils.apiRequest('/reset_data', {}, 'POST');
+            const result = await utils.apiRequest('/reset_data', { offset: 0, limit: this.blockSize }, 'POST');
             if (result.status === 'success') {
                 document.getElementById('sample_name').value = result.sample_name;
                 document.getElementById('production_date').value = result.production_date;
                 document.getElementById('pass_count').value = result.pass_count;
-                this.renderTable(result.table_data);
+                this.renderTable(result.table);
                 
                 // 결과 영역 숨기기
                 const resultsDiv = document.getElementById('results');
@@ -153,72 +296,68 @@ class DataManager {
         }
     }
 
-    // 테이블 렌더링
-    renderTable(tableData) {
-        const tbody = document.querySelector('#dataTable tbody');
+    // 테이블 교체 (서버의 행 창 응답 { offset, total_rows, columns, rows })
+    renderTable(table) {
+        if (!table) return;
+
+        this.generation++;
+        this.rowCache.clear();
+        this.pendingBlocks.clear();
+        this.totalRows = table.total_rows || 0;
+        this.columns = table.columns || ['No.', 'Size(nm)', 'PI'];
+        this.cacheWindow(table);
+
+        const viewport = document.getElementById('dataTableViewport');
+        if (viewport) viewport.scrollTop = 0;
+
+        this.renderHeader();
+        this.renderVisibleRows();
+    }
+
+    // 헤더 렌더링 (순서는 서버가 결정: No., Size(nm), PI, 기타 컬럼들)
+    renderHeader() {
         const thead = document.querySelector('#dataTable thead tr');
-        
-        if (!tbody || !thead) return;
+        if (!thead) return;
 
-        // 헤더 업데이트 (순서 고정: No., Size(nm), PI, 기타 컬럼들)
-        thead.innerHTML = '<th class="px-4 py-2 text-center font-medium text-gray-700 bg-gray-100">No.</th>';
-        
-        // 고정 순서 컬럼들
-        const fixedColumns = ['Size(nm)', 'PI'];
-        const allColumns = Object.keys(tableData).filter(key => key !== 'No.');
-        
-        // 컬럼 이름 매핑 (대소문자 무시)
-        const columnMap = {};
-        allColumns.forEach(col => {
-            columnMap[col.toLowerCase()] = col;
-        });
+        const headerClass = 'px-4 py-2 text-center font-medium text-gray-700 bg-gray-100';
+        thead.innerHTML = this.columns
+            .map(column => `<th class="${headerClass}">${column}</th>`)
+            .join('') + `<th class="${headerClass}">작업</th>`;
+    }
 
-        // 먼저 고정 순서 컬럼들 추가
-        fixedColumns.forEach(column => {
-            const realCol = columnMap[column.toLowerCase()];
-            if (realCol) {
-                // 항상 "Size(nm)"로 표기
-                const displayName = realCol.toLowerCase() === 'size(nm)' || realCol.toLowerCase() === 'size(nm)' ? 'Size(nm)' : realCol;
-                thead.innerHTML += `<th class="px-4 py-2 text-center font-medium text-gray-700 bg-gray-100">${displayName}</th>`;
-            }
-        });
+    // 보이는 행만 렌더링 (위/아래 여백 행으로 전체 스크롤 높이 유지)
+    renderVisibleRows() {
+        const tbody = document.querySelector('#dataTable tbody');
+        if (!tbody) return;
 
-        // 그 다음 나머지 컬럼들 추가
-        allColumns
-            .filter(column => !fixedColumns.map(c => c.toLowerCase()).includes(column.toLowerCase()))
-            .forEach(column => {
-                // 항상 "Size(nm)"로 표기
-                const displayName = column.toLowerCase() === 'size(nm)' || column.toLowerCase() === 'size(nm)' ? 'Size(nm)' : column;
-                thead.innerHTML += `<th class="px-4 py-2 text-center font-medium text-gray-700 bg-gray-100">${displayName}</th>`;
-            });
-        
-        thead.innerHTML += '<th class="px-4 py-2 text-center font-medium text-gray-700 bg-gray-100">작업</th>';
+        const { start, end } = this.visibleRange();
+        const dataColumns = this.columns.filter(column => column !== 'No.');
+        const colspan = this.columns.length + 1;
+
+        const fragment = document.createDocumentFragment();
+        const spacer = (rows) => {
+            const tr = document.createElement('tr');
+            tr.style.height = `${rows * this.rowHeight}px`;
+            const td = document.createElement('td');
+            td.colSpan = colspan;
+            tr.appendChild(td);
+            return tr;
+        };
 
-        // 본문 업데이트
-        tbody.innerHTML = '';
-        const rowCount = tableData['No.']?.length || 0;
+        if (start > 0) fragment.appendChild(spacer(start));
 
-        for (let i = 0; i < rowCount; i++) {
-            const row = tbody.insertRow();
+        for (let i = start; i < end; i++) {
+            const rowData = this.rowCache.get(i);
+            const row = document.createElement('tr');
             row.className = 'border-b hover:bg-gray-50';
+            row.style.height = `${this.rowHeight}px`;
             
             // No. 컬럼
             const noCell = row.insertCell();
             noCell.className = 'px-4 py-2 text-center font-medium';
             noCell.textContent = i + 1;
             
-            // 데이터 컬럼들 (고정 순서 적용)
-            const orderedColumns = [];
-            fixedColumns.forEach(column => {
-                if (allColumns.includes(column)) {
-                    orderedColumns.push(column);
-                }
-            });
-            allColumns.filter(column => !fixedColumns.includes(column)).forEach(column => {
-                orderedColumns.push(column);
-            });
-            
-            orderedColumns.forEach(column => {
+            dataColumns.forEach(column => {
                 const cell = row.insertCell();
                 cell.className = 'px-4 py-2';
                 
@@ -226,14 +365,18 @@ class DataManager {
                 input.type = 'number';
                 input.step = '0.001';
                 input.className = 'w-full px-2 py-1 border rounded focus:outline-none focus:ring-2 focus:ring-blue-500 text-center';
-                input.setAttribute('data-column', column);
+                input.dataset.column = column;
+                input.dataset.row = i;
                 
-                const value = tableData[column]?.[i];
-                if (value !== null && value !== undefined) {
-                    input.value = value;
+                if (!rowData) {
+                    // 아직 불러오지 않은 행
+                    input.disabled = true;
+                } else {
+                    const value = rowData[column];
+                    if (value !== null && value !== undefined) {
+                        input.value = value;
+                    }
                 }
-                
-                input.addEventListener('change', () => this.updateData());
                 cell.appendChild(input);
             });
             
@@ -246,19 +389,44 @@ class DataManager {
                     삭제
                 </button>
             `;
+            fragment.appendChild(row);
         }
+
+        if (end < this.totalRows) fragment.appendChild(spacer(this.totalRows - end));
+
+        tbody.replaceChildren(fragment);
+        this.ensureRows(start, end);
+        this.trimCache(start, end);
     }
 
     // 행 삭제
-    deleteRow(index) {
+    async deleteRow(index) {
         if (!confirm('이 행을 삭제하시겠습니까?')) {
             return;
         }
-        
-        const tbody = document.querySelector('#dataTable tbody');
-        if (tbody && tbody.rows[index]) {
-            tbody.deleteRow(index);
-            this.updateData();
+        // 행 번호가 바뀌기 전에 대기 중인 수정을 먼저 반영
+        await this.flushCellEdits();
+
+        try {
+            const result = await utils.apiRequest('/delete_rows', {
+                rows: [index],
+                limit: this.blockSize
+            }, 'POST');
+            if (result.status === 'success') {
+                // 삭제 위치 이후 행들은 당겨지므로 캐시에서 제거 후 응답 창으로 다시 채움
+                for (const cached of [...this.rowCache.keys()]) {
+                    if (cached >= index) this.rowCache.delete(cached);
+                }
+                this.generation++;
+                this.pendingBlocks.clear();
+                this.totalRows = result.table.total_rows;
+                this.cacheWindow(result.table);
+                this.renderVisibleRows();
+            } else {
+                utils.showNotification(result.message, 'error');
+            }
+        } catch (error) {
+            utils.showNotification('행 삭제 중 오류가 발생했습니다.', 'error');
         }
     }
 
@@ -269,20 +437,25 @@ class DataManager {
             utils.showNotification('파일을 선택해주세요.', 'error');
             return;
         }
-
-        const formData = new FormData();
-        formData.append('file', file);
+        await this.flushCellEdits();
 
         try {
-            const response = await fetch('/upload_file', {
-                method: 'POST',
-                body: formData
-            });
+            const result = file.size > this.chunkedUploadThreshold
+                ? await this.uploadFileChunked(file)
+                : await this.uploadFileSingle(file);
             
-            const result = await response.json();
-            
-            if (result.status === 'success') {
-                this.renderTable(result.table_data);
+            if (result.status === 'success' && result.archive) {
+                // zip: 파일별로 저장된 데이터셋 생성 (현재 테이블은 그대로)
+                utils.showNotification(result.message, 'success');
+                if (result.failed && result.failed.length > 0) {
+                    const failedInfo = result.failed.map(item => `${item.file}: ${item.message}`).join('\n');
+                    utils.showNotification(`읽지 못한 파일:\n${failedInfo}`, 'error');
+                }
+                if (typeof updateSavedDatasetsList === 'function') {
+                    await updateSavedDatasetsList();
+                }
+            } else if (result.status === 'success') {
+                this.renderTable(result.table);
                 
                 // 메타데이터가 있으면 UI 업데이트
                 if (result.metadata && Object.keys(result.metadata).length > 0) {
@@ -322,6 +495,75 @@ class DataManager {
         fileInput.value = '';
     }
 
+    // 한 번의 multipart 요청으로 업로드
+    async uploadFileSingle(file) {
+        const formData = new FormData();
+        formData.append('file', file);
+        formData.append('offset', 0);
+        formData.append('limit', this.blockSize);
+
+        const response = await fetch('/upload_file', {
+            method: 'POST',
+            body: formData
+        });
+        return await response.json();
+    }
+
+    // 청크 업로드: 시작(또는 이전 업로드 이어받기) → 받지 않은 청크 PUT → 완료
+    async uploadFileChunked(file) {
+        const resumeKey = `chunked-upload:${file.name}:${file.size}:${file.lastModified}`;
+        let upload = null;
+
+        const savedId = localStorage.getItem(resumeKey);
+        if (savedId) {
+            const status = await utils.apiRequest(`/upload_chunks/${savedId}`, null, 'GET');
+            if (status.status === 'success') upload = status;
+        }
+        if (!upload) {
+            upload = await utils.apiRequest('/upload_chunks', { filename: file.name, size: file.size }, 'POST');
+            if (upload.status !== 'success') return upload;
+            localStorage.setItem(resumeKey, upload.upload_id);
+        }
+
+        const received = new Set(upload.received);
+        if (received.size > 0) {
+            utils.showNotification(`이전 업로드를 이어서 전송합니다. (${received.size}/${upload.total_chunks} 청크 완료)`, 'info');
+        }
+
+        // 순서대로 보내야 서버가 앞쪽부터 바로 파싱할 수 있음
+        for (let index = 0; index < upload.total_chunks; index++) {
+            if (received.has(index)) continue;
+            const chunk = file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size);
+            const result = await this.putChunk(upload.upload_id, index, chunk);
+            if (result.status !== 'success') return result;
+        }
+
+        const result = await utils.apiRequest(`/upload_chunks/${upload.upload_id}/finalize`,
+            { offset: 0, limit: this.blockSize }, 'POST');
+        // 완료에 실패하면 서버에 청크가 남아 있으므로 같은 파일을 다시 선택하면 바로 완료 요청부터 재시도
+        if (result.status === 'success') localStorage.removeItem(resumeKey);
+        return result;
+    }
+
+    // 청크 하나 전송 (네트워크 오류/서버 오류 시 잠시 후 재시도)
+    async putChunk(uploadId, index, chunk) {
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const response = await fetch(`/upload_chunks/${uploadId}/${index}`, {
+                    method: 'PUT',
+                    body: chunk
+                });
+                if (response.status < 500) return await response.json();
+            } catch (error) {
+                if (attempt >= this.chunkRetries) throw error;
+            }
+            if (attempt >= this.chunkRetries) {
+                return { status: 'error', message: '청크 업로드에 실패했습니다. 같은 파일을 다시 선택하면 이어서 전송합니다.' };
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+        }
+    }
+
     // 테이블 데이터 다운로드 (단순화된 버전)
     async downloadTableData() {
         try {
@@ -9,7 +9,10 @@ window.appState = {
     currentThresholds: {
         zscore: 3.0,
         iqr: 1.5,
-        mad: 3.5
+        mad: 3.5,
+        gesd: 0.05,
+        mahalanobis: 0.975,
+        hampel: 3.0
     },
     savedDatasets: [],
     darkMode: false
@@ -90,6 +93,14 @@ function setupEventListeners() {
         }
     });
     
+    // 저장된 데이터셋 검색 (이름 접두어)
+    const datasetSearch = document.getElementById('dataset_search');
+    if (datasetSearch) {
+        datasetSearch.addEventListener('input', function() {
+            searchSavedDatasets(this.value);
+        });
+    }
+    
     // 파일 업로드
     const fileInput = document.getElementById('file_input');
     if (fileInput) {
@@ -138,7 +149,10 @@ function initializeThresholdSliders() {
     const sliders = [
         { id: 'zscore_threshold', value: 3.0, min: 1.0, max: 5.0, step: 0.1 },
         { id: 'iqr_threshold', value: 1.5, min: 0.5, max: 3.0, step: 0.1 },
-        { id: 'mad_threshold', value: 3.5, min: 1.0, max: 5.0, step: 0.1 }
+        { id: 'mad_threshold', value: 3.5, min: 1.0, max: 5.0, step: 0.1 },
+        { id: 'gesd_threshold', value: 0.05, min: 0.01, max: 0.1, step: 0.01 },
+        { id: 'mahalanobis_threshold', value: 0.975, min: 0.9, max: 0.999, step: 0.001 },
+        { id: 'hampel_threshold', value: 3.0, min: 1.0, max: 5.0, step: 0.1 }
     ];
     
     sliders.forEach(slider => {
@@ -173,8 +187,8 @@ function restoreSessionData() {
             passManager.renderPassAveragesTable(currentDataset.pass_averages);
         }
         
-        if (currentDataset.table_data) {
-            dataManager.renderTable(currentDataset.table_data);
+        if (currentDataset.table) {
+            dataManager.renderTable(currentDataset.table);
         }
         
         console.log('✅ 세션 데이터 복원 완료');
@@ -279,7 +293,7 @@ async function loadDataset() {
                 }
             }
             
-            dataManager.renderTable(result.table_data);
+            dataManager.renderTable(result.table);
             
             // UI 업데이트 완료 후 입력 이벤트 트리거하여 데이터 동기화
             setTimeout(() => {
@@ -324,18 +338,71 @@ async function deleteDataset() {
     }
 }
 
-async function getSavedDatasets() {
+// 데이터셋 목록 한 번에 가져올 최대 개수 (서버 측 페이지 조회)
+const DATASET_PAGE_SIZE = 100;
+
+// 저장된 데이터셋 목록 페이지 조회 (q: 이름 접두어, sort, order, offset, limit)
+async function fetchSavedDatasetsPage(params = {}) {
+    const query = new URLSearchParams({
+        sort: 'production_date',
+        order: 'desc',
+        limit: DATASET_PAGE_SIZE,
+        ...params
+    });
+    
     try {
-        const result = await utils.apiRequest('/get_saved_datasets', {}, 'GET');
-        return result.datasets || [];
+        const result = await utils.apiRequest(`/get_saved_datasets?${query.toString()}`, {}, 'GET');
+        return {
+            datasets: result.datasets || [],
+            total: result.total ?? (result.datasets || []).length
+        };
     } catch (error) {
         console.error('저장된 데이터셋 목록 가져오기 실패:', error);
-        return [];
+        return { datasets: [], total: 0 };
+    }
+}
+
+// 전체 목록이 필요한 곳(비교 선택 등)은 total까지 페이지를 차례로 조회
+async function getSavedDatasets(params = {}) {
+    const datasets = [];
+    while (true) {
+        const page = await fetchSavedDatasetsPage({ ...params, offset: datasets.length });
+        datasets.push(...page.datasets);
+        if (page.datasets.length === 0 || datasets.length >= page.total) {
+            return datasets;
+        }
     }
 }
 
+// 드롭다운 목록 상태 (검색어, 현재 페이지 시작 위치)
+const datasetListState = { q: '', offset: 0, total: 0 };
+let datasetSearchTimer = null;
+
+function searchSavedDatasets(query) {
+    clearTimeout(datasetSearchTimer);
+    datasetSearchTimer = setTimeout(() => {
+        datasetListState.q = query.trim();
+        datasetListState.offset = 0;
+        updateSavedDatasetsList();
+    }, 300);
+}
+
+function changeDatasetPage(direction) {
+    const offset = datasetListState.offset + direction * DATASET_PAGE_SIZE;
+    if (offset < 0 || offset >= datasetListState.total) return;
+    datasetListState.offset = offset;
+    updateSavedDatasetsList();
+}
+
 async function updateSavedDatasetsList() {
-    const datasets = await getSavedDatasets();
+    let { datasets, total } = await fetchSavedDatasetsPage({ q: datasetListState.q, offset: datasetListState.offset });
+    // 삭제 등으로 현재 페이지가 비면 마지막 페이지로 이동
+    if (datasets.length === 0 && total > 0 && datasetListState.offset > 0) {
+        datasetListState.offset = Math.floor((total - 1) / DATASET_PAGE_SIZE) * DATASET_PAGE_SIZE;
+        ({ datasets, total } = await fetchSavedDatasetsPage({ q: datasetListState.q, offset: datasetListState.offset }));
+    }
+    datasetListState.total = total;
+    
     const selectElement = document.getElementById('saved_datasets');
     const countElement = document.getElementById('dataset_count');
     
@@ -355,10 +422,21 @@ async function updateSavedDatasetsList() {
         selectElement.appendChild(option);
     });
     
-    // 개수 업데이트
+    // 개수 업데이트 (페이지와 무관하게 전체 개수 표시)
     if (countElement) {
-        countElement.textContent = datasets.length;
+        countElement.textContent = total;
     }
+    
+    // 페이지 이동 버튼 / 현재 범위 표시
+    const pageInfo = document.getElementById('dataset_page_info');
+    if (pageInfo) {
+        const start = total > 0 ? datasetListState.offset + 1 : 0;
+        pageInfo.textContent = `${start}-${datasetListState.offset + datasets.length} / ${total}`;
+    }
+    const prevButton = document.getElementById('dataset_prev_page');
+    const nextButton = document.getElementById('dataset_next_page');
+    if (prevButton) prevButton.disabled = datasetListState.offset === 0;
+    if (nextButton) nextButton.disabled = datasetListState.offset + DATASET_PAGE_SIZE >= total;
 }
 
 
@@ -389,6 +467,8 @@ async function showDatasetComparison() {
         
         if (result.status === 'success') {
             displayComparisonResults(result);
+            loadComparisonMatrix(selectedDatasets);
+            loadComparisonDistribution(selectedDatasets);
             utils.showNotification('데이터셋 비교가 완료되었습니다.', 'success');
         } else {
             utils.showNotification(result.message, 'error');
@@ -405,7 +485,7 @@ async function showDatasetSelectionModal(datasets) {
         modal.innerHTML = `
             <div class="bg-white rounded-lg p-6 w-full max-w-md mx-4">
                 <h3 class="text-lg font-semibold mb-4">비교할 데이터셋 선택</h3>
-                <div class="space-y-2 mb-4" id="dataset-checkboxes">
+                <div class="space-y-2 mb-4 max-h-96 overflow-y-auto" id="dataset-checkboxes">
                     ${datasets.map(dataset => `
                         <label class="flex items-center space-x-2">
                             <input type="checkbox" value="${dataset.name}" class="dataset-checkbox">
@@ -480,6 +560,24 @@ function displayComparisonResults(result) {
     
     html += `
             </div>
+            <div class="mt-6">
+                <div id="comparison_distribution_chart" style="width: 100%; height: 400px;"></div>
+            </div>
+            <div id="comparison_matrix_section" class="mt-6 hidden">
+                <div class="flex flex-wrap items-center gap-3 mb-3">
+                    <h4 class="font-semibold">쌍별 검정 p값 행렬</h4>
+                    <select id="comparison_matrix_variable" class="px-2 py-1 border rounded text-sm">
+                        <option value="Size(nm)">Size(nm)</option>
+                        <option value="PI">PI</option>
+                    </select>
+                    <select id="comparison_matrix_test" class="px-2 py-1 border rounded text-sm">
+                        <option value="welch_t">Welch t-검정</option>
+                        <option value="mann_whitney">Mann-Whitney U</option>
+                        <option value="ks">Kolmogorov-Smirnov</option>
+                    </select>
+                </div>
+                <div id="comparison_matrix_chart" style="width: 100%; height: 500px;"></div>
+            </div>
         </div>
     `;
     
@@ -488,7 +586,7 @@ function displayComparisonResults(result) {
     
     // 차트 렌더링
     if (result.comparison_plot) {
-        const plotData = JSON.parse(result.comparison_plot);
+        const plotData = utils.parseFigure(result.comparison_plot);
         Plotly.newPlot('comparison_chart', plotData.data, plotData.layout, {responsive: true});
     }
     
@@ -496,10 +594,88 @@ function displayComparisonResults(result) {
     targetDiv.scrollIntoView({ behavior: 'smooth' });
 }
 
+// 선택된 데이터셋의 Size(nm) KDE 곡선 겹쳐 그리기 (서버에 데이터셋별로 캐시됨)
+async function loadComparisonDistribution(datasetNames) {
+    try {
+        const query = datasetNames.map(name => `dataset=${encodeURIComponent(name)}`).join('&');
+        const result = await utils.apiRequest(`/distribution?${query}`);
+        if (result.status !== 'success') return;
+        
+        const traces = result.distributions
+            .filter(distribution => distribution['Size(nm)'] && distribution['Size(nm)'].kde)
+            .map(distribution => ({
+                type: 'scatter',
+                mode: 'lines',
+                x: distribution['Size(nm)'].kde.x,
+                y: distribution['Size(nm)'].kde.y,
+                name: distribution.name
+            }));
+        
+        Plotly.newPlot('comparison_distribution_chart', traces, {
+            title: 'Size(nm) 분포 (KDE)',
+            xaxis: { title: 'Size (nm)' },
+            yaxis: { title: '밀도' }
+        }, { responsive: true });
+    } catch (error) {
+        console.error('분포 조회 오류:', error);
+    }
+}
+
+// 쌍별 통계 검정 행렬 조회 및 히트맵 표시
+async function loadComparisonMatrix(datasetNames) {
+    try {
+        const result = await utils.apiRequest('/compare_datasets/matrix', { dataset_names: datasetNames }, 'POST');
+        if (result.status !== 'success') {
+            utils.showNotification(result.message, 'error');
+            return;
+        }
+        
+        const section = document.getElementById('comparison_matrix_section');
+        if (!section) return;
+        section.classList.remove('hidden');
+        
+        const render = () => renderComparisonHeatmap(
+            result,
+            document.getElementById('comparison_matrix_variable').value,
+            document.getElementById('comparison_matrix_test').value
+        );
+        document.getElementById('comparison_matrix_variable').onchange = render;
+        document.getElementById('comparison_matrix_test').onchange = render;
+        render();
+    } catch (error) {
+        utils.showNotification('검정 행렬 계산 중 오류가 발생했습니다.', 'error');
+    }
+}
+
+function renderComparisonHeatmap(matrix, variable, test) {
+    const values = matrix.variables[variable][test];
+    const statistic = values.statistic;
+    const text = values.p_value.map((row, i) => row.map((p, j) =>
+        `p = ${p === null ? '-' : p.toExponential(2)}<br>통계량 = ${statistic[i][j] === null ? '-' : statistic[i][j].toFixed(3)}`
+    ));
+    
+    Plotly.newPlot('comparison_matrix_chart', [{
+        type: 'heatmap',
+        x: matrix.labels,
+        y: matrix.labels,
+        z: values.p_value,
+        text: text,
+        hovertemplate: '%{y} vs %{x}<br>%{text}<extra></extra>',
+        zmin: 0,
+        zmax: 0.1,
+        colorscale: 'RdBu',
+        colorbar: { title: 'p값' }
+    }], {
+        title: `${variable} - 유의수준 0.05 미만은 붉은색`,
+        yaxis: { autorange: 'reversed' },
+        margin: { l: 120, r: 30, t: 60, b: 120 }
+    }, { responsive: true });
+}
+
 // 사용자 정의 데이터 상관관계 분석
 async function showCustomDataCorrelation() {
     try {
-        const result = await utils.apiRequest('/get_custom_data_correlation', {}, 'GET');
+        const result = await utils.apiRequest('/get_custom_data_correlation?color_mode=auto&fit=true', {}, 'GET');
         
         if (result.status === 'error') {
             utils.showNotification(result.message, 'error');
@@ -586,7 +762,7 @@ function displayCustomDataCorrelation(data) {
 
     // 차트 렌더링
     if (data.custom_correlation_chart) {
-        const chartData = JSON.parse(data.custom_correlation_chart);
+        const chartData = utils.parseFigure(data.custom_correlation_chart);
         Plotly.newPlot('custom_correlation_chart', chartData.data, chartData.layout, {responsive: true});
     }
 
@@ -673,6 +849,7 @@ function disableDarkMode() {
 window.saveDataset = saveDataset;
 window.loadDataset = loadDataset;
 window.deleteDataset = deleteDataset;
+window.changeDatasetPage = changeDatasetPage;
 window.showDatasetComparison = showDatasetComparison;
 window.showHelpModal = showHelpModal;
 window.refreshPage = refreshPage;
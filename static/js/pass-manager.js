@@ -6,6 +6,11 @@
 class PassManager {
     constructor() {
         this.passAverages = [];
+        // 트렌드 차트 증분 갱신 상태 (마지막으로 반영한 서버 버전, 관리도 옵션)
+        this.trendVersion = null;
+        this.trendParams = '';
+        this.spcRuleNames = {};
+        this.trendRefresh = Promise.resolve();
         // 페이지 로드 시 초기 설정
         this.initializeCustomFieldLabels();
     }
@@ -51,7 +56,7 @@ class PassManager {
         // 사용자가 Manual이 아닌 방법을 선택했고, 계산 결과가 있는 경우 임계값 확인
         if (userRemovalMethod !== 'Manual' && window.chartHandler && window.chartHandler.lastCalculationResult) {
             const calculationResult = window.chartHandler.lastCalculationResult;
-            const methodMap = { 'Z-Score': 'zscore', 'IQR': 'iqr', 'MAD': 'mad' };
+            const methodMap = { 'Z-Score': 'zscore', 'IQR': 'iqr', 'MAD': 'mad', 'GESD': 'gesd', 'Mahalanobis': 'mahalanobis', 'Hampel': 'hampel' };
             const selectedMethodKey = methodMap[userRemovalMethod];
             
             if (selectedMethodKey && calculationResult[selectedMethodKey]) {
@@ -69,8 +74,8 @@ class PassManager {
         // 사용자가 Manual을 선택했지만 계산 결과와 정확히 일치하는 경우에만 자동 감지
         if (userRemovalMethod === 'Manual' && window.chartHandler && window.chartHandler.lastCalculationResult) {
             const calculationResult = window.chartHandler.lastCalculationResult;
-            const methods = ['zscore', 'iqr', 'mad'];
-            const methodNames = { 'zscore': 'Z-Score', 'iqr': 'IQR', 'mad': 'MAD' };
+            const methods = ['zscore', 'iqr', 'mad', 'gesd', 'mahalanobis', 'hampel'];
+            const methodNames = { 'zscore': 'Z-Score', 'iqr': 'IQR', 'mad': 'MAD', 'gesd': 'GESD', 'mahalanobis': 'Mahalanobis', 'hampel': 'Hampel' };
             
             let bestMatch = null;
             let bestMatchDiff = Infinity;
@@ -128,6 +133,7 @@ class PassManager {
                 document.getElementById('exp_custom_data_input').value = '';
                 
                 this.renderExperimentalTable(result.experimental_data);
+                this.refreshTrendCharts();
                 
                 // 사용자 정의 필드명 업데이트
                 if (result.custom_data_field_name) {
@@ -178,6 +184,7 @@ class PassManager {
                 document.getElementById('ctrl_custom_data_input').value = '';
                 
                 this.renderControlTable(result.control_data);
+                this.refreshTrendCharts();
                 
                 // 사용자 정의 필드명 업데이트
                 if (result.custom_data_field_name) {
@@ -285,6 +292,7 @@ class PassManager {
                 document.getElementById('custom_data_input').value = '';
                 
                 this.renderPassAveragesTable(result.pass_averages);
+                this.refreshTrendCharts();
             } else {
                 utils.showNotification(result.message, 'error');
             }
@@ -316,7 +324,10 @@ class PassManager {
         const methodNames = {
             'zscore': 'Z-Score',
             'iqr': 'IQR', 
-            'mad': 'MAD'
+            'mad': 'MAD',
+            'gesd': 'GESD',
+            'mahalanobis': 'Mahalanobis',
+            'hampel': 'Hampel'
         };
         
         // 샘플명 생성 (기본 샘플명만 사용)
@@ -368,6 +379,7 @@ class PassManager {
                 // 실험군 데이터만 필터링하여 렌더링
                 const experimentalData = result.pass_averages.filter(p => p.group_type === 'experimental');
                 this.renderExperimentalTable(experimentalData);
+                this.refreshTrendCharts();
             } else {
                 utils.showNotification(result.message, 'error');
             }
@@ -390,6 +402,7 @@ class PassManager {
             if (result.status === 'success') {
                 utils.showNotification(result.message, 'success');
                 this.renderControlTable(result.control_data);
+                this.refreshTrendCharts();
             } else {
                 utils.showNotification(result.message, 'error');
             }
@@ -452,6 +465,7 @@ class PassManager {
             // 테이블 초기화
             this.renderExperimentalTable([]);
             this.renderControlTable([]);
+            this.refreshTrendCharts();
             
             utils.showNotification(`총 ${deleteCount}개의 데이터가 삭제되었습니다.`, 'success');
         } catch (error) {
@@ -491,6 +505,9 @@ class PassManager {
                         sample.removal_method === 'Z-Score' ? 'bg-blue-100 text-blue-800' :
                         sample.removal_method === 'IQR' ? 'bg-green-100 text-green-800' :
                         sample.removal_method === 'MAD' ? 'bg-purple-100 text-purple-800' :
+                        sample.removal_method === 'GESD' ? 'bg-orange-100 text-orange-800' :
+                        sample.removal_method === 'Mahalanobis' ? 'bg-teal-100 text-teal-800' :
+                        sample.removal_method === 'Hampel' ? 'bg-rose-100 text-rose-800' :
                         'bg-gray-100 text-gray-800'
                     }">
                         ${sample.removal_method}
@@ -557,23 +574,38 @@ class PassManager {
     }
 
     // 트렌드 분석 표시
-    async showTrendAnalysis() {
+    async showTrendAnalysis(scroll = true) {
         try {
-            const result = await utils.apiRequest('/get_pass_trend_data');
+            // 관리도 옵션 (비어 있는 규격 한계는 전송하지 않음)
+            const params = new URLSearchParams();
+            const spcFields = {
+                size_lsl: 'spc_size_lsl', size_usl: 'spc_size_usl',
+                pi_lsl: 'spc_pi_lsl', pi_usl: 'spc_pi_usl', subgroup_size: 'spc_subgroup_size'
+            };
+            Object.entries(spcFields).forEach(([key, id]) => {
+                const value = document.getElementById(id)?.value;
+                if (value !== undefined && value !== '') {
+                    params.append(key, value);
+                }
+            });
+            const result = await utils.apiRequest(`/get_pass_trend_data?${params.toString()}`);
             
             if (result.status === 'error') {
                 utils.showNotification(result.message, 'error');
                 return;
             }
             
-            this.displayTrendResults(result);
+            this.trendParams = params.toString();
+            this.trendVersion = result.trend_version;
+            this.spcRuleNames = result.statistics.spc_rules || {};
+            this.displayTrendResults(result, scroll);
         } catch (error) {
             utils.showNotification('트렌드 분석 중 오류가 발생했습니다.', 'error');
         }
     }
 
     // 트렌드 분석 결과 표시
-    displayTrendResults(data) {
+    displayTrendResults(data, scroll = true) {
         // 기존 트렌드 결과 div 찾기 또는 생성
         let trendDiv = document.getElementById('trend_results');
         if (!trendDiv) {
@@ -604,19 +636,19 @@ class PassManager {
                 <!-- 통계 요약 -->
                 <div class="grid grid-cols-2 md:grid-cols-4 gap-4 mb-8">
                     <div class="bg-blue-50 p-4 rounded-xl border border-blue-200">
-                        <div class="text-2xl font-bold text-blue-600">${data.statistics.pass_count}</div>
+                        <div class="text-2xl font-bold text-blue-600" id="trend_stat_pass_count">${data.statistics.pass_count}</div>
                         <div class="text-sm text-gray-600">총 샘플 수</div>
                     </div>
                     <div class="bg-green-50 p-4 rounded-xl border border-green-200">
-                        <div class="text-2xl font-bold text-green-600">${data.statistics.correlation.toFixed(3)}</div>
+                        <div class="text-2xl font-bold text-green-600" id="trend_stat_correlation">${data.statistics.correlation.toFixed(3)}</div>
                         <div class="text-sm text-gray-600">Size-PI 상관계수</div>
                     </div>
                     <div class="bg-purple-50 p-4 rounded-xl border border-purple-200">
-                        <div class="text-2xl font-bold text-purple-600">${data.statistics.size_cv.toFixed(1)}%</div>
+                        <div class="text-2xl font-bold text-purple-600" id="trend_stat_size_cv">${data.statistics.size_cv.toFixed(1)}%</div>
                         <div class="text-sm text-gray-600">Size 변동계수</div>
                     </div>
                     <div class="bg-orange-50 p-4 rounded-xl border border-orange-200">
-                        <div class="text-2xl font-bold text-orange-600">${data.statistics.pi_cv.toFixed(1)}%</div>
+                        <div class="text-2xl font-bold text-orange-600" id="trend_stat_pi_cv">${data.statistics.pi_cv.toFixed(1)}%</div>
                         <div class="text-sm text-gray-600">PI 변동계수</div>
                     </div>
                 </div>
@@ -631,6 +663,8 @@ class PassManager {
                     </div>
                 </div>
                 
+                <div id="trend_spc_summary">${this.renderSpcSummary(data.statistics.spc, data.statistics.spc_rules)}</div>
+                
                 <div class="bg-gray-50 rounded-xl p-6">
                     <div id="correlation_chart"></div>
                 </div>
@@ -639,21 +673,268 @@ class PassManager {
 
         // 차트 렌더링
         if (data.size_trend_chart) {
-            const sizeChartData = JSON.parse(data.size_trend_chart);
+            const sizeChartData = utils.parseFigure(data.size_trend_chart);
             Plotly.newPlot('size_trend_chart', sizeChartData.data, sizeChartData.layout, {responsive: true});
         }
         
         if (data.pi_trend_chart) {
-            const piChartData = JSON.parse(data.pi_trend_chart);
+            const piChartData = utils.parseFigure(data.pi_trend_chart);
             Plotly.newPlot('pi_trend_chart', piChartData.data, piChartData.layout, {responsive: true});
         }
         
         if (data.correlation_chart) {
-            const corrChartData = JSON.parse(data.correlation_chart);
+            const corrChartData = utils.parseFigure(data.correlation_chart);
             Plotly.newPlot('correlation_chart', corrChartData.data, corrChartData.layout, {responsive: true});
         }
 
-        trendDiv.scrollIntoView({ behavior: 'smooth' });
+        if (scroll) {
+            trendDiv.scrollIntoView({ behavior: 'smooth' });
+        }
+    }
+
+    // 실험군/대조군 추가·삭제 후 표시 중인 트렌드 차트를 증분 갱신 (요청은 순서대로 처리)
+    refreshTrendCharts() {
+        this.trendRefresh = this.trendRefresh
+            .then(() => this.applyTrendDelta())
+            .catch(error => console.warn('트렌드 차트 갱신 실패:', error));
+        return this.trendRefresh;
+    }
+
+    async applyTrendDelta() {
+        if (!this.trendVersion || !document.getElementById('size_trend_chart')) {
+            return;
+        }
+
+        const query = `since=${encodeURIComponent(this.trendVersion)}${this.trendParams ? '&' + this.trendParams : ''}`;
+        const delta = await utils.apiRequest(`/get_pass_trend_delta?${query}`);
+        if (delta.status !== 'success') {
+            return;
+        }
+        if (delta.mode === 'full') {
+            return this.showTrendAnalysis(false);
+        }
+
+        const charts = [
+            { id: 'size_trend_chart', y: 'size_avg', hover: 'size_hovertext', overlay: 'size' },
+            { id: 'pi_trend_chart', y: 'pi_avg', hover: 'pi_hovertext', overlay: 'pi' },
+            { id: 'correlation_chart', x: 'size_avg', y: 'pi_avg' }
+        ];
+        for (const chart of charts) {
+            if (!this.applyChartOps(chart, delta)) {
+                // 아직 없는 그룹의 점이 추가되는 등 구조가 바뀌면 전체 다시 그리기
+                return this.showTrendAnalysis(false);
+            }
+        }
+
+        const summary = delta.summary;
+        const setText = (id, text) => {
+            const el = document.getElementById(id);
+            if (el) el.textContent = text;
+        };
+        setText('trend_stat_pass_count', summary.pass_count);
+        setText('trend_stat_correlation', summary.correlation.toFixed(3));
+        setText('trend_stat_size_cv', `${summary.size_cv.toFixed(1)}%`);
+        setText('trend_stat_pi_cv', `${summary.pi_cv.toFixed(1)}%`);
+
+        if (delta.spc) {
+            const spcSummary = document.getElementById('trend_spc_summary');
+            if (spcSummary) spcSummary.innerHTML = this.renderSpcSummary(delta.spc, this.spcRuleNames);
+        }
+        this.trendVersion = delta.trend_version;
+    }
+
+    // 한 차트에 점 추가/삭제 반영: 끝에 추가만 있으면 extendTraces, 그 외(중간 삽입/삭제, 관리 한계 변경)는 react
+    applyChartOps(chart, delta) {
+        const gd = document.getElementById(chart.id);
+        if (!gd || !gd.data) return true;
+
+        const mainTraces = {};
+        gd.data.forEach((trace, index) => {
+            if (trace.meta && trace.meta.group) mainTraces[trace.meta.group] = index;
+        });
+        const isTrend = !chart.x;
+        const overlay = chart.overlay && delta.spc_overlay ? delta.spc_overlay[chart.overlay] : null;
+
+        // 끝에 붙는 추가만 있는지 확인
+        const lengths = {};
+        Object.entries(mainTraces).forEach(([group, index]) => { lengths[group] = gd.data[index].y.length; });
+        let appendOnly = true;
+        for (const op of delta.ops) {
+            if (mainTraces[op.group] === undefined) {
+                if (op.op === 'insert') return false;
+                continue;
+            }
+            if (op.op === 'insert' && op.index === lengths[op.group]) {
+                lengths[op.group] += 1;
+            } else {
+                appendOnly = false;
+            }
+        }
+        if (delta.ops.length === 0) return true;
+
+        const pointValues = (point, position) => ({
+            x: isTrend ? position + 1 : point[chart.x],
+            y: point[chart.y],
+            customdata: point.id,
+            text: point.sample_name,
+            hovertext: chart.hover ? point[chart.hover] : undefined
+        });
+        const keys = chart.hover ? ['x', 'y', 'customdata', 'text', 'hovertext'] : ['x', 'y', 'customdata', 'text'];
+
+        if (appendOnly && !overlay) {
+            const traceIndices = [];
+            const update = {};
+            keys.forEach(key => { update[key] = []; });
+            Object.entries(mainTraces).forEach(([group, index]) => {
+                const start = gd.data[index].y.length;
+                const points = delta.ops.filter(op => op.group === group).map((op, i) => pointValues(op.point, start + i));
+                if (points.length === 0) return;
+                traceIndices.push(index);
+                keys.forEach(key => update[key].push(points.map(values => values[key])));
+            });
+            Plotly.extendTraces(gd, update, traceIndices);
+            return true;
+        }
+
+        // 중간 삽입/삭제: 그룹별 배열을 복사해 적용 후 트렌드 차트는 순번(x) 재부여
+        const traces = gd.data.map(trace => ({ ...trace }));
+        Object.values(mainTraces).forEach(index => {
+            keys.forEach(key => { traces[index][key] = Array.from(traces[index][key] || []); });
+        });
+        for (const op of delta.ops) {
+            const index = mainTraces[op.group];
+            if (index === undefined) continue;
+            const trace = traces[index];
+            if (op.op === 'insert') {
+                const values = pointValues(op.point, op.index);
+                keys.forEach(key => trace[key].splice(op.index, 0, values[key]));
+            } else {
+                const position = trace.customdata.indexOf(op.id);
+                if (position < 0) return false;
+                keys.forEach(key => trace[key].splice(position, 1));
+            }
+        }
+        if (isTrend) {
+            Object.values(mainTraces).forEach(index => {
+                traces[index].x = traces[index].y.map((_, i) => i + 1);
+            });
+        }
+
+        let data = traces;
+        const layout = { ...gd.layout };
+        if (overlay) {
+            data = traces.filter(trace => trace.meta && trace.meta.group).concat(overlay.data);
+            layout.shapes = overlay.shapes;
+            layout.annotations = overlay.annotations;
+        }
+        Plotly.react(gd, data, layout);
+        return true;
+    }
+
+    // 숫자 속성 상관 행렬 (Pearson/Spearman, 전체 + 실험군/대조군)
+    async showCorrelationMatrix() {
+        try {
+            const result = await utils.apiRequest('/pass_correlation_matrix?group_by=group_type');
+            
+            if (result.status === 'error') {
+                utils.showNotification(result.message, 'error');
+                return;
+            }
+            
+            this.displayCorrelationMatrix(result);
+        } catch (error) {
+            utils.showNotification('상관 행렬 계산 중 오류가 발생했습니다.', 'error');
+        }
+    }
+
+    displayCorrelationMatrix(data) {
+        let matrixDiv = document.getElementById('correlation_matrix_results');
+        if (!matrixDiv) {
+            matrixDiv = document.createElement('div');
+            matrixDiv.id = 'correlation_matrix_results';
+            matrixDiv.className = 'mt-8';
+            const trendDiv = document.getElementById('trend_results');
+            if (trendDiv) {
+                trendDiv.parentNode.insertBefore(matrixDiv, trendDiv.nextSibling);
+            } else {
+                document.body.appendChild(matrixDiv);
+            }
+        }
+        
+        const groupNames = { all: '전체', experimental: '실험군', control: '대조군' };
+        const matrices = { all: data.all, ...(data.groups || {}) };
+        const renderTable = (key, matrix) => `
+            <div class="overflow-x-auto">
+                <h4 class="font-semibold text-gray-700 mb-2">${groupNames[key]} - Spearman ρ (n)</h4>
+                <table class="w-full text-xs">
+                    <thead><tr><th></th>${data.labels.map(label => `<th class="px-2 py-1">${label}</th>`).join('')}</tr></thead>
+                    <tbody>
+                        ${matrix.spearman.map((row, i) => `
+                            <tr class="border-t border-gray-200">
+                                <th class="px-2 py-1 text-left">${data.labels[i]}</th>
+                                ${row.map((value, j) => `<td class="px-2 py-1 text-center ${matrix.spearman_p[i][j] !== null && matrix.spearman_p[i][j] < 0.05 && i !== j ? 'font-bold text-red-600' : ''}">${value === null ? '-' : value.toFixed(2)} (${matrix.n[i][j]})</td>`).join('')}
+                            </tr>`).join('')}
+                    </tbody>
+                </table>
+            </div>`;
+        
+        matrixDiv.innerHTML = `
+            <div class="bg-white/70 backdrop-blur-sm rounded-2xl shadow-xl p-8 border border-white/20">
+                <h2 class="text-2xl font-bold text-gray-800 mb-6">숫자 속성 상관 행렬</h2>
+                <div class="bg-gray-50 rounded-xl p-6 mb-6">
+                    <div id="correlation_matrix_chart"></div>
+                </div>
+                <div class="grid grid-cols-1 lg:grid-cols-3 gap-6">
+                    ${Object.entries(matrices).map(([key, matrix]) => renderTable(key, matrix)).join('')}
+                </div>
+                <p class="text-xs text-gray-500 mt-4">값이 모두 있는 항목 쌍만 사용 (괄호: 표본 수), 굵은 빨간색은 p &lt; 0.05</p>
+            </div>
+        `;
+        
+        const chartData = utils.parseFigure(data.heatmap_chart);
+        Plotly.newPlot('correlation_matrix_chart', chartData.data, chartData.layout, {responsive: true});
+        matrixDiv.scrollIntoView({ behavior: 'smooth' });
+    }
+
+    // 관리도 요약 (관리 한계, 공정 능력 지수, 규칙별 위반 점)
+    renderSpcSummary(spc, ruleNames) {
+        if (!spc || (!spc.size && !spc.pi)) {
+            return '';
+        }
+        const format = (value, digits = 3) => (value === null || value === undefined) ? '-' : value.toFixed(digits);
+        const rows = [['Size(nm)', spc.size], ['PI', spc.pi]].filter(([, chart]) => chart).map(([label, chart]) => {
+            const capability = chart.capability || {};
+            const violated = Object.entries(chart.violations)
+                .filter(([, points]) => points.length > 0)
+                .map(([rule, points]) => `<span title="${ruleNames[rule] || ''}">규칙 ${rule}: ${points.map(i => i + 1).join(', ')}</span>`)
+                .join('<br>') || '<span class="text-green-600">위반 없음</span>';
+            return `
+                <tr class="border-b border-gray-200">
+                    <td class="px-3 py-2 font-medium">${label}</td>
+                    <td class="px-3 py-2 text-center">${chart.chart_type}</td>
+                    <td class="px-3 py-2 text-center">${format(chart.lcl)} / ${format(chart.center)} / ${format(chart.ucl)}</td>
+                    <td class="px-3 py-2 text-center">${format(capability.cp, 2)} / ${format(capability.cpk, 2)}</td>
+                    <td class="px-3 py-2 text-center">${format(capability.pp, 2)} / ${format(capability.ppk, 2)}</td>
+                    <td class="px-3 py-2 text-xs text-red-600">${violated}</td>
+                </tr>`;
+        }).join('');
+        return `
+            <div class="bg-gray-50 rounded-xl p-6 mb-6 overflow-x-auto">
+                <h3 class="text-lg font-semibold text-gray-800 mb-3">관리도 (SPC) 요약 - 실험군</h3>
+                <table class="w-full text-sm">
+                    <thead>
+                        <tr class="border-b-2 border-gray-300 text-gray-700">
+                            <th class="px-3 py-2 text-left">항목</th>
+                            <th class="px-3 py-2">관리도</th>
+                            <th class="px-3 py-2">LCL / CL / UCL</th>
+                            <th class="px-3 py-2">Cp / Cpk</th>
+                            <th class="px-3 py-2">Pp / Ppk</th>
+                            <th class="px-3 py-2 text-left">규칙 위반 (점 번호)</th>
+                        </tr>
+                    </thead>
+                    <tbody>${rows}</tbody>
+                </table>
+            </div>`;
     }
 }
 
@@ -666,6 +947,7 @@ window.addControlData = () => passManager.addControlData();
 window.addFromCurrentResult = () => passManager.addFromCurrentResult();
 window.clearAllData = () => passManager.clearAllData();
 window.showTrendAnalysis = () => passManager.showTrendAnalysis();
+window.showCorrelationMatrix = () => passManager.showCorrelationMatrix();
 window.updateCustomFieldName = () => {
     const customFieldName = document.getElementById('custom_field_name')?.value;
     if (customFieldName) {
@@ -86,6 +86,11 @@ async function apiRequest(url, data = null, method = 'GET') {
     }
 }
 
+// Plotly 그림 데이터 (서버는 객체로 보내지만 이전 형식의 JSON 문자열도 지원)
+function parseFigure(figure) {
+    return typeof figure === 'string' ? JSON.parse(figure) : figure;
+}
+
 // 로딩 상태 관리
 function setLoadingState(elementId, isLoading) {
     const element = document.getElementById(elementId);
@@ -109,5 +114,6 @@ window.utils = {
     updateCustomFieldName,
     showNotification,
     apiRequest,
+    parseFigure,
     setLoadingState
 };
\ No newline at end of file